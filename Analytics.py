@@ -1,8 +1,6 @@
 import datetime as dt
 import streamlit as st
 import streamlit.components.v1 as components
-import plotly.express as px
-import plotly.graph_objects as go
 import pandas as pd
 import json
 import os
@@ -10,6 +8,12 @@ import os
 import src.utils as utils
 import src.config as config
 import src.analytics as analytics
+import src.metrics as metrics
+import src.charts as charts
+import src.payloads as payloads
+import src.claude_handler as claude_handler
+import src.perf as perf
+import src.taskgraph as taskgraph
 from src.data_handler import get_logbook_data
 
 
@@ -18,88 +22,78 @@ today = dt.datetime.now()
 utils.set_custom_page_config("Logbook Analytics")
 
 
-# Load data using shared functionality
+# Initialize session state for 30-day window offset if it doesn't exist
+if 'day_window_offset' not in st.session_state:
+    st.session_state.day_window_offset = 0
+
+# Calculate date range of the 30-day window
+end_date = pd.Timestamp.now().normalize() - pd.Timedelta(days=st.session_state.day_window_offset)
+start_date = end_date - pd.Timedelta(days=30)
+
+# Load data using shared functionality - only the years covering the window and the weekly stats,
+# plus the longest rolling window before the window so its moving averages start out complete
 try:
-    df, loaded_path = get_logbook_data()
+    df, loaded_path = get_logbook_data(
+        start_date=min(start_date, pd.Timestamp(today) - pd.Timedelta(days=60)) - pd.Timedelta(days=max(metrics.ROLLING_WINDOWS))
+    )
 
 except Exception as e:
     st.error(f"Error loading data: {str(e)}")
     st.stop()
 
-# Get the last 7 valid days and the previous 7 valid days
-df_last_7_valid_days = analytics.get_last_n_valid_days(df, 7)
-latest_date = df_last_7_valid_days['Data'].max()
-
-# Get previous 7 valid days before the earliest date in the current period
-earliest_date_current = df_last_7_valid_days['Data'].min()
-df_previous = df[df['Data'] < earliest_date_current]
-df_previous_7_valid_days = analytics.get_last_n_valid_days(df_previous, 7)
-
-# Get active fields
-active_fields = config.get_active_fields()
-time_columns = [field for field in active_fields if field not in ["20min clean", "YNAB", "Anki", "Pamiętnik", "Plan na jutro", "No porn", "Gaming <1h", "sport", "accessories", "suplementy", "No 9gag"]]
+# Get active time-based fields; binary habits are flags, not minutes
+time_columns = config.get_active_time_fields()
 # Ensure "Inne" is at the beginning of the list
 if "Inne" in time_columns:
     time_columns.remove("Inne")
     time_columns.insert(0, "Inne")
 
-# Filter dataframe to include only active fields
-df_last_7_valid_days = df_last_7_valid_days[list(active_fields.keys()) + ['Data', 'WEEKDAY', 'Razem']]
-df_previous_7_valid_days = df_previous_7_valid_days[list(active_fields.keys()) + ['Data', 'WEEKDAY', 'Razem']]
+def build_daily_window(window, rolling_metrics):
+    """Add the 7-day moving averages to the calendar window."""
+    # Moving averages come from the table over the whole loaded snapshot, so the
+    # window's left edge includes the days before it
+    rolling_metrics = rolling_metrics.reindex(window.index)
+    return window.assign(**{'7_day_sma': rolling_metrics['Razem_sma7'], '7_day_ema': rolling_metrics['Razem_ema7']})
+
+# Independent datasets run concurrently; results are shared per data snapshot
+window_key = (start_date, end_date)
+page_data = taskgraph.run_tasks([
+    # Compare the last 7 valid days with the previous 7 valid days
+    taskgraph.Task("weekly_stats", lambda: analytics.calculate_weekly_stats(df, 7), key=("weekly_stats", today.date())),
+    # Slice the selected window, with NA rows for days without data
+    taskgraph.Task("window", lambda: analytics.get_calendar_window(df, start_date, end_date), key=("window",) + window_key),
+    taskgraph.Task("rolling", lambda: metrics.get_rolling_metrics(df)),
+    taskgraph.Task("daily_window", build_daily_window, deps=("window", "rolling"), key=("daily_window",) + window_key),
+    # One trace per activity plus a single batched trace for all NA days
+    taskgraph.Task(
+        "daily_figure",
+        lambda daily_window: charts.build_daily_activity_figure(
+            daily_window, time_columns, config.get_column_colors(), start_date, end_date
+        ),
+        deps=("daily_window",),
+        key=("daily_figure", tuple(time_columns)) + window_key
+    ),
+], version=df.attrs.get("snapshot_version"))
+
+weekly_stats = page_data["weekly_stats"]
 
 # Main metrics
 with st.expander("📊 Weekly Stats Comparison", expanded=True):
     st.caption("Comparing last 7 valid days with previous period")
     
     try:
-        if df_last_7_valid_days.empty:
+        if weekly_stats is None:
             raise ValueError("No data available for the current period")
 
-        # Calculate metrics for the current period
-        avg_total = df_last_7_valid_days['Razem'].mean()
-        most_productive_day = df_last_7_valid_days.loc[df_last_7_valid_days['Razem'].idxmax()]
-        total_productive_hours = df_last_7_valid_days['Razem'].sum() / 60
-
-        # Calculate metrics for the previous period
-        avg_total_prev = df_previous_7_valid_days['Razem'].mean() if not df_previous_7_valid_days.empty else 0
-        most_productive_day_prev = df_previous_7_valid_days['Razem'].max() if not df_previous_7_valid_days.empty else 0
-        total_productive_hours_prev = df_previous_7_valid_days['Razem'].sum() / 60 if not df_previous_7_valid_days.empty else 0
-
-        # Calculate percentage changes
-        avg_total_change = ((avg_total - avg_total_prev) / avg_total_prev * 100) if avg_total_prev != 0 else 0
-        most_productive_day_change = ((most_productive_day['Razem'] - most_productive_day_prev) / most_productive_day_prev * 100) if most_productive_day_prev != 0 else 0
-        total_productive_hours_change = ((total_productive_hours - total_productive_hours_prev) / total_productive_hours_prev * 100) if total_productive_hours_prev != 0 else 0
+        avg_total = weekly_stats["avg_daily"]["value"]
+        avg_total_change = weekly_stats["avg_daily"]["change"]
+        most_productive_day = weekly_stats["most_productive_day"]["value"]
+        most_productive_day_change = weekly_stats["most_productive_day"]["change"]
+        total_productive_hours = weekly_stats["total_hours"]["value"]
+        total_productive_hours_change = weekly_stats["total_hours"]["change"]
 
         # Prepare data for the HTML component
-        metrics_data = [
-            {
-                "id": "avg_daily",
-                "title": "Average Daily Total",
-                "value": avg_total,
-                "change": avg_total_change,
-                "unit": "min",
-                "format": "time",
-                "days": 7
-            },
-            {
-                "id": "most_productive_day",
-                "title": "Most Productive Day",
-                "value": most_productive_day['Razem'],
-                "change": most_productive_day_change,
-                "unit": "min",
-                "format": "time",
-                "days": 7
-            },
-            {
-                "id": "total_hours",
-                "title": "Total Productive Hours",
-                "value": total_productive_hours,
-                "change": total_productive_hours_change,
-                "unit": "hrs",
-                "format": "hours",
-                "days": 7
-            }
-        ]
+        metrics_data = payloads.weekly_stats_cards(weekly_stats)
         
         # Load the HTML template
         template_path = os.path.join("assets", "analytics-cards.html")
@@ -112,7 +106,9 @@ with st.expander("📊 Weekly Stats Comparison", expanded=True):
             html_content = html_template.replace('METRICS_DATA_PLACEHOLDER', json.dumps(metrics_data))
             
             # Display the HTML component
-            components.html(html_content, height=240, scrolling=False)
+            with perf.timed("Analytics: render weekly cards") as span:
+                span.bytes = len(html_content.encode())
+                components.html(html_content, height=240, scrolling=False)
             
         except Exception as e:
             st.error(f"Error loading HTML template: {str(e)}")
@@ -126,7 +122,7 @@ with st.expander("📊 Weekly Stats Comparison", expanded=True):
 
             with col2:
                 st.metric("Most Productive Day (min)", 
-                         f"{most_productive_day['Razem']:.0f}", 
+                         f"{most_productive_day:.0f}", 
                          f"{most_productive_day_change:.1f}%")
 
             with col3:
@@ -138,16 +134,8 @@ with st.expander("📊 Weekly Stats Comparison", expanded=True):
         st.warning("No data available for this period")
         st.exception(e)
             
-# Initialize session state for 30-day window offset if it doesn't exist
-if 'day_window_offset' not in st.session_state:
-    st.session_state.day_window_offset = 0
-
 # Navigation controls for 30-day window
 with st.expander("📈 Daily Activity Analysis", expanded=True):
-    # Calculate date range
-    end_date = pd.Timestamp.now().normalize() - pd.Timedelta(days=st.session_state.day_window_offset)
-    start_date = end_date - pd.Timedelta(days=30)
-    
     # Create a row for navigation with columns
     col1, col2, col3 = st.columns([1, 6, 1])
     
@@ -194,112 +182,17 @@ with st.expander("📈 Daily Activity Analysis", expanded=True):
     </style>
     """, unsafe_allow_html=True)
     
-    # Filter data for the selected 30-day window
-    df_last_30_days = analytics.filter_date_range(df, delta_days=30, offset_days=st.session_state.day_window_offset)
-    
-    # Ensure we have data for all 30 days in the range by creating a complete date range
-    date_range = pd.date_range(start=start_date, end=end_date)
-    complete_df = pd.DataFrame({'Data': date_range})
-    
-    # Merge with actual data, resulting in NA for days without data
-    df_last_30_days = pd.merge(complete_df, df_last_30_days, on='Data', how='left')
-    
-    # Fill missing values for numeric columns with 0 for calculations
-    numeric_cols = df_last_30_days.select_dtypes(include=['number']).columns
-    # Exclude 'Data' column if it's in numeric_cols
-    numeric_cols = [col for col in numeric_cols if col != 'Data']
-    
-    # Create a copy for calculations to avoid SettingWithCopyWarning
-    df_calc = df_last_30_days.copy()
-    df_calc[numeric_cols] = df_calc[numeric_cols].fillna(0)
-    
-    # Calculate moving averages
-    df_last_30_days['7_day_sma'] = df_calc['Razem'].rolling(7, min_periods=1).mean()
-    # Calculate exponential moving average
-    df_last_30_days['7_day_ema'] = df_calc['Razem'].ewm(span=7, adjust=False).mean()
+    fig_daily_trend = page_data["daily_figure"]
 
-    # Get color mapping
-    column_colors = config.get_column_colors()
+    with perf.timed("Analytics: render daily chart"):
+        st.plotly_chart(fig_daily_trend, use_container_width=True)
 
-    # Create the figure with custom colors
-    fig_daily_trend = go.Figure()
-    
-    # For calculating max height for empty bars, use all available data
-    # Use a reasonable default if no data is available
-    max_height = df_last_30_days['Razem'].max()
-    if pd.isna(max_height) or max_height == 0:
-        max_height = 300  # Default height if no data available
-    
-    # First add grey bars for NA days
-    na_mask = df_last_30_days['Razem'].isna()
-    for date in df_last_30_days[na_mask]['Data']:
-        fig_daily_trend.add_trace(go.Bar(
-            x=[date],
-            y=[max_height],  # Use max value to ensure bars cover full height
-            marker=dict(
-                color='rgba(200,200,200,0.3)',
-                pattern=dict(
-                    shape="/",
-                    bgcolor="rgba(220,220,220,0.3)",
-                    solidity=0.5
-                )
-            ),
-            width=24*60*60*1000,  # One day width in milliseconds
-            name='NA Day',
-            showlegend=False,
-            hovertext='No data available',
-            hoverinfo='text'
-        ))
-
-    # Then plot regular bars in normal order
-    for column in time_columns:
-        # Replace NaN values with 0 for plotting
-        y_values = df_last_30_days[column].fillna(0)
-        
-        fig_daily_trend.add_trace(go.Bar(
-            x=df_last_30_days['Data'],
-            y=y_values,
-            name=column,
-            marker_color=column_colors.get(column, None),  # Use None if color not specified
-            hovertemplate='%{x|%Y-%m-%d}<br>%{y} min<extra></extra>' if column != 'Inne' else None
-        ))
-
-    # Add trend lines on top
-    # Simple Moving Average
-    fig_daily_trend.add_trace(go.Scatter(
-        x=df_last_30_days['Data'],
-        y=df_last_30_days['7_day_sma'],
-        mode='lines',
-        name='7-day SMA',
-        line=dict(width=2, dash='dot', color='#47ff2f'),
-        hovertemplate='7-day SMA: %{y:.1f} min<extra></extra>'
-    ))
-    
-    # Exponential Moving Average
-    fig_daily_trend.add_trace(go.Scatter(
-        x=df_last_30_days['Data'],
-        y=df_last_30_days['7_day_ema'],
-        mode='lines',
-        name='7-day EMA',
-        line=dict(width=2, dash='solid', color='#ff47af'),
-        hovertemplate='7-day EMA: %{y:.1f} min<extra></extra>'
-    ))
-
-    # Update layout with a better color scheme
-    fig_daily_trend.update_layout(
-        barmode='stack',
-        xaxis_title="Date",
-        yaxis_title="Minutes",
-        legend_title="Activity",
-        xaxis=dict(
-            tickformat="%Y-%m-%d",
-            range=[start_date - pd.Timedelta(days=0.5), end_date + pd.Timedelta(days=0.5)],  # Add padding to ensure all bars are fully visible
-            type='date'
-        ),
-        transition_duration=500,  # Add transition animation when data changes
-        transition=dict(
-            easing='cubic-in-out'
-        )
-    )
+# Advice is generated on request; the answer streams in and is reused for the rest of the day
+with st.expander("🤖 Daily Advice", expanded=False):
+    if st.button("Get advice", key="get_advice"):
+        budget = claude_handler.context_budget(claude_handler.generate_context(df))
+        st.caption(f"Context: {budget['chars']} chars, ~{budget['approx_tokens']} tokens (cap {budget['max_tokens']})")
+        with perf.timed("Analytics: advice"):
+            st.write_stream(claude_handler.stream_advice(df))
 
-    st.plotly_chart(fig_daily_trend, use_container_width=True)
+utils.show_performance_panel({"30-day window": page_data["daily_window"]}, base=[df, page_data["rolling"]])
@@ -0,0 +1,53 @@
+"""Check that the advice context stays bounded and deterministic, and time it.
+
+Run from the repository root: python -m benchmarks.bench_context [years]
+"""
+import sys
+import time
+
+import numpy as np
+
+import src.claude_handler as claude_handler
+import src.data_handler as data_handler
+from benchmarks.synthetic import generate_logbook
+
+
+def widen(df, extra_columns, seed=0):
+    """Add unrelated numeric and text columns, as a growing logbook would."""
+    rng = np.random.default_rng(seed)
+    df = df.copy()
+    for i in range(extra_columns):
+        df[f"extra {i}"] = rng.integers(0, 100, len(df)) if i % 2 else "some free text"
+    return df
+
+
+def check_bounded(df):
+    """Assert extra columns do not change the context and that it respects the cap."""
+    context = claude_handler.generate_context(df)
+    assert len(context) <= claude_handler.MAX_CONTEXT_CHARS, len(context)
+    assert claude_handler.generate_context(df) == context, "context is not deterministic"
+
+    for extra_columns in (10, 100, 500):
+        assert claude_handler.generate_context(widen(df, extra_columns)) == context, extra_columns
+
+    long_context = claude_handler.generate_context(df, days=365)
+    assert len(long_context) <= claude_handler.MAX_CONTEXT_CHARS, len(long_context)
+    return context
+
+
+def main(years=3):
+    df = data_handler.preprocess_logbook_data(generate_logbook(years))
+    context = check_bounded(df)
+
+    start = time.perf_counter()
+    claude_handler.generate_context(df)
+    elapsed = time.perf_counter() - start
+
+    legacy_chars = len(df.tail(14).to_string())
+    budget = claude_handler.context_budget(context)
+    print(f"Context: {budget['chars']} chars (~{budget['approx_tokens']} tokens, cap {budget['max_chars']}), "
+          f"built in {elapsed * 1000:.1f} ms; legacy tail(14).to_string() alone: {legacy_chars} chars")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 3)
@@ -0,0 +1,107 @@
+"""Check the vectorized and incremental streak engines against the original loops and time them.
+
+Run from the repository root: python -m benchmarks.bench_streaks [years]
+"""
+import os
+import sys
+import time
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+import src.config as config
+import src.streaks as streaks
+
+HABITS = ['Anki', 'Cronometer', 'YNAB', 'YouTube', 'Gitara', 'Czytanie', 'No porn', 'No 9gag', '20min clean']
+
+
+def legacy_current_streak(values):
+    """Reference implementation taken from the original 2_Streaks page."""
+    today_idx = len(values) - 1
+    current_streak = 0
+    if today_idx >= 0 and values[today_idx] == 0:
+        today_idx -= 1
+    for idx in range(today_idx, -1, -1):
+        if pd.isna(values[idx]):
+            continue
+        elif values[idx] >= 1:
+            current_streak += 1
+        else:
+            break
+    return current_streak
+
+
+def legacy_longest_streak(values):
+    """Reference implementation taken from the original 2_Streaks page."""
+    max_streak = 0
+    current = 0
+    for val in values:
+        if pd.isna(val):
+            continue
+        elif val >= 1:
+            current += 1
+            max_streak = max(max_streak, current)
+        else:
+            current = 0
+    return max_streak
+
+
+def synthetic_logbook(years, na_density=0.1, seed=0):
+    """Random logbook frame with `years` years of days for the tracked habits."""
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range(end=pd.Timestamp.now().normalize(), periods=365 * years)
+    df = pd.DataFrame({'Data': dates})
+    for habit in HABITS:
+        if habit in ('YouTube', 'Gitara', 'Czytanie'):
+            values = rng.integers(0, 60, len(dates)).astype(float)
+        else:
+            values = (rng.random(len(dates)) < 0.8).astype(float)
+        values[rng.random(len(dates)) < na_density] = np.nan
+        df[habit] = values
+    return df
+
+
+def check_equivalence(df):
+    """Assert the vectorized results match the reference loops for every habit."""
+    table = streaks.compute_streaks(df, HABITS)
+    for habit in HABITS:
+        values = df[habit].to_numpy()
+        if habit in ('YouTube', 'Gitara', 'Czytanie'):
+            values = np.where(np.isnan(values), np.nan, (values >= config.get_completion_threshold(habit)).astype(float))
+        assert table.loc[habit, 'current_streak'] == legacy_current_streak(values), habit
+        assert table.loc[habit, 'longest_streak'] == legacy_longest_streak(values), habit
+
+
+def check_incremental(df):
+    """Assert the persisted incremental state matches a full recompute while days are added."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        state_path = os.path.join(tmp_dir, streaks.STREAK_STATE_FILENAME)
+        for days in (len(df) - 30, len(df) - 1, len(df)):
+            expected = streaks.compute_streaks(df.iloc[:days], HABITS)
+            actual = streaks.incremental_streaks(df.iloc[:days], HABITS, state_path)
+            pd.testing.assert_frame_equal(actual, expected, check_dtype=False)
+
+
+def main(years=5):
+    df = synthetic_logbook(years)
+    check_equivalence(df)
+    check_incremental(df)
+
+    start = time.perf_counter()
+    for habit in HABITS:
+        values = df[habit].to_numpy()
+        legacy_current_streak(values)
+        legacy_longest_streak(values)
+    legacy_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    streaks.compute_streaks(df, HABITS)
+    vectorized_time = time.perf_counter() - start
+
+    print(f"{years} years, {len(HABITS)} habits: legacy {legacy_time * 1000:.1f} ms, "
+          f"vectorized {vectorized_time * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
@@ -0,0 +1,158 @@
+"""Time the data pipeline on synthetic logbooks of several sizes and write a JSON report.
+
+Run from the repository root:
+    python -m benchmarks.bench_suite [--years 1 5 20] [--report benchmarks/results/report.json]
+    python -m benchmarks.bench_suite --compare old.json new.json
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import subprocess
+import tempfile
+import datetime as dt
+
+import src.config as config
+import src.analytics as analytics
+import src.data_handler as data_handler
+import src.metrics as metrics
+import src.payloads as payloads
+import src.streaks as streaks
+from benchmarks.synthetic import generate_logbook, write_logbook_files
+
+REPORT_VERSION = 1
+DEFAULT_REPORT = os.path.join("benchmarks", "results", "report.json")
+HABITS = [habit for habit, props in config.HABITS_CONFIG.items() if props["type"] in ("binary", "time")]
+TIME_HABITS = [habit for habit, props in config.HABITS_CONFIG.items() if props["type"] == "time"]
+
+
+def _timed(func, repeat):
+    """Run func `repeat` times; return (best wall time in ms, last result)."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, result
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _point_data_dir(data_dir):
+    """Make data_handler load from data_dir, with empty caches."""
+    os.environ[data_handler.DATA_DIR_ENV] = data_dir
+    data_handler._resolved_data_dir = None
+    data_handler.clear_logbook_cache()
+
+
+def bench_size(years, na_density, repeat):
+    """Time every pipeline stage on a `years`-year logbook; return {stage: ms} plus sizes."""
+    df = generate_logbook(years, na_density)
+    results = {"years": years, "days": len(df), "na_density": na_density}
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        write_logbook_files(df, data_dir)
+        _point_data_dir(data_dir)
+        partitions = data_handler.discover_logbook_files()
+
+        # Cold load parses the Excel files and writes the Feather caches; warm load reads them
+        results["load_excel_ms"], _ = _timed(lambda: data_handler.load_logbook_partitions(partitions), 1)
+        results["load_cached_ms"], raw = _timed(lambda: data_handler.load_logbook_partitions(partitions), repeat)
+        results["preprocess_ms"], frame = _timed(lambda: data_handler.preprocess_logbook_data(raw), repeat)
+        results["snapshot_bytes"] = int(frame.memory_usage(deep=True).sum())
+
+        # A typical daily edit: only the last day of the newest workbook changes
+        newest = max(partitions)
+        edited = df[df['Data'].dt.year == newest].copy()
+        edited.loc[edited.index[-1], 'Razem'] = edited['Razem'].fillna(0).iloc[-1] + 1
+        edited.to_excel(partitions[newest], index=False)
+        cache_mtime = os.path.getmtime(data_handler.get_cache_path(partitions[newest]))
+        os.utime(partitions[newest], (cache_mtime + 1, cache_mtime + 1))
+        results["ingest_one_day_ms"], _ = _timed(lambda: data_handler.load_logbook_file(partitions[newest]), 1)
+        report = data_handler.get_ingest_report(partitions[newest])
+        results["ingest_one_day_rows_changed"] = report["inserted"] + report["updated"] + report["deleted"]
+
+        def cold_snapshot():
+            data_handler.clear_logbook_cache()
+            return data_handler.get_logbook_data()
+        results["snapshot_ms"], _ = _timed(cold_snapshot, repeat)
+
+        results["streaks_ms"], _ = _timed(lambda: streaks.compute_streaks(frame, HABITS), repeat)
+        results["balance_ms"], _ = _timed(lambda: analytics.calculate_balance_scores(frame, TIME_HABITS), repeat)
+        results["rolling_ms"], _ = _timed(lambda: metrics.compute_rolling_metrics(frame), repeat)
+        results["payloads_ms"], habits_data = _timed(lambda: payloads.habit_days_payload(frame, HABITS), repeat)
+        results["payload_bytes"] = len(json.dumps(habits_data, separators=(',', ':')).encode())
+
+    return results
+
+
+def run(sizes, na_density, repeat):
+    report = {
+        "report_version": REPORT_VERSION,
+        "commit": _git_commit(),
+        "created_at": dt.datetime.now().isoformat(timespec='seconds'),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": repeat,
+        "results": [],
+    }
+    for years in sizes:
+        results = bench_size(years, na_density, repeat)
+        report["results"].append(results)
+        timings = ", ".join(f"{key[:-3]} {value:.1f}" for key, value in results.items() if key.endswith("_ms"))
+        print(f"{years:>2} years ({results['days']} days), ms: {timings}")
+    return report
+
+
+def compare(old_path, new_path):
+    """Print the per-stage ratio new/old for sizes present in both reports."""
+    with open(old_path, "r", encoding="utf-8") as file:
+        old = {r["years"]: r for r in json.load(file)["results"]}
+    with open(new_path, "r", encoding="utf-8") as file:
+        new = json.load(file)["results"]
+
+    for results in new:
+        before = old.get(results["years"])
+        if before is None:
+            continue
+        changes = ", ".join(
+            f"{key[:-3]} x{value / before[key]:.2f}"
+            for key, value in results.items()
+            if key.endswith("_ms") and before.get(key)
+        )
+        print(f"{results['years']:>2} years: {changes}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the logbook pipeline on synthetic data.")
+    parser.add_argument("--years", type=int, nargs="+", default=[1, 5, 20])
+    parser.add_argument("--na-density", type=float, default=0.1)
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per stage; the best time is reported")
+    parser.add_argument("--report", default=DEFAULT_REPORT)
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="Compare two reports and exit")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        compare(*args.compare)
+        return 0
+
+    if any(years < 1 or years > 20 for years in args.years):
+        parser.error("--years must be between 1 and 20")
+
+    report = run(args.years, args.na_density, args.repeat)
+    os.makedirs(os.path.dirname(args.report) or ".", exist_ok=True)
+    with open(args.report, "w", encoding="utf-8") as file:
+        json.dump(report, file, indent=2)
+    print(f"Report written to {args.report}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
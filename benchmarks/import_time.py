@@ -0,0 +1,115 @@
+"""Fail if cold-start import time of any src module exceeds a budget.
+
+Each module is imported in a fresh interpreter with `python -X importtime`, so the
+numbers reflect a container restart rather than a warm process. Nearly every module
+needs pandas, so the budget is what a module may add on top of importing pandas; that
+keeps it tight on any machine. The modules must also not pull in Streamlit, Plotly or
+the Anthropic SDK.
+
+Run from the repository root: python -m benchmarks.import_time [budget_ms]
+"""
+import json
+import subprocess
+import sys
+
+# Every src module; all of them must import without the UI stack (or openpyxl, loaded on first use)
+MODULES = [
+    'src.config',
+    'src.perf',
+    'src.data_handler',
+    'src.storage',
+    'src.journal',
+    'src.analytics',
+    'src.streaks',
+    'src.metrics',
+    'src.payloads',
+    'src.charts',
+    'src.taskgraph',
+    'src.snapshot',
+    'src.watcher',
+    'src.claude_handler',
+    'src.cli',
+    'src.api',
+    'src.utils',
+]
+HEAVY_MODULES = ['streamlit', 'plotly', 'anthropic', 'seaborn', 'matplotlib', 'openpyxl']
+
+# Import time each module may add on top of importing pandas, in milliseconds. The modules
+# add up to ~50 ms; an eager Streamlit, Plotly or Anthropic import alone is well above it
+DEFAULT_BUDGET_MS = 150
+# Best of this many rounds, to keep scheduling noise out of the comparison
+REPEAT = 5
+
+
+def _import_time_us(code):
+    """Run code in a fresh interpreter; return (total top-level import time in us, stdout)."""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise ImportError(result.stderr.strip().splitlines()[-1])
+
+    # Lines look like "import time:  self [us] | cumulative | imported package";
+    # top-level imports are the ones without indentation in the package column
+    total_us = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        _, cumulative, package = line[len('import time:'):].split('|')
+        if not package.startswith('  '):
+            total_us += int(cumulative)
+
+    return total_us, result.stdout
+
+
+def measure(module, baseline_us=0):
+    """Return (import time in ms above the baseline, heavy modules loaded) for one cold import."""
+    code = (
+        f"import sys, json, {module}; "
+        f"print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))"
+    )
+    total_us, stdout = _import_time_us(code)
+    return (total_us - baseline_us) / 1000, json.loads(stdout.strip().splitlines()[-1])
+
+
+def measure_extra(module, baseline_us=0):
+    """
+    Return (import time in ms on top of pandas, total import time in ms, heavy modules loaded).
+
+    pandas is imported right before the module in each round, so load on the machine
+    affects both sides alike, and each side's fastest round counts.
+    """
+    pandas_times, module_times = [], []
+    for _ in range(REPEAT):
+        pandas_times.append(measure('pandas', baseline_us)[0])
+        elapsed_ms, heavy = measure(module, baseline_us)
+        module_times.append(elapsed_ms)
+    return min(module_times) - min(pandas_times), min(module_times), heavy
+
+
+def main(budget_ms=DEFAULT_BUDGET_MS):
+    # Interpreter startup, the helper imports and pandas itself are not part of the budget
+    baseline_us = min(_import_time_us("import sys, json")[0] for _ in range(REPEAT))
+
+    failures = []
+    for module in MODULES:
+        try:
+            extra_ms, elapsed_ms, heavy = measure_extra(module, baseline_us)
+        except ImportError as e:
+            print(f"{module:<22} {'failed':>8}")
+            failures.append(f"{module} failed to import: {e}")
+            continue
+        print(f"{module:<22} {elapsed_ms:8.1f} ms  {extra_ms:+8.1f} ms  {'heavy: ' + ', '.join(heavy) if heavy else ''}")
+        if extra_ms > budget_ms:
+            failures.append(f"{module} took {extra_ms:.1f} ms more than pandas (budget {budget_ms} ms)")
+        if heavy:
+            failures.append(f"{module} imports {', '.join(heavy)}")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(float(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_BUDGET_MS))
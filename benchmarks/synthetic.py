@@ -0,0 +1,89 @@
+"""Generate synthetic multi-year logbooks with the columns of config.HABITS_CONFIG.
+
+Run from the repository root:
+    python -m benchmarks.synthetic --years 5 --na-density 0.1 --out data/synthetic
+"""
+import os
+import argparse
+
+import numpy as np
+import pandas as pd
+
+import src.config as config
+
+SPORTS = ["bieganie", "rower", "siłownia", "basen", "spacer"]
+ACCESSORIES = ["zegarek", "pierścień", "bransoletka"]
+
+
+def generate_logbook(years, na_density=0.1, seed=0, end_date=None):
+    """
+    Random logbook frame covering `years` years of days up to end_date (default today).
+
+    NA days have every habit empty, like days that were never filled in. Time habits
+    are minutes, binary habits 0/1 and description habits short free-text entries.
+    """
+    rng = np.random.default_rng(seed)
+    end_date = pd.Timestamp(end_date or pd.Timestamp.now()).normalize()
+    dates = pd.date_range(end=end_date, periods=365 * years, freq='D')
+    days = len(dates)
+
+    df = pd.DataFrame({
+        'Data': dates,
+        'WEEKDAY': np.array(config.WEEKDAY_ORDER)[dates.dayofweek],
+    })
+
+    for habit, props in config.HABITS_CONFIG.items():
+        if props["type"] == "time":
+            # Most days have a little of each activity, some days none
+            minutes = rng.gamma(1.5, 30, days).round()
+            minutes[rng.random(days) < 0.3] = 0
+            df[habit] = minutes
+        elif props["type"] == "binary":
+            df[habit] = (rng.random(days) < rng.uniform(0.5, 0.9)).astype(float)
+        else:
+            choices = SPORTS if habit == "sport" else ACCESSORIES
+            values = rng.choice(choices, days).astype(object)
+            values[rng.random(days) < 0.6] = None
+            df[habit] = values
+
+    time_habits = [habit for habit, props in config.HABITS_CONFIG.items() if props["type"] == "time"]
+    df['Razem'] = df[time_habits].sum(axis=1)
+
+    na_days = rng.random(days) < na_density
+    habit_columns = [col for col in df.columns if col not in ('Data', 'WEEKDAY')]
+    df.loc[na_days, habit_columns] = np.nan
+
+    return df
+
+
+def write_logbook_files(df, out_dir):
+    """
+    Split a logbook frame into yearly `Logbook YYYY.xlsx` files, the only format the loader reads.
+
+    Returns:
+        dict: {year: path} of the written files
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    paths = {}
+    for year, year_df in df.groupby(df['Data'].dt.year):
+        path = os.path.join(out_dir, f"Logbook {year}.xlsx")
+        year_df.to_excel(path, index=False)
+        paths[int(year)] = path
+    return paths
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate synthetic yearly logbook files.")
+    parser.add_argument("--years", type=int, default=5, choices=range(1, 21), metavar="1-20")
+    parser.add_argument("--na-density", type=float, default=0.1, help="Share of NA days (0-1)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default=os.path.join("data", "synthetic"))
+    args = parser.parse_args(argv)
+
+    df = generate_logbook(args.years, args.na_density, args.seed)
+    paths = write_logbook_files(df, args.out)
+    print(f"Wrote {len(df)} days to {len(paths)} files in {args.out}")
+
+
+if __name__ == "__main__":
+    main()
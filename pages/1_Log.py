@@ -0,0 +1,76 @@
+import time
+import datetime as dt
+
+import streamlit as st
+
+import src.utils as utils
+import src.config as config
+import src.journal as journal
+from src.data_handler import get_logbook_data
+
+utils.set_custom_page_config("Log Today")
+
+st.title("📝 Log Today")
+st.caption("Entries go to a journal next to the logbook and show up on every page right away; the Excel file is left as it is.")
+
+day = st.date_input("Day", value=dt.date.today(), max_value=dt.date.today())
+
+# Load the selected day, to prefill the form with what is already logged
+try:
+    df, _ = get_logbook_data(start_date=day, end_date=day)
+except Exception as e:
+    st.error(f"Error loading data: {str(e)}")
+    st.stop()
+
+active_fields = config.get_active_fields()
+time_habits = [habit for habit, props in active_fields.items() if props["type"] == "time"]
+binary_habits = [habit for habit, props in active_fields.items() if props["type"] == "binary"]
+description_habits = [habit for habit, props in active_fields.items() if props["type"] == "description"]
+
+# Unfilled habits stay empty (None), so saving one value doesn't turn the rest into zeros or misses
+current = journal.day_values(df, day, time_habits + binary_habits + description_habits)
+BINARY_LABELS = {None: "–", True: "✅ Done", False: "❌ Missed"}
+
+with st.form(f"log_entry_{day}"):
+    values = {}
+
+    st.subheader("⏱️ Minutes")
+    columns = st.columns(len(time_habits) or 1)
+    for column, habit in zip(columns, time_habits):
+        with column:
+            values[habit] = st.number_input(
+                f"{active_fields[habit]['emoji']} {habit}",
+                min_value=0.0, step=5.0, format="%g", value=current[habit]
+            )
+
+    st.subheader("✅ Habits")
+    columns = st.columns(4)
+    for i, habit in enumerate(binary_habits):
+        with columns[i % 4]:
+            values[habit] = st.selectbox(
+                f"{active_fields[habit]['emoji']} {habit}",
+                options=list(BINARY_LABELS), index=list(BINARY_LABELS).index(current[habit]),
+                format_func=BINARY_LABELS.get
+            )
+
+    st.subheader("🗒️ Notes")
+    for habit in description_habits:
+        text = st.text_input(f"{active_fields[habit]['emoji']} {habit}", value=current[habit] or "")
+        values[habit] = text or None
+
+    submitted = st.form_submit_button("Save", use_container_width=True)
+
+if submitted:
+    # Only the fields that were edited are journaled
+    changes = journal.changed_values(current, values)
+    if not changes:
+        st.info("Nothing changed")
+    else:
+        try:
+            start = time.perf_counter()
+            journal.log_entry(changes, date=day)
+            st.success(f"Saved {len(changes)} value(s) for {day:%Y-%m-%d} in {(time.perf_counter() - start) * 1000:.1f} ms")
+        except Exception as e:
+            st.error(f"Error saving entry: {str(e)}")
+
+utils.show_performance_panel()
@@ -1,13 +1,15 @@
 from datetime import datetime, timedelta
 
 import streamlit as st
-import plotly.graph_objects as go
 import pandas as pd
-import numpy as np
 
 import src.utils as utils
 import src.config as config
 import src.analytics as analytics
+import src.charts as charts
+import src.metrics as metrics
+import src.perf as perf
+import src.taskgraph as taskgraph
 from src.data_handler import get_logbook_data
 
 
@@ -15,46 +17,51 @@ utils.set_custom_page_config("Balance Analysis")
 
 st.title("⚖️ Time Balance Analysis")
 
+# Range of the balance score trend; weekly stats always use the last 30 days
+TREND_RANGES = {"Last 30 days": 30, "Last 90 days": 90, "Last year": 365, "All time": None}
+trend_range = st.sidebar.selectbox("Trend range", list(TREND_RANGES), index=0)
+trend_days = TREND_RANGES[trend_range]
+
 # Load and prepare data
 today = datetime.now()
+trend_start = today - timedelta(days=trend_days) if trend_days else None
 try:
-    df, _ = get_logbook_data()
+    # Only the years covering the trend range (and the last 30 days for the weekly stats)
+    df, _ = get_logbook_data(start_date=min(trend_start, today - timedelta(days=30)) if trend_start else None)
 except Exception as e:
     st.error(f"Error loading data: {str(e)}")
     st.stop()
 
 # Get active time-based fields
-active_fields = config.get_active_fields()
-time_columns = [field for field in active_fields if active_fields[field]["type"] == "time"]
+time_columns = config.get_active_time_fields()
 if "Inne" in time_columns:
     time_columns.remove("Inne")
     time_columns.insert(0, "Inne")
 
-# Filter data for different time periods
-df_last_7_days = df[df['Data'] >= (today - timedelta(days=7))]
-df_previous_7_days = df[(df['Data'] >= (today - timedelta(days=14))) & (df['Data'] < (today - timedelta(days=7)))]
-df_last_30_days = df[df['Data'] >= (today - timedelta(days=30))]
-
-# Calculate daily balance scores for the last 30 days
-daily_scores = []
-dates = []
-na_days = []
-for date in pd.date_range(df_last_30_days['Data'].min(), today):
-    day_data = df_last_30_days[df_last_30_days['Data'].dt.date == date.date()]
-    if not day_data.empty:
-        time_activities = day_data[time_columns].iloc[0]
-        score = analytics.calculate_balance_score(time_activities)
-        daily_scores.append(score)
-        dates.append(date)
-        na_days.append(score is None)
-
-# Convert to numpy arrays for easier manipulation
-dates = np.array(dates)
-daily_scores = np.array(daily_scores, dtype=float)
-na_days = np.array(na_days)
-
-# Create mask for non-NA days
-valid_days = ~na_days
+# Independent datasets run concurrently; results are shared per data snapshot
+page_data = taskgraph.run_tasks([
+    # Current week, for the distribution pie
+    taskgraph.Task("last_7_days", lambda: analytics.filter_date_range(df, end_date=today, delta_days=7), key=("last_7_days", today.date())),
+    # Daily balance scores are memoized for the loaded snapshot; slice the trend range
+    taskgraph.Task(
+        "balance_scores",
+        lambda: analytics.slice_date_range(metrics.get_balance_scores(time_columns, df), trend_start, today),
+        key=("balance_scores", trend_days, today.date(), tuple(time_columns))
+    ),
+    taskgraph.Task(
+        "trend_figure",
+        lambda scores: charts.build_balance_trend_figure(scores['Data'].to_numpy(), scores['score'].to_numpy(), scores['is_na'].to_numpy()),
+        deps=("balance_scores",),
+        key=("trend_figure", trend_days, today.date(), tuple(time_columns))
+    ),
+], version=df.attrs.get("snapshot_version"))
+
+df_last_7_days = page_data["last_7_days"]
+balance_scores = page_data["balance_scores"]
+
+dates = balance_scores['Data'].to_numpy()
+daily_scores = balance_scores['score'].to_numpy()
+na_days = balance_scores['is_na'].to_numpy()
 
 # Weekly average scores calculation (excluding NA days)
 current_week_scores = [s for s, na in zip(daily_scores[-7:], na_days[-7:]) if not na]
@@ -89,78 +96,18 @@ with col2:
     
     # Only create pie chart if there's data
     if total_time.sum() > 0:
-        fig_pie = go.Figure(data=[go.Pie(
-            labels=time_columns,
-            values=total_time,
-            marker_colors=[config.get_column_colors().get(col, '#808080') for col in time_columns]
-        )])
-        
-        fig_pie.update_layout(
-            showlegend=True,
-            height=300
-        )
+        fig_pie = charts.build_distribution_pie(time_columns, total_time, config.get_column_colors())
         
-        st.plotly_chart(fig_pie, use_container_width=True)
+        with perf.timed("Balance: render pie chart"):
+            st.plotly_chart(fig_pie, use_container_width=True)
     else:
         st.info("No data available for the current week")
 
 # Balance Score Trend
 st.subheader("Balance Score Trend")
-fig_trend = go.Figure()
-
-# Add grey bars for NA days
-for date, is_na in zip(dates, na_days):
-    if is_na:
-        fig_trend.add_trace(go.Bar(
-            x=[date],
-            y=[100],
-            marker=dict(
-                color='rgba(200,200,200,0.3)',
-                pattern=dict(
-                    shape="/",
-                    bgcolor="rgba(220,220,220,0.3)",
-                    solidity=0.5
-                )
-            ),
-            width=24*60*60*1000,  # One day width in milliseconds
-            name='NA Day',
-            showlegend=False,
-            hovertext='No data available'
-        ))
-
-# Add balance score line (only for non-NA days)
-fig_trend.add_trace(go.Scatter(
-    x=dates[valid_days],
-    y=daily_scores[valid_days],
-    mode='lines+markers',
-    name='Daily Balance Score',
-    line=dict(color='#47ff2f', width=2),
-    connectgaps=False  # Don't connect over NA days
-))
-
-# Add 7-day moving average (excluding NA days)
-valid_scores = pd.Series(daily_scores)
-valid_scores[na_days] = np.nan
-moving_avg = valid_scores.rolling(7, min_periods=1).mean()
-
-fig_trend.add_trace(go.Scatter(
-    x=dates,
-    y=moving_avg,
-    mode='lines',
-    name='7-day Average',
-    line=dict(color='#ff9f1c', width=2, dash='dash'),
-    connectgaps=True
-))
-
-fig_trend.update_layout(
-    xaxis_title="Date",
-    yaxis_title="Balance Score",
-    yaxis=dict(range=[0, 100]),
-    hovermode='x unified',
-    height=400
-)
-
-st.plotly_chart(fig_trend, use_container_width=True)
+fig_trend = page_data["trend_figure"]
+with perf.timed("Balance: render trend chart"):
+    st.plotly_chart(fig_trend, use_container_width=True)
 
 # Daily breakdown table
 st.subheader("Daily Balance Details")
@@ -171,3 +118,8 @@ daily_breakdown = pd.DataFrame({
 
 daily_breakdown['Balance Score'] = daily_breakdown['Balance Score'].round(1)
 st.dataframe(daily_breakdown, use_container_width=True)
+
+utils.show_performance_panel(
+    {"last 7 days": df_last_7_days, "balance scores": balance_scores},
+    base=[df, metrics.get_balance_scores(time_columns, df)]
+)
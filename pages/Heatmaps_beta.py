@@ -3,10 +3,12 @@ import streamlit.components.v1 as components
 import pandas as pd
 import os
 import json
-from datetime import datetime, timedelta
 
 import src.utils as utils
 import src.config as config
+import src.perf as perf
+import src.taskgraph as taskgraph
+import src.payloads as payloads
 from src.data_handler import get_logbook_data
 
 # Set page config
@@ -16,17 +18,12 @@ utils.set_custom_page_config("Habit Heatmaps (beta)")
 try:
     df, loaded_path = get_logbook_data()
     
-    # Check if 'Data' column exists and set it as index
-    if 'Data' in df.columns:
-        df = df.set_index('Data')
-    
 except Exception as e:
     st.error(f"Error loading data: {str(e)}")
     st.stop()
 
 # Define habits to track and their grouping
-ROW1_HABITS = ['Anki', 'Pamiętnik', 'YNAB']
-ROW2_HABITS = ['YouTube', 'Gitara', 'Czytanie']
+ROW1_HABITS, ROW2_HABITS = config.HEATMAP_ROWS
 HABITS = ROW1_HABITS + ROW2_HABITS
 
 # Check if the dataframe has any entries
@@ -44,89 +41,14 @@ if missing_habits:
     ROW2_HABITS = [h for h in ROW2_HABITS if h not in missing_habits]
     HABITS = ROW1_HABITS + ROW2_HABITS
 
-# Convert duration habits to binary based on 20-minute threshold while preserving NA values
-for habit in ROW2_HABITS:
-    if habit in df.columns:  # Only process if column exists
-        # Create a new binary column that properly handles NA values
-        df[f'{habit}_binary'] = pd.Series([
-            1.0 if not pd.isna(value) and value >= 20 else 
-            0.0 if not pd.isna(value) and value < 20 else 
-            None  # Keep NA values as None
-            for value in df[habit]
-        ], index=df.index)
-
-def prepare_habit_data(habit, is_duration=False):
-    """Prepare habit data for heatmap visualization."""
-    if is_duration:
-        habit_col = f'{habit}_binary'
-    else:
-        habit_col = habit
-    
-    # Get dates from dataframe - ensure we have a datetime index
-    if df.index.dtype == 'datetime64[ns]':
-        # Index is datetime - format it properly for JS
-        dates = df.index.strftime('%Y-%m-%d').tolist()
-    else:
-        # If not a datetime index but we have Data column
-        if 'Data' in df.columns:
-            dates = df['Data'].dt.strftime('%Y-%m-%d').tolist()
-        else:
-            # Otherwise just convert index to string
-            dates = df.index.astype(str).tolist()
-    
-    # Get habit values and convert to completed/not completed
-    values = df[habit_col].tolist()
-    
-    # Create days data array
-    days_data = []
-    for i, date in enumerate(dates):
-        # Check for NaN, NA strings, or any indication of not applicable
-        if pd.isna(values[i]) or (isinstance(values[i], str) and values[i].upper() == 'NA'):
-            # Use null to indicate NA in JavaScript
-            completed = None
-        elif is_duration:
-            # For duration habits, consider binary value (which is already properly processed)
-            completed = bool(values[i] >= 1)
-        else:
-            # For binary habits, any non-zero value is completed
-            completed = bool(values[i] >= 1)
-        
-        days_data.append({
-            "date": date,
-            "completed": completed
-        })
-    
-    return {
-        "name": habit,
-        "emoji": config.HABITS_CONFIG[habit]['emoji'],
-        "color": config.HABITS_CONFIG[habit]['color'],
-        "daysData": days_data
-    }
-
-# Create data for habit heatmaps
-habits_data = []
-
-# Process binary habits - with error handling
-for habit in ROW1_HABITS:
-    try:
-        if habit in df.columns:  # Only process if column exists
-            habit_data = prepare_habit_data(habit, is_duration=False)
-            habits_data.append(habit_data)
-        else:
-            st.warning(f"Skipping {habit} - column not found in data")
-    except Exception as e:
-        st.error(f"Error processing {habit}: {str(e)}")
-
-# Process duration habits - with error handling
-for habit in ROW2_HABITS:
-    try:
-        if habit in df.columns and f"{habit}_binary" in df.columns:  # Only process if columns exist
-            habit_data = prepare_habit_data(habit, is_duration=True)
-            habits_data.append(habit_data)
-        else:
-            st.warning(f"Skipping {habit} - column or binary column not found in data")
-    except Exception as e:
-        st.error(f"Error processing {habit}: {str(e)}")
+# Create compact data for habit heatmaps: a start date plus one packed tri-state
+# array per habit (done / not done / NA), decoded by the heatmap component
+# Each row of heatmaps is built concurrently and shared per data snapshot
+page_data = taskgraph.run_tasks([
+    taskgraph.Task("row1", lambda: payloads.habit_days_payload(df, ROW1_HABITS), key=("heatmap_payload", tuple(ROW1_HABITS))),
+    taskgraph.Task("row2", lambda: payloads.habit_days_payload(df, ROW2_HABITS), key=("heatmap_payload", tuple(ROW2_HABITS))),
+], version=df.attrs.get("snapshot_version"))
+habits_data = page_data["row1"] + page_data["row2"]
 
 # Page header
 st.title("📊 Habit Heatmaps (Beta)")
@@ -144,33 +66,31 @@ except Exception as e:
     st.stop()
 
 # Replace the placeholder with actual habits data
-html_content = html_template.replace('HABITS_DATA_PLACEHOLDER', json.dumps(habits_data))
+html_content = html_template.replace('HABITS_DATA_PLACEHOLDER', json.dumps(habits_data, separators=(',', ':')))
 
 # Add debug information if needed
 if st.checkbox("Show debug information"):
     st.write("DataFrame columns:", df.columns.tolist())
     st.write("DataFrame index type:", df.index.dtype)
     st.write("Habits_data sample (first habit):", habits_data[0] if habits_data else "No data")
-    st.write("First 5 dates in data:", df.index[:5] if not df.empty else "No data")
+    st.write("First 5 dates in data:", df['Data'].head(5) if not df.empty else "No data")
+    st.write("Heatmap payload size:", f"{len(html_content) - len(html_template)} bytes")
     
-    # Check if the habits exist in the dataframe
-    for habit in HABITS:
-        habit_exists = habit in df.columns
-        binary_exists = f"{habit}_binary" in df.columns if habit in ROW2_HABITS else "N/A"
-        st.write(f"Habit '{habit}' exists in df: {habit_exists}, Binary column exists: {binary_exists}")
-        
-        # Show sample values for debugging
-        if habit in df.columns:
-            if habit in ROW2_HABITS and f"{habit}_binary" in df.columns:
-                sample = pd.DataFrame({
-                    'original': df[habit].head(5),
-                    'binary': df[f'{habit}_binary'].head(5)
-                })
-                st.write(f"Sample values for {habit}:", sample)
+    # Show sample values for debugging
+    for habit, habit_data in zip(HABITS, habits_data):
+        sample = pd.DataFrame({
+            'original': df[habit].head(5),
+            'state': payloads.decode_tristate(habit_data['states'], 5)
+        })
+        st.write(f"Sample values for {habit}:", sample)
 
 # Display the HTML component with increased height
-components.html(html_content, height=1000, scrolling=False)
+with perf.timed("Heatmaps: render component") as span:
+    span.bytes = len(html_content.encode())
+    components.html(html_content, height=1000, scrolling=False)
 
 # Add a warning if no data is being displayed
-if not habits_data or not any(len(habit.get('daysData', [])) > 0 for habit in habits_data):
-    st.warning("No habit data found to display in heatmaps. Please check your data source.")
\ No newline at end of file
+if not habits_data or not any(habit['days'] > 0 for habit in habits_data):
+    st.warning("No habit data found to display in heatmaps. Please check your data source.")
+
+utils.show_performance_panel(base=df)
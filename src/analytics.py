@@ -2,6 +2,63 @@ import datetime as dt
 import pandas as pd
 import numpy as np
 
+import src.perf as perf
+
+def _is_date_indexed(df):
+    """True if the frame has the sorted DatetimeIndex produced by preprocessing."""
+    return isinstance(df.index, pd.DatetimeIndex) and df.index.is_monotonic_increasing
+
+def slice_date_range(df, start_date=None, end_date=None):
+    """
+    Return the rows between start_date and end_date (both inclusive).
+    
+    Uses binary search on a date-indexed frame, so the cost does not grow with history.
+    
+    Args:
+        df (pd.DataFrame): Date-indexed DataFrame (see data_handler.to_daily_calendar)
+        start_date (datetime, optional): First day to include. Defaults to the first row.
+        end_date (datetime, optional): Last day to include. Defaults to the last row.
+        
+    Returns:
+        pd.DataFrame: View of the rows in the range
+    """
+    if not _is_date_indexed(df):
+        mask = pd.Series(True, index=df.index)
+        if start_date is not None:
+            mask &= df['Data'] >= pd.Timestamp(start_date)
+        if end_date is not None:
+            mask &= df['Data'] <= pd.Timestamp(end_date)
+        return df[mask]
+    
+    start = 0 if start_date is None else df.index.searchsorted(pd.Timestamp(start_date), side='left')
+    end = len(df) if end_date is None else df.index.searchsorted(pd.Timestamp(end_date), side='right')
+    return df.iloc[start:end]
+
+@perf.instrument()
+def get_calendar_window(df, start_date, end_date):
+    """
+    Return one row per day from start_date to end_date (inclusive), with NA rows
+    for days outside the logged data, e.g. today before it has been filled in.
+    The slice is found by binary search; only the window itself is copied.
+    
+    Args:
+        df (pd.DataFrame): Date-indexed DataFrame
+        start_date (datetime): First day of the window
+        end_date (datetime): Last day of the window
+        
+    Returns:
+        pd.DataFrame: Window with a complete daily index and 'Data' column
+    """
+    calendar = pd.date_range(pd.Timestamp(start_date).normalize(), pd.Timestamp(end_date).normalize(), freq='D')
+    window = slice_date_range(df, calendar[0], calendar[-1]) if len(calendar) else df.iloc[0:0]
+    
+    # Reindexing a 30-row slice is cheap and gives the caller its own frame to add columns to
+    window = window.reindex(calendar)
+    window['Data'] = window.index
+    
+    return window
+
+@perf.instrument()
 def filter_date_range(df, end_date=None, delta_days=7, offset_days=0):
     """
     Filter DataFrame for a specific date range with optional offset.
@@ -24,16 +81,37 @@ def filter_date_range(df, end_date=None, delta_days=7, offset_days=0):
     
     # Apply offset to end date
     end_date = end_date - pd.Timedelta(days=offset_days)
+    start_date = end_date - pd.Timedelta(days=delta_days)
+    
+    # Filtered period: (start_date, end_date]
+    if _is_date_indexed(df):
+        start = df.index.searchsorted(start_date, side='right')
+        end = df.index.searchsorted(end_date, side='right')
+        return df.iloc[start:end]
     
-    # Filtered period
     filtered_date_range = df[
-        (df['Data'] > (end_date - pd.Timedelta(days=delta_days))) &
+        (df['Data'] > start_date) &
         (df['Data'] <= end_date)
     ]
     
     return filtered_date_range
 
-def get_last_n_valid_days(df, n=7, date_column='Data', value_column='Razem'):
+def _last_valid_positions(values, end, n):
+    """
+    Positions of the last n non-NA values before position end.
+    
+    Scans backwards in growing chunks, so only the recent part of the history is touched.
+    """
+    chunk = max(2 * n, 16)
+    while True:
+        start = max(0, end - chunk)
+        positions = start + np.flatnonzero(values.iloc[start:end].notna().to_numpy())
+        if len(positions) >= n or start == 0:
+            return positions[-n:] if n > 0 else positions[:0]
+        chunk *= 2
+
+@perf.instrument()
+def get_last_n_valid_days(df, n=7, date_column='Data', value_column='Razem', before_date=None):
     """
     Get the last n valid days (excluding NA days) from a DataFrame.
     
@@ -42,10 +120,18 @@ def get_last_n_valid_days(df, n=7, date_column='Data', value_column='Razem'):
         n (int): Number of valid days to retrieve
         date_column (str): Name of the date column
         value_column (str): Name of the value column to check for NA values
+        before_date (datetime, optional): Only consider days strictly before this date
         
     Returns:
         pd.DataFrame: DataFrame containing the last n valid days
     """
+    if _is_date_indexed(df):
+        end = len(df) if before_date is None else df.index.searchsorted(pd.Timestamp(before_date), side='left')
+        return df.iloc[_last_valid_positions(df[value_column], end, n)]
+    
+    if before_date is not None:
+        df = df[df[date_column] < pd.Timestamp(before_date)]
+    
     # Sort by date descending
     sorted_df = df.sort_values(date_column, ascending=False)
     
@@ -58,6 +144,25 @@ def get_last_n_valid_days(df, n=7, date_column='Data', value_column='Razem'):
     # Sort back by date ascending
     return result_df.sort_values(date_column, ascending=True)
 
+@perf.instrument()
+def get_previous_n_valid_days(df, window, n=7, date_column='Data', value_column='Razem'):
+    """
+    Get the n valid days right before a window, e.g. to compare a week with the previous one.
+    
+    Args:
+        df (pd.DataFrame): DataFrame containing date and value columns
+        window (pd.DataFrame): The current window; its earliest date bounds the search
+        n (int): Number of valid days to retrieve
+        date_column (str): Name of the date column
+        value_column (str): Name of the value column to check for NA values
+        
+    Returns:
+        pd.DataFrame: DataFrame containing the previous n valid days
+    """
+    if window.empty:
+        return df.iloc[0:0]
+    return get_last_n_valid_days(df, n, date_column, value_column, before_date=window[date_column].min())
+
 def calculate_balance_score(time_data):
     """
     Calculate balance score based on time distribution across activities.
@@ -95,4 +200,88 @@ def calculate_balance_score(time_data):
     # Convert to score where 0 variance = 100 and max variance = 0
     score = 100 * (1 - variance/max_variance)
     
-    return max(0, min(100, score))  # Ensure score is between 0 and 100
\ No newline at end of file
+    return max(0, min(100, score))  # Ensure score is between 0 and 100
+
+@perf.instrument()
+def calculate_balance_scores(df, time_columns, date_column='Data'):
+    """
+    Calculate the balance score of every day at once.
+    
+    Vectorized equivalent of calling calculate_balance_score on each row.
+    
+    Args:
+        df (pd.DataFrame): DataFrame containing the date column and time columns
+        time_columns (list): Activity columns to balance
+        date_column (str): Name of the date column
+    
+    Returns:
+        pd.DataFrame: date column, 'score' (NaN on NA days) and 'is_na' per day
+    """
+    values = df[time_columns].to_numpy(dtype=float, na_value=np.nan)
+    is_na = np.isnan(values).all(axis=1)
+    
+    # NA activities count as zero minutes, as in the single-day version
+    values = np.nan_to_num(values, nan=0.0)
+    totals = values.sum(axis=1)
+    
+    n = len(time_columns)
+    ideal_proportion = 1.0 / n
+    max_variance = (1 - 1/n)**2 + (n-1)*(0 - 1/n)**2
+    
+    with np.errstate(invalid='ignore', divide='ignore'):
+        proportions = values / totals[:, np.newaxis]
+        variance = np.sum((proportions - ideal_proportion) ** 2, axis=1)
+        scores = np.clip(100 * (1 - variance/max_variance), 0, 100)
+    
+    scores = np.where(totals == 0, 0.0, scores)
+    scores[is_na] = np.nan
+    
+    return pd.DataFrame({
+        date_column: df[date_column].to_numpy(),
+        'score': scores,
+        'is_na': is_na
+    }, index=df.index)
+
+def _percent_change(current, previous):
+    """Percentage change, 0 when there is nothing to compare against."""
+    return (current - previous) / previous * 100 if previous != 0 else 0
+
+@perf.instrument()
+def calculate_weekly_stats(df, n=7, value_column='Razem'):
+    """
+    Compare the last n valid days with the n valid days before them.
+    
+    Args:
+        df (pd.DataFrame): DataFrame containing 'Data' and value columns
+        n (int): Number of valid days per period
+        value_column (str): Name of the value column (minutes)
+    
+    Returns:
+        dict or None: 'avg_daily', 'most_productive_day' and 'total_hours', each with
+        'value' and 'change' (%), plus the current period's dates; None without data
+    """
+    current = get_last_n_valid_days(df, n, value_column=value_column)
+    if current.empty:
+        return None
+    previous = get_previous_n_valid_days(df, current, n, value_column=value_column)
+    
+    avg_total = current[value_column].mean()
+    most_productive_day = current.loc[current[value_column].idxmax()]
+    total_hours = current[value_column].sum() / 60
+    
+    avg_total_prev = previous[value_column].mean() if not previous.empty else 0
+    most_productive_day_prev = previous[value_column].max() if not previous.empty else 0
+    total_hours_prev = previous[value_column].sum() / 60 if not previous.empty else 0
+    
+    return {
+        "avg_daily": {"value": float(avg_total), "change": float(_percent_change(avg_total, avg_total_prev))},
+        "most_productive_day": {
+            "value": float(most_productive_day[value_column]),
+            "change": float(_percent_change(most_productive_day[value_column], most_productive_day_prev)),
+            "date": pd.Timestamp(most_productive_day['Data']).strftime('%Y-%m-%d')
+        },
+        "total_hours": {"value": float(total_hours), "change": float(_percent_change(total_hours, total_hours_prev))},
+        "period_start": pd.Timestamp(current['Data'].min()).strftime('%Y-%m-%d'),
+        "period_end": pd.Timestamp(current['Data'].max()).strftime('%Y-%m-%d'),
+        "days": n
+    }
@@ -0,0 +1,230 @@
+import os
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+from fastapi import Body, FastAPI, HTTPException, Query, Request
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import FileResponse, Response
+
+import src.config as config
+import src.analytics as analytics
+import src.data_handler as data_handler
+import src.journal as journal
+import src.metrics as metrics
+import src.payloads as payloads
+import src.streaks as streaks
+
+# JSON API over the same snapshot and calculations as the Streamlit pages.
+# Run with: uvicorn src.api:app --port 8000
+
+# Origins allowed to read the API from a browser, comma separated; none by default. The HTML
+# assets served below are same-origin and need no entry. Cross-origin writes are never allowed,
+# since POST /api/entries has no authentication.
+CORS_ORIGINS_ENV = 'LOGBOOK_API_CORS_ORIGINS'
+ASSETS_DIR = 'assets'
+ASSET_FILES = ('analytics-cards.html', 'habit-cards.html', 'habit-heatmap.html')
+
+# Minutes are float32 in the snapshot; round them (and everything derived) for the JSON
+JSON_FLOAT_DECIMALS = 4
+
+# Serialized bodies per ETag, so a response is only encoded once per snapshot
+_BODY_CACHE_SIZE = 64
+_body_cache = OrderedDict()
+_body_cache_lock = threading.Lock()
+
+app = FastAPI(title="Logbook API")
+app.add_middleware(GZipMiddleware, minimum_size=500)
+_cors_origins = [origin.strip() for origin in os.environ.get(CORS_ORIGINS_ENV, '').split(',') if origin.strip()]
+if _cors_origins:
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=_cors_origins,
+        allow_methods=["GET"],
+        allow_headers=["If-None-Match"],
+        expose_headers=["ETag"],
+    )
+
+def _snapshot():
+    """Return the current full-history snapshot and its version."""
+    try:
+        df, path = data_handler.get_logbook_data()
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    return df, path, df.attrs.get("snapshot_version")
+
+def _iso(value):
+    return None if pd.isna(value) else pd.Timestamp(value).strftime('%Y-%m-%d')
+
+def _records(df: pd.DataFrame) -> list[dict]:
+    """Frame rows as JSON-ready dicts: dates as YYYY-MM-DD, NA as null."""
+    df = df.copy()
+    for column in df.columns:
+        if pd.api.types.is_datetime64_any_dtype(df[column]):
+            df[column] = df[column].dt.strftime('%Y-%m-%d')
+    return json.loads(df.to_json(orient='records'))
+
+def _round_floats(value):
+    """Round every float in a JSON-ready structure, so float32 noise like 143.14285278320312 stays out."""
+    if isinstance(value, float):
+        return round(value, JSON_FLOAT_DECIMALS)
+    if isinstance(value, dict):
+        return {key: _round_floats(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_round_floats(item) for item in value]
+    return value
+
+def _json_response(request: Request, version: str, key: tuple, build) -> Response:
+    """
+    Answer with the JSON built for (snapshot version, key), honouring If-None-Match.
+
+    The ETag changes whenever the data snapshot (or the day) changes; unchanged
+    data gets a 304 without building or serializing anything.
+    """
+    digest = hashlib.blake2b(repr((version, key)).encode(), digest_size=8).hexdigest()
+    etag = f'"{digest}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*":
+        return Response(status_code=304, headers=headers)
+
+    with _body_cache_lock:
+        body = _body_cache.get(etag)
+        if body is not None:
+            _body_cache.move_to_end(etag)
+    if body is None:
+        body = json.dumps(_round_floats(build()), ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        with _body_cache_lock:
+            _body_cache[etag] = body
+            while len(_body_cache) > _BODY_CACHE_SIZE:
+                _body_cache.popitem(last=False)
+
+    return Response(content=body, media_type="application/json", headers=headers)
+
+def _time_columns() -> list[str]:
+    return config.get_active_time_fields()
+
+@app.get("/api/health")
+def health():
+    return {"status": "ok"}
+
+@app.get("/api/weekly-stats")
+def weekly_stats(request: Request, days: int = Query(7, ge=1, le=90)):
+    """Last `days` valid days compared with the `days` before them, plus the analytics cards."""
+    df, _, version = _snapshot()
+
+    def build():
+        stats = analytics.calculate_weekly_stats(df, days)
+        return {"stats": stats, "cards": payloads.weekly_stats_cards(stats) if stats else []}
+    return _json_response(request, version, ("weekly-stats", days, str(pd.Timestamp.now().date())), build)
+
+@app.get("/api/weekly-stats/cards")
+def weekly_stats_cards(request: Request):
+    """The analytics-cards component data."""
+    df, _, version = _snapshot()
+
+    def build():
+        stats = analytics.calculate_weekly_stats(df, 7)
+        return payloads.weekly_stats_cards(stats) if stats else []
+    return _json_response(request, version, ("weekly-stats-cards", str(pd.Timestamp.now().date())), build)
+
+@app.get("/api/daily")
+def daily(request: Request, start: str = None, end: str = None):
+    """Daily minutes per activity with the 7-day SMA/EMA; defaults to the last 30 days."""
+    df, _, version = _snapshot()
+    try:
+        end_date = pd.Timestamp(end).normalize() if end else pd.Timestamp.now().normalize()
+        start_date = pd.Timestamp(start).normalize() if start else end_date - pd.Timedelta(days=30)
+    except ValueError:
+        raise HTTPException(status_code=422, detail="start and end must be dates (YYYY-MM-DD)")
+    if start_date > end_date:
+        raise HTTPException(status_code=422, detail="start must not be after end")
+
+    def build():
+        window = analytics.get_calendar_window(df, start_date, end_date)
+        columns = [col for col in _time_columns() + ['Razem'] if col in window.columns]
+        rolling = metrics.get_rolling_metrics(df).reindex(window.index)
+        result = window[['Data'] + columns].assign(sma7=rolling['Razem_sma7'], ema7=rolling['Razem_ema7'])
+        return _records(result)
+    return _json_response(request, version, ("daily", str(start_date.date()), str(end_date.date())), build)
+
+@app.get("/api/streaks")
+def streak_cards(request: Request):
+    """Current and longest streaks, and the habit-cards component data."""
+    df, path, version = _snapshot()
+    habits = [habit for row in config.STREAK_CARD_ROWS for habit in row]
+
+    def build():
+        states, dates = streaks.habit_state_matrix(df, habits)
+        table = streaks.incremental_streaks_from_states(states, dates, habits, streaks.get_state_path(path))
+        return {
+            "streaks": [
+                {
+                    "habit": habit,
+                    "current_streak": int(row.current_streak),
+                    "longest_streak": int(row.longest_streak),
+                    "current_start": _iso(row.current_start),
+                    "current_end": _iso(row.current_end),
+                    "longest_start": _iso(row.longest_start),
+                    "longest_end": _iso(row.longest_end),
+                }
+                for habit, row in table.iterrows()
+            ],
+            "cards": payloads.habit_cards_payload(states, dates, habits, table, config.PERSONAL_HABITS),
+        }
+    return _json_response(request, version, ("streaks", tuple(habits)), build)
+
+@app.get("/api/balance")
+def balance(request: Request, days: int = Query(30, ge=1, le=3660)):
+    """Daily balance scores for the last `days` days."""
+    df, _, version = _snapshot()
+    end_date = pd.Timestamp.now().normalize()
+    start_date = end_date - pd.Timedelta(days=days)
+
+    def build():
+        scores = analytics.slice_date_range(metrics.get_balance_scores(_time_columns(), df), start_date, end_date)
+        return _records(scores)
+    return _json_response(request, version, ("balance", days, str(end_date.date())), build)
+
+@app.get("/api/heatmaps")
+def heatmaps(request: Request, habits: str = None):
+    """The habit-heatmap component data; `habits` is a comma-separated subset."""
+    df, _, version = _snapshot()
+    selected = [h.strip() for h in habits.split(',')] if habits else [h for row in config.HEATMAP_ROWS for h in row]
+    unknown = [h for h in selected if h not in config.HABITS_CONFIG]
+    if unknown:
+        raise HTTPException(status_code=404, detail=f"Unknown habits: {', '.join(unknown)}")
+
+    return _json_response(request, version, ("heatmaps", tuple(selected)), lambda: payloads.habit_days_payload(df, selected))
+
+@app.post("/api/entries", status_code=201)
+def log_entry(request: Request, payload: dict = Body(...)):
+    """
+    Log values for one day into the journal, e.g. {"values": {"Anki": 1, "YouTube": 30}}.
+
+    An optional "date" (YYYY-MM-DD, default today) picks the day. The values show up
+    in every endpoint (with new ETags) right away. Only JSON bodies are accepted: unlike
+    a plain form post, other web pages can't send those without a CORS preflight.
+    """
+    if request.headers.get("content-type", "").split(";")[0].strip() != "application/json":
+        raise HTTPException(status_code=415, detail="Entries must be sent as application/json")
+    values = payload.get("values")
+    if not isinstance(values, dict):
+        raise HTTPException(status_code=422, detail="'values' must be an object of habit values")
+    try:
+        return journal.log_entry(values, date=payload.get("date"))
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+@app.get("/assets/{name}")
+def asset(name: str):
+    """The HTML components, which load their data from this API when opened with ?api=."""
+    if name not in ASSET_FILES:
+        raise HTTPException(status_code=404, detail="Not found")
+    return FileResponse(os.path.join(ASSETS_DIR, name), media_type="text/html")
@@ -0,0 +1,201 @@
+import numpy as np
+import pandas as pd
+
+import src.perf as perf
+
+# One day in milliseconds, the bar width on date axes
+DAY_WIDTH_MS = 24*60*60*1000
+
+def _graph_objects():
+    """Import plotly on first use; it is the slowest import of the dashboard."""
+    import plotly.graph_objects as go
+    return go
+
+def na_days_trace(dates, height, hoverinfo=None):
+    """
+    Build a single grey, hatched bar trace covering all NA days.
+
+    Args:
+        dates (array-like): Dates of the NA days
+        height (float): Bar height, usually the top of the y-axis
+        hoverinfo (str, optional): Plotly hoverinfo setting
+
+    Returns:
+        go.Bar: One trace, whatever the number of NA days
+    """
+    go = _graph_objects()
+    dates = list(dates)
+    return go.Bar(
+        x=dates,
+        y=[height] * len(dates),
+        marker=dict(
+            color='rgba(200,200,200,0.3)',
+            pattern=dict(
+                shape="/",
+                bgcolor="rgba(220,220,220,0.3)",
+                solidity=0.5
+            )
+        ),
+        width=DAY_WIDTH_MS,
+        name='NA Day',
+        showlegend=False,
+        hovertext='No data available',
+        hoverinfo=hoverinfo
+    )
+
+@perf.instrument()
+def build_daily_activity_figure(window_df, time_columns, column_colors, start_date, end_date):
+    """
+    Build the stacked daily activity chart with its moving averages.
+
+    Args:
+        window_df (pd.DataFrame): One row per day with 'Data', time columns, 'Razem',
+            '7_day_sma' and '7_day_ema'
+        time_columns (list): Activities to stack, one trace each
+        column_colors (dict): Activity colors
+        start_date (datetime): First day of the window
+        end_date (datetime): Last day of the window
+
+    Returns:
+        go.Figure: Figure with one trace per series, independent of the number of days
+    """
+    go = _graph_objects()
+    fig = go.Figure()
+
+    # Use a reasonable default height for NA bars if no data is available
+    max_height = window_df['Razem'].max()
+    if pd.isna(max_height) or max_height == 0:
+        max_height = 300
+
+    # First add grey bars for NA days
+    na_mask = window_df['Razem'].isna()
+    if na_mask.any():
+        fig.add_trace(na_days_trace(window_df.loc[na_mask, 'Data'], max_height, hoverinfo='text'))
+
+    # Then plot regular bars in normal order
+    for column in time_columns:
+        fig.add_trace(go.Bar(
+            x=window_df['Data'],
+            y=window_df[column].fillna(0),  # Replace NaN values with 0 for plotting
+            name=column,
+            marker_color=column_colors.get(column, None),  # Use None if color not specified
+            hovertemplate='%{x|%Y-%m-%d}<br>%{y} min<extra></extra>' if column != 'Inne' else None
+        ))
+
+    # Add trend lines on top
+    fig.add_trace(go.Scatter(
+        x=window_df['Data'],
+        y=window_df['7_day_sma'],
+        mode='lines',
+        name='7-day SMA',
+        line=dict(width=2, dash='dot', color='#47ff2f'),
+        hovertemplate='7-day SMA: %{y:.1f} min<extra></extra>'
+    ))
+    fig.add_trace(go.Scatter(
+        x=window_df['Data'],
+        y=window_df['7_day_ema'],
+        mode='lines',
+        name='7-day EMA',
+        line=dict(width=2, dash='solid', color='#ff47af'),
+        hovertemplate='7-day EMA: %{y:.1f} min<extra></extra>'
+    ))
+
+    fig.update_layout(
+        barmode='stack',
+        xaxis_title="Date",
+        yaxis_title="Minutes",
+        legend_title="Activity",
+        xaxis=dict(
+            tickformat="%Y-%m-%d",
+            range=[start_date - pd.Timedelta(days=0.5), end_date + pd.Timedelta(days=0.5)],  # Add padding to ensure all bars are fully visible
+            type='date'
+        ),
+        transition_duration=500,  # Add transition animation when data changes
+        transition=dict(
+            easing='cubic-in-out'
+        )
+    )
+
+    return fig
+
+@perf.instrument()
+def build_balance_trend_figure(dates, daily_scores, na_days):
+    """
+    Build the balance score trend chart with its 7-day average.
+
+    Args:
+        dates (np.ndarray): Days of the trend
+        daily_scores (np.ndarray): Balance score per day, NaN on NA days
+        na_days (np.ndarray): Boolean NA-day flags
+
+    Returns:
+        go.Figure: Figure with one trace per series, independent of the number of days
+    """
+    go = _graph_objects()
+    fig = go.Figure()
+    valid_days = ~na_days
+
+    # Add grey bars for NA days
+    if na_days.any():
+        fig.add_trace(na_days_trace(dates[na_days], 100))
+
+    # Add balance score line (only for non-NA days)
+    fig.add_trace(go.Scatter(
+        x=dates[valid_days],
+        y=daily_scores[valid_days],
+        mode='lines+markers',
+        name='Daily Balance Score',
+        line=dict(color='#47ff2f', width=2),
+        connectgaps=False  # Don't connect over NA days
+    ))
+
+    # Add 7-day moving average (excluding NA days)
+    valid_scores = pd.Series(daily_scores, dtype=float)
+    valid_scores[na_days] = np.nan
+    moving_avg = valid_scores.rolling(7, min_periods=1).mean()
+
+    fig.add_trace(go.Scatter(
+        x=dates,
+        y=moving_avg,
+        mode='lines',
+        name='7-day Average',
+        line=dict(color='#ff9f1c', width=2, dash='dash'),
+        connectgaps=True
+    ))
+
+    fig.update_layout(
+        xaxis_title="Date",
+        yaxis_title="Balance Score",
+        yaxis=dict(range=[0, 100]),
+        hovermode='x unified',
+        height=400
+    )
+
+    return fig
+
+@perf.instrument()
+def build_distribution_pie(labels, values, column_colors):
+    """
+    Build the time distribution pie chart.
+
+    Args:
+        labels (list): Activity names
+        values (array-like): Total minutes per activity
+        column_colors (dict): Activity colors, grey for unknown ones
+
+    Returns:
+        go.Figure: Pie chart figure
+    """
+    go = _graph_objects()
+    fig = go.Figure(data=[go.Pie(
+        labels=labels,
+        values=values,
+        marker_colors=[column_colors.get(label, '#808080') for label in labels]
+    )])
+
+    fig.update_layout(
+        showlegend=True,
+        height=300
+    )
+
+    return fig
@@ -1,74 +1,216 @@
 import os
+import time
+import hashlib
+import threading
 from datetime import datetime
+from collections import OrderedDict
+from types import SimpleNamespace
 
-import streamlit as st
-from anthropic import Anthropic
+import numpy as np
 import pandas as pd
 
+import src.config as config
+import src.streaks as streaks
+
+MODEL = "claude-3-5-haiku-latest"
+MAX_TOKENS = 750
+
+# Context sent with the prompt: days encoded one line each, the aggregate window and a hard size cap
+CONTEXT_DAYS = 14
+CONTEXT_WINDOW_DAYS = 30
+MAX_CONTEXT_CHARS = 2500
+CHARS_PER_TOKEN = 4
+
+# Set LOGBOOK_ADVICE_STUB=1 to answer from a local stub instead of the API
+ADVICE_STUB_ENV = 'LOGBOOK_ADVICE_STUB'
+
+# Advice for the same context is reused for a day; only a few contexts are kept
+ADVICE_TTL_SECONDS = 24 * 60 * 60
+ADVICE_CACHE_SIZE = 8
+
+_client = None
+_client_lock = threading.Lock()
+
+_advice_cache = OrderedDict()
+_inflight = {}
+_advice_lock = threading.Lock()
+
+
+class _StubStream:
+    """Mimics the SDK's MessageStream: a context manager with a text_stream iterator."""
+
+    def __init__(self, text, delay):
+        self._text = text
+        self._delay = delay
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    @property
+    def text_stream(self):
+        for word in self._text.split(" "):
+            time.sleep(self._delay)
+            yield word + " "
+
+
+class _StubMessages:
+    def __init__(self, delay):
+        self._delay = delay
+        self.calls = 0
+
+    def _reply(self, messages):
+        self.calls += 1
+        digest = hashlib.blake2b(messages[-1]["content"].encode(), digest_size=4).hexdigest()
+        return (
+            "### Stub advice\n\n"
+            f"This is a local stub response for prompt `{digest}`. "
+            "*Pick one small task and finish it before lunch.*"
+        )
+
+    def create(self, model, max_tokens, messages, **kwargs):
+        return SimpleNamespace(content=[SimpleNamespace(text=self._reply(messages))])
+
+    def stream(self, model, max_tokens, messages, **kwargs):
+        return _StubStream(self._reply(messages), self._delay)
+
+
+class StubClient:
+    """Local stand-in for the Anthropic client, for development and tests."""
+
+    def __init__(self, delay: float = 0.02):
+        self.messages = _StubMessages(delay)
+
 
 def get_claude_client():
-    """Initialize Claude client with API key."""
-    try:
-        api_key = os.environ["ANTHROPIC_KEY"]
-        
-        if not api_key:
-            raise ValueError("ANTHROPIC_KEY not found in environment")
+    """Return the Claude client of this process, creating it on first use."""
+    global _client
+
+    with _client_lock:
+        if _client is not None:
+            return _client
+
+        if os.environ.get(ADVICE_STUB_ENV):
+            _client = StubClient()
+            return _client
+
+        try:
+            api_key = os.environ["ANTHROPIC_KEY"]
             
-        return Anthropic(api_key=api_key)
-        
-    except Exception as e:
-        print(f"Failed to initialize Claude client: {str(e)}")
-        return None
+            if not api_key:
+                raise ValueError("ANTHROPIC_KEY not found in environment")
+            
+            # Imported on first use: the SDK is slow to import and only needed for advice
+            from anthropic import Anthropic
+            _client = Anthropic(api_key=api_key)
+            return _client
+            
+        except Exception as e:
+            print(f"Failed to initialize Claude client: {str(e)}")
+            return None
+
+def _time_habits(df: pd.DataFrame) -> list[str]:
+    return [habit for habit, props in config.get_active_fields().items() if props["type"] == "time" and habit in df.columns]
+
+def _streak_habits(df: pd.DataFrame) -> list[str]:
+    return [
+        habit for habit, props in config.get_active_fields().items()
+        if props["type"] in ("binary", "time") and (habit in df.columns or config.get_completion_column(habit) in df.columns)
+    ]
+
+def _fit_budget(header: list[str], day_lines: list[str], max_chars: int) -> str:
+    """Join the context, dropping the oldest day lines (then truncating) until it fits max_chars."""
+    day_lines = list(day_lines)
+    text = "\n".join(header + day_lines)
+    while len(text) > max_chars and day_lines:
+        day_lines.pop(0)
+        text = "\n".join(header + day_lines)
+    return text[:max_chars]
 
-def generate_context(df: pd.DataFrame):
-    """Generate context about recent activities for Claude."""
+def generate_context(df: pd.DataFrame, days: int = CONTEXT_DAYS, max_chars: int = MAX_CONTEXT_CHARS) -> str:
+    """
+    Build a compact, deterministic summary of recent activity for the advice prompt.
+
+    Only the time and habit columns declared in HABITS_CONFIG are encoded, so the size
+    depends on the configuration and `days`, never on extra logbook columns; the result
+    is capped at max_chars by dropping the oldest day lines.
+
+    Args:
+        df (pd.DataFrame): Preprocessed logbook frame with a 'Data' column, one row per day
+        days (int): Number of most recent days encoded one line each
+        max_chars (int): Hard cap on the context length
+
+    Returns:
+        str: Context text
+    """
     today = datetime.now()
-    today_weekday = today.strftime("%A")
-    is_weekend = today.weekday() >= 5
-    
-    last_7_days = df.tail(7)
-    last_30_days = df.tail(30)
-    
-    # Check if 'Data' column exists for date information
-    if 'Data' in df.columns:
-        # Create day-specific insights
-        weekday_avg = last_30_days[~last_30_days['Data'].dt.weekday.isin([5, 6])]['Razem'].mean()
-        weekend_avg = last_30_days[last_30_days['Data'].dt.weekday.isin([5, 6])]['Razem'].mean()
-        
-        # Get same weekday average from past data
-        same_weekday_data = last_30_days[last_30_days['Data'].dt.weekday == today.weekday()]
-        same_weekday_avg = same_weekday_data['Razem'].mean() if not same_weekday_data.empty else 0
-    else:
-        # Fallback if no date column exists
-        weekday_avg = last_30_days['Razem'].mean()
-        weekend_avg = weekday_avg
-        same_weekday_avg = weekday_avg
-    
-    context = (
-        f"Based on the last 7 days of activity data:\n"
-        f"Average daily productive time: {last_7_days['Razem'].mean():.0f} minutes\n"
-        f"Most productive day: {last_7_days['Razem'].max():.0f} minutes\n"
-        f"Least productive day: {last_7_days['Razem'].min():.0f} minutes\n\n"
-        f"Productivity patterns:\n"
-        f"Weekday average: {weekday_avg:.0f} minutes\n"
-        f"Weekend average: {weekend_avg:.0f} minutes\n"
-        f"Average for {today_weekday}s: {same_weekday_avg:.0f} minutes\n\n"
-        f"Today is {today.strftime('%Y-%m-%d')}, a {today_weekday} {'(weekend)' if is_weekend else '(weekday)'}"
-    )
-    return context
+    if df.empty:
+        return f"No activity data available. Today is {today:%Y-%m-%d} ({today:%A})."
 
-def get_advice(df: pd.DataFrame) -> str:
-    """Get personalized advice from Claude based on recent activity."""
-    try:
-        client = get_claude_client()
-        if client is None:
-            return "Error: Could not initialize Claude client. Check your API key."
-            
-        context = generate_context(df)
-        if context is None:
-            return "Error: Could not generate context from data."
-        
-        prompt = f"""
+    time_columns = _time_habits(df)
+    habits = _streak_habits(df)
+    window = df.tail(CONTEXT_WINDOW_DAYS)
+
+    # One pass over the 30-day window: per-activity aggregates and weekday/weekend averages
+    minutes = window[time_columns + ['Razem']].astype(float)
+    last_7 = minutes.tail(7)
+    averages_7 = last_7.mean()
+    averages_30 = minutes.mean()
+    active_days = (last_7 > 0).sum()
+    is_weekend = window['Data'].dt.weekday.to_numpy() >= 5
+    weekend_avg, weekday_avg = minutes['Razem'][is_weekend].mean(), minutes['Razem'][~is_weekend].mean()
+
+    # One state matrix serves both the streaks and the per-day habit encoding
+    states, dates = streaks.habit_state_matrix(df, habits)
+    streak_table = streaks.streaks_from_states(states, dates, habits)
+
+    def number(value):
+        return "-" if pd.isna(value) else f"{value:.0f}"
+
+    header = [
+        f"Today: {today:%Y-%m-%d} {today:%a} ({'weekend' if today.weekday() >= 5 else 'weekday'})",
+        f"Minutes/day, 30d: weekday avg {number(weekday_avg)}, weekend avg {number(weekend_avg)}",
+        "Activity: avg 7d | avg 30d | active days of last 7",
+    ]
+    header += [
+        f"{column}: {number(averages_7[column])} | {number(averages_30[column])} | {active_days[column]}"
+        for column in time_columns + ['Razem']
+    ]
+    header.append("Streaks (current/best): " + ", ".join(
+        f"{habit} {row.current_streak}/{row.longest_streak}" for habit, row in streak_table.iterrows()
+    ))
+    header.append(f"Last {days} days: date weekday Razem [{'/'.join(time_columns)}] habit codes")
+    header.append("Habit code order: " + ", ".join(habits) + " (1 done, 0 missed, - no data)")
+
+    # Dense per-day lines: totals, minutes per activity and one character per habit
+    recent = df.tail(days)
+    recent_minutes = recent[time_columns + ['Razem']].astype(float).to_numpy()
+    symbols = np.array(['-', '0', '1'])
+    habit_codes = ["".join(column) for column in symbols[states[:, -len(recent):] + 1].T] if habits else [""] * len(recent)
+    day_lines = []
+    for date, values, codes in zip(recent['Data'], recent_minutes, habit_codes):
+        if np.isnan(values[-1]):
+            day_lines.append(f"{date:%m-%d %a} NA")
+        else:
+            day_lines.append(f"{date:%m-%d %a} {values[-1]:.0f} [{'/'.join(number(v) for v in values[:-1])}] {codes}")
+
+    return _fit_budget(header, day_lines, max_chars)
+
+def context_budget(context: str, max_chars: int = MAX_CONTEXT_CHARS) -> dict:
+    """Report the size of a context: characters, estimated tokens (~4 chars each) and the cap."""
+    return {
+        "chars": len(context),
+        "approx_tokens": -(-len(context) // CHARS_PER_TOKEN),
+        "max_chars": max_chars,
+        "max_tokens": -(-max_chars // CHARS_PER_TOKEN),
+    }
+
+def build_prompt(df: pd.DataFrame) -> str:
+    """Build the advice prompt around the compact activity context."""
+    context = generate_context(df)
+    return f"""
         You are a productivity coach analyzing my daily activity data.
         I am logging extra activities such as YouTube content creation, reading, upskilling at my job as AI Data Scientist, reading books and others.
         I track various habits such as financial planning with YNAB, daily journaling and more.
@@ -77,9 +219,6 @@ def get_advice(df: pd.DataFrame) -> str:
         Here's the context:
         {context}
 
-        Heres the raw data from last 14 days:
-        {df.tail(14).to_string()}
-        
         Based on this data, please provide:
         1. A brief analysis of my productivity patterns
         2. Specific, personalized advice for today and the upcoming days
@@ -92,18 +231,126 @@ def get_advice(df: pd.DataFrame) -> str:
         Reply in markdown format. Use headings and occasional emphasis for readability.
         Be motivational but realistic - acknowledge both progress and areas for improvement.
         """
-        
-        response = client.messages.create(
-            model="claude-3-5-haiku-latest",
-            max_tokens=750,
+
+def advice_key(prompt: str) -> str:
+    """Cache key for a prompt: the context and data window it contains, plus the model settings."""
+    return hashlib.blake2b(f"{MODEL}|{MAX_TOKENS}|{prompt}".encode(), digest_size=16).hexdigest()
+
+def clear_advice_cache():
+    """Forget all cached advice."""
+    with _advice_lock:
+        _advice_cache.clear()
+
+
+def _store_advice(key: str, text: str):
+    """Cache an answer, dropping expired ones and the oldest past ADVICE_CACHE_SIZE. Call with the lock held."""
+    now = time.time()
+    for expired in [k for k, (created, _) in _advice_cache.items() if now - created >= ADVICE_TTL_SECONDS]:
+        del _advice_cache[expired]
+    _advice_cache[key] = (now, text)
+    _advice_cache.move_to_end(key)
+    while len(_advice_cache) > ADVICE_CACHE_SIZE:
+        _advice_cache.popitem(last=False)
+
+
+class _InflightRequest:
+    """One API call whose text chunks can be read by any number of waiting callers."""
+
+    def __init__(self):
+        self.chunks = []
+        self.done = False
+        self.error = None
+        self.condition = threading.Condition()
+
+    def append(self, chunk):
+        with self.condition:
+            self.chunks.append(chunk)
+            self.condition.notify_all()
+
+    def finish(self, error=None):
+        with self.condition:
+            self.error = error
+            self.done = True
+            self.condition.notify_all()
+
+    def iter_chunks(self):
+        position = 0
+        while True:
+            with self.condition:
+                while position == len(self.chunks) and not self.done:
+                    self.condition.wait()
+                chunks = self.chunks[position:]
+                done = self.done
+            yield from chunks
+            position += len(chunks)
+            if done and position == len(self.chunks):
+                return
+
+
+def _request_advice(key: str, prompt: str, request: _InflightRequest):
+    """Stream one answer from the API into request, then cache the full text."""
+    try:
+        client = get_claude_client()
+        if client is None:
+            raise RuntimeError("Could not initialize Claude client. Check your API key.")
+
+        with client.messages.stream(
+            model=MODEL,
+            max_tokens=MAX_TOKENS,
             temperature=0.7,
             messages=[{"role": "user", "content": prompt}]
-        )
-        
-        if not response or not response.content:
-            return "Error: Received empty response from Claude"
-            
-        return response.content[0].text
-        
+        ) as stream:
+            for text in stream.text_stream:
+                request.append(text)
+
+        if not request.chunks:
+            raise RuntimeError("Received empty response from Claude")
+
+        with _advice_lock:
+            _store_advice(key, "".join(request.chunks))
+        request.finish()
+
+    except Exception as e:
+        print(f"Error in Claude communication: {str(e)}")
+        request.finish(e)
+
+    finally:
+        with _advice_lock:
+            _inflight.pop(key, None)
+
+def stream_advice(df: pd.DataFrame):
+    """
+    Yield personalized advice as it is generated, e.g. for st.write_stream.
+
+    Answers are cached per context and data window for ADVICE_TTL_SECONDS, and
+    concurrent requests for the same prompt (several tabs) share one API call.
+    """
+    prompt = build_prompt(df)
+    key = advice_key(prompt)
+
+    with _advice_lock:
+        cached = _advice_cache.get(key)
+        if cached is not None and time.time() - cached[0] < ADVICE_TTL_SECONDS:
+            request = None
+        else:
+            cached = None
+            request = _inflight.get(key)
+            if request is None:
+                request = _inflight[key] = _InflightRequest()
+                # Run the call on its own thread so it completes even if this viewer goes away
+                threading.Thread(target=_request_advice, args=(key, prompt, request), name="advice-request", daemon=True).start()
+
+    if cached is not None:
+        yield cached[1]
+        return
+
+    yield from request.iter_chunks()
+    if request.error is not None:
+        yield f"\n\nError in Claude communication: {str(request.error)}"
+
+def get_advice(df: pd.DataFrame) -> str:
+    """Get personalized advice from Claude based on recent activity."""
+    try:
+        return "".join(stream_advice(df))
     except Exception as e:
-        return f"Error in Claude communication: {str(e)}"
\ No newline at end of file
+        return f"Error in Claude communication: {str(e)}"
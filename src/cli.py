@@ -0,0 +1,41 @@
+import os
+import sys
+import time
+import argparse
+import datetime as dt
+
+import src.snapshot as snapshot
+
+DEFAULT_OUTPUT_DIR = os.path.join('data', 'snapshots')
+
+def _parse_date(value):
+    try:
+        return dt.datetime.strptime(value, '%Y-%m-%d')
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid date '{value}', expected YYYY-MM-DD")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m src.cli",
+        description="Precompute all dashboard metrics and export them as a versioned snapshot."
+    )
+    parser.add_argument("--start", type=_parse_date, help="First day of the daily table and heatmaps (YYYY-MM-DD)")
+    parser.add_argument("--end", type=_parse_date, help="Last day (YYYY-MM-DD), defaults to today")
+    parser.add_argument("--out", default=DEFAULT_OUTPUT_DIR, help=f"Output directory (default: {DEFAULT_OUTPUT_DIR})")
+    args = parser.parse_args(argv)
+
+    if args.start and args.end and args.start > args.end:
+        parser.error("--start must not be after --end")
+
+    start = time.perf_counter()
+    try:
+        snapshot_dir = snapshot.write_snapshot(args.out, args.start, args.end)
+    except Exception as e:
+        print(f"Error exporting snapshot: {str(e)}")
+        return 1
+
+    print(f"Snapshot written to {snapshot_dir} in {time.perf_counter() - start:.2f}s")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
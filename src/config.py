@@ -1,15 +1,24 @@
 # Constants
 TIME_COLUMNS = ["Tech + Praca", "YouTube", "Czytanie", "Gitara", "Inne", "Razem"]
 WEEKDAY_ORDER = ['PONIEDZIAŁEK', 'WTOREK', 'ŚRODA', 'CZWARTEK', 'PIĄTEK', 'SOBOTA', 'NIEDZIELA']
-FILENAME = "Logbook 2025.xlsx"
+# Yearly logbook files, each converted into its own partition
+FILENAME_PATTERN = r"^Logbook (\d{4})\.xlsx$"
+
+# Maximum number of preprocessed logbook snapshots kept in memory per process
+LOGBOOK_CACHE_SIZE = 4
+
+# Where the logbook is read from: "file" (Excel partitions) or "sqlite" (embedded
+# database next to them, kept in sync with the Excel files). LOGBOOK_STORAGE_BACKEND overrides it.
+STORAGE_BACKEND = "file"
+SQLITE_FILENAME = "logbook.sqlite"
 
 # Define the fields and their properties
 HABITS_CONFIG = {
-    "Tech + Praca": {"color": "#21d3ed", "active": True, "emoji": "💻", "type": "time"},
-    "YouTube": {"color": "#c085fd", "active": True, "emoji": "🎥", "type": "time"},
-    "Czytanie": {"color": "#fbbf23", "active": True, "emoji": "📚", "type": "time"},
-    "Gitara": {"color": "#c41a36", "active": True, "emoji": "🎸", "type": "time"},
-    "Inne": {"color": "#94a3b8", "active": True, "emoji": "🔧", "type": "time"},
+    "Tech + Praca": {"color": "#21d3ed", "active": True, "emoji": "💻", "type": "time", "threshold": 20},
+    "YouTube": {"color": "#c085fd", "active": True, "emoji": "🎥", "type": "time", "threshold": 20},
+    "Czytanie": {"color": "#fbbf23", "active": True, "emoji": "📚", "type": "time", "threshold": 20},
+    "Gitara": {"color": "#c41a36", "active": True, "emoji": "🎸", "type": "time", "threshold": 20},
+    "Inne": {"color": "#94a3b8", "active": True, "emoji": "🔧", "type": "time", "threshold": 20},
     "20min clean": {"color": "#ff6b6b", "active": True, "emoji": "🧹", "type": "binary"},
     "YNAB": {"color": "#ffcc00", "active": True, "emoji": "💰", "type": "binary"},
     "Anki": {"color": "#00ccff", "active": True, "emoji": "🧠", "type": "binary"},
@@ -24,10 +33,38 @@ HABITS_CONFIG = {
     "Cronometer": {"color": "#00cc00", "active": True, "emoji": "⌚", "type": "binary"}
 }
 
+# Habit cards on the Streaks page, three rows of three, and the ones blurred as personal
+STREAK_CARD_ROWS = [
+    ['Anki', 'Cronometer', 'YNAB'],
+    ['YouTube', 'Gitara', 'Czytanie'],
+    ['No porn', 'No 9gag', '20min clean'],
+]
+PERSONAL_HABITS = ['No porn']
+
+# Habits on the Heatmaps page, one list per row
+HEATMAP_ROWS = [
+    ['Anki', 'Pamiętnik', 'YNAB'],
+    ['YouTube', 'Gitara', 'Czytanie'],
+]
+
 # Function to get active fields
 def get_active_fields():
     return {field: props for field, props in HABITS_CONFIG.items() if props["active"]}
 
+def get_active_time_fields():
+    """Return the active habits measured in minutes, in config order"""
+    return [field for field, props in get_active_fields().items() if props["type"] == "time"]
+
+def get_completion_column(habit):
+    """Return the column holding a habit's done/not done flag after preprocessing"""
+    if HABITS_CONFIG.get(habit, {}).get("type") == "time":
+        return f"{habit}_done"
+    return habit
+
+def get_completion_threshold(habit):
+    """Return the value from which a habit counts as done (minutes for time habits)"""
+    return HABITS_CONFIG.get(habit, {}).get("threshold", 1)
+
 def get_column_colors():
     """Return color mapping for specific columns"""
     return {field: props["color"] for field, props in HABITS_CONFIG.items() if "color" in props}
@@ -1,101 +1,419 @@
 import os
+import re
+import time
+import hashlib
+import threading
 import datetime as dt
+from collections import Counter, OrderedDict
 import pandas as pd
-from datetime import datetime
-import streamlit as st
 
 import src.config as config
+import src.perf as perf
 
-def get_data_paths(filename: str = config.FILENAME):
-    """Return possible data file paths."""
+# Process-wide cache of preprocessed logbook snapshots, shared by all sessions.
+# Keyed by (resolved partition paths, their mtime_ns/size, today) so an edited file or a new day
+# invalidates the entry; the oldest snapshots are evicted past the size cap.
+_logbook_cache = OrderedDict()
+_logbook_cache_lock = threading.Lock()
+_logbook_cache_stats = {"hits": 0, "stale_hits": 0, "misses": 0, "evictions": 0}
+# Partition sets currently being rebuilt, with the number of threads building each
+_logbook_builds = Counter()
+
+# Typed columnar cache written next to each Excel file. Bump the version whenever
+# _coerce_logbook_types changes so existing caches get rebuilt.
+CACHE_EXTENSION = '.feather'
+CACHE_SCHEMA_VERSION = 2
+CACHE_SCHEMA_KEY = b'logbook_schema_version'
+NA_VALUES = ['', ' ', 'NA', 'na', 'Na', 'nA']
+
+# Incremental ingestion: each cached row carries the hash of its sheet row, and the
+# cache is tagged with the header it was built from
+ROW_HASH_COLUMN = '_row_hash'
+INGEST_HEADER_KEY = 'logbook_header'
+_ingest_reports = {}
+
+# Data directory resolution: an optional override, and the directory that last worked.
+# Its file list is reused for a while, and listed again sooner when a listed file vanished.
+DATA_DIR_ENV = 'LOGBOOK_DATA_DIR'
+NETWORK_PROBE_TIMEOUT_SECONDS = 2.0
+DISCOVERY_TTL_SECONDS = 30.0
+_resolved_data_dir = None
+_discovered_files = {}
+_discovered_at = 0.0
+_resolve_lock = threading.Lock()
+
+def get_data_dirs():
+    """Return possible data directories, or only LOGBOOK_DATA_DIR when it is set."""
+    override = os.environ.get(DATA_DIR_ENV)
+    if override:
+        return [override]
     return [
-        os.path.join('data', filename),  # Local development path
-        os.path.join('/app/data', filename),  # Docker container path
-        os.path.join('Z:\\personal-logs\\data', filename),  # Network drive path
-        os.path.join('\\\\NAS\\personal-logs\\data', filename),  # Alternative network path
+        'data',  # Local development path
+        '/app/data',  # Docker container path
+        'Z:\\personal-logs\\data',  # Network drive path
+        '\\\\NAS\\personal-logs\\data',  # Alternative network path
     ]
 
-def load_logbook_data(filename: str = config.FILENAME):
-    """Load the logbook data from the first available path."""
-    data_paths = get_data_paths(filename)
-    
-    for path in data_paths:
+def _is_network_path(path: str) -> bool:
+    """True for UNC paths and Windows drive letters, which may hang when unreachable."""
+    return path.startswith('\\\\') or re.match(r'^[A-Za-z]:', path) is not None
+
+def _list_logbook_files(data_dir: str) -> dict[int, str]:
+    """Return {year: path} for the `Logbook YYYY.xlsx` files in one directory."""
+    pattern = re.compile(config.FILENAME_PATTERN)
+    files = {}
+    for name in os.listdir(data_dir):
+        match = pattern.match(name)
+        if match:
+            files[int(match.group(1))] = os.path.join(data_dir, name)
+    return dict(sorted(files.items()))
+
+def _probe_data_dir(data_dir: str) -> dict[int, str]:
+    """List a directory's logbook files, giving up on network locations after a timeout."""
+    if not _is_network_path(data_dir):
         try:
-            if os.path.exists(path):
-                csv_path = path.replace('.xlsx', '.csv')
-                
-                # Check if Excel file is newer than CSV or if CSV doesn't exist
-                excel_modified = os.path.getmtime(path) if os.path.exists(path) else 0
-                csv_modified = os.path.getmtime(csv_path) if os.path.exists(csv_path) else 0
-                
-                # If Excel is newer or CSV doesn't exist, convert Excel to CSV
-                if excel_modified > csv_modified or not os.path.exists(csv_path):
-                    print(f"Converting Excel to CSV: {path} -> {csv_path}")
-                    
-                    # First get column names to set up converters
-                    columns = pd.read_excel(path, nrows=0).columns
-                    
-                    # Create converters for all columns to handle "NA" strings properly
-                    converters = {col: lambda x: None if pd.isna(x) or (isinstance(x, str) and x.upper() == 'NA') else x for col in columns}
-                    
-                    # Read from Excel with proper NA handling
-                    excel_df = pd.read_excel(
-                        path, 
-                        keep_default_na=True, 
-                        na_values=['', ' '],
-                        converters=converters
-                    )
-                    
-                    # Ensure numeric columns preserve actual NA values
-                    numeric_cols = excel_df.select_dtypes(include=['float64', 'int64']).columns
-                    for col in numeric_cols:
-                        excel_df[col] = pd.to_numeric(excel_df[col], errors='coerce')
-                    
-                    # Save to CSV with the same NA handling
-                    excel_df.to_csv(csv_path, index=False)
-                
-                # Read from CSV with consistent NA handling
-                df = pd.read_csv(csv_path, keep_default_na=True, na_values=['', ' ', 'NA', 'na'])
-                
-                # Apply the same numeric handling as with Excel
-                numeric_cols = df.select_dtypes(include=['float64', 'int64']).columns
-                for col in numeric_cols:
-                    df[col] = pd.to_numeric(df[col], errors='coerce')
-                
-                return df, path
-            
-        except Exception as e:
-            print(f"Error loading file {path}: {str(e)}")
+            return _list_logbook_files(data_dir)
+        except OSError:
+            return {}
+
+    result = {}
+    def probe():
+        try:
+            result.update(_list_logbook_files(data_dir))
+        except OSError:
+            pass
+
+    # A stalled network probe is abandoned; the daemon thread exits whenever the OS gives up
+    thread = threading.Thread(target=probe, name="logbook-path-probe", daemon=True)
+    thread.start()
+    thread.join(NETWORK_PROBE_TIMEOUT_SECONDS)
+    if thread.is_alive():
+        print(f"Timed out probing data directory {data_dir} after {NETWORK_PROBE_TIMEOUT_SECONDS}s")
+        return {}
+    return dict(result)
+
+def get_resolved_data_dir():
+    """Return the data directory that was last found to hold the logbook files, if any."""
+    return _resolved_data_dir
+
+def discover_logbook_files() -> dict[int, str]:
+    """
+    Return {year: path} for every `Logbook YYYY.xlsx` in the resolved data directory.
+
+    The first candidate directory that has any logbook files is remembered for the
+    whole process; the others are only probed again once it stops having them. Its
+    file list is reused for DISCOVERY_TTL_SECONDS, or until forget_logbook_files.
+    """
+    global _resolved_data_dir, _discovered_files, _discovered_at
+
+    with _resolve_lock:
+        if _resolved_data_dir is not None and _resolved_data_dir in get_data_dirs():
+            if _discovered_files and time.monotonic() - _discovered_at < DISCOVERY_TTL_SECONDS:
+                return dict(_discovered_files)
+
+            files = _probe_data_dir(_resolved_data_dir)
+            if files:
+                _discovered_files, _discovered_at = files, time.monotonic()
+                return dict(files)
+            print(f"Data directory {_resolved_data_dir} no longer has logbook files, probing again")
+        _resolved_data_dir, _discovered_files = None, {}
+
+        start = time.perf_counter()
+        for data_dir in get_data_dirs():
+            files = _probe_data_dir(data_dir)
+            if files:
+                _resolved_data_dir = data_dir
+                _discovered_files, _discovered_at = files, time.monotonic()
+                print(f"Resolved data directory {data_dir} in {(time.perf_counter() - start) * 1000:.1f} ms")
+                return dict(files)
+
+        print(f"No data directory found after {(time.perf_counter() - start) * 1000:.1f} ms")
+        return {}
+
+def forget_logbook_files():
+    """Make the next discover_logbook_files list the data directory again, e.g. after a listed file vanished."""
+    global _discovered_at
+    with _resolve_lock:
+        _discovered_at = 0.0
+
+def select_partitions(files: dict[int, str], start_date=None, end_date=None) -> dict[int, str]:
+    """Keep only the year partitions that overlap [start_date, end_date]."""
+    first_year = pd.Timestamp(start_date).year if start_date is not None else None
+    last_year = pd.Timestamp(end_date).year if end_date is not None else None
+    return {
+        year: path for year, path in files.items()
+        if (first_year is None or year >= first_year) and (last_year is None or year <= last_year)
+    }
+
+def get_cache_path(path: str) -> str:
+    """Return the columnar cache path that sits next to an Excel logbook."""
+    return os.path.splitext(path)[0] + CACHE_EXTENSION
+
+def to_completion_flags(values: pd.Series, threshold: float) -> pd.Series:
+    """Nullable boolean flags: True from `threshold`, False below it, <NA> for NA days."""
+    if pd.api.types.is_bool_dtype(values):
+        return values.astype("boolean")
+    values = pd.to_numeric(values, errors='coerce')
+    return (values >= threshold).astype("boolean").mask(values.isna())
+
+def _coerce_logbook_types(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Convert raw Excel values into the typed cache schema.
+
+    The schema is kept compact, since every cached snapshot stays resident: minutes are
+    float32 (NA days rule out unsigned ints), binary habits nullable booleans, and
+    WEEKDAY and description columns categoricals.
+    """
+    df = df.copy()
+
+    if 'Data' in df.columns and not pd.api.types.is_datetime64_any_dtype(df['Data']):
+        dates = pd.to_datetime(df['Data'], format='%d.%m.%Y', errors='coerce')
+        if dates.isna().all():
+            dates = pd.to_datetime(df['Data'], errors='coerce')
+        df['Data'] = dates
+
+    for col in df.columns:
+        if col in ('Data', 'WEEKDAY'):
             continue
+
+        habit_type = config.HABITS_CONFIG.get(col, {}).get("type")
+        if habit_type == "description":
+            # Few distinct values repeated over years of days: store each one once
+            df[col] = df[col].astype("string").astype("category")
+        elif habit_type == "binary":
+            df[col] = to_completion_flags(df[col], config.get_completion_threshold(col))
+        elif col in config.TIME_COLUMNS or habit_type == "time":
+            df[col] = pd.to_numeric(df[col], errors='coerce').astype("float32")
+        elif df[col].dtype == object:
+            # Unknown columns: keep them numeric only if nothing is lost in the conversion
+            values = pd.to_numeric(df[col], errors='coerce')
+            if values.notna().sum() == df[col].notna().sum():
+                df[col] = values
+            else:
+                df[col] = df[col].astype("string")
+
+    if 'WEEKDAY' in df.columns:
+        weekdays = df['WEEKDAY'].astype("string").str.strip().str.upper()
+        extra = sorted(set(weekdays.dropna()) - set(config.WEEKDAY_ORDER))
+        df['WEEKDAY'] = pd.Categorical(weekdays, categories=config.WEEKDAY_ORDER + extra)
+
+    return df
+
+def _restore_categoricals(df: pd.DataFrame) -> pd.DataFrame:
+    """Re-intern the categorical columns a concat of frames with different categories left as objects."""
+    columns = [
+        col for col in df.columns
+        if df[col].dtype == object and (col == 'WEEKDAY' or config.HABITS_CONFIG.get(col, {}).get("type") == "description")
+    ]
+    if columns:
+        coerced = _coerce_logbook_types(df[columns])
+        df = df.copy(deep=False)
+        for col in columns:
+            df[col] = coerced[col]
+    return df
+
+def write_columnar_cache(df: pd.DataFrame, cache_path: str, metadata: dict = None, schema_version: int = CACHE_SCHEMA_VERSION):
+    """Write a frame as an uncompressed Feather file tagged with the schema version and extra metadata."""
+    import pyarrow as pa
+    import pyarrow.feather as feather
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    schema_metadata = dict(table.schema.metadata or {})
+    schema_metadata[CACHE_SCHEMA_KEY] = str(schema_version).encode()
+    for key, value in (metadata or {}).items():
+        schema_metadata[key.encode()] = str(value).encode()
+    table = table.replace_schema_metadata(schema_metadata)
+
+    # Write next to the target and swap in, so readers never see a partial file
+    tmp_path = f"{cache_path}.tmp"
+    feather.write_feather(table, tmp_path, compression='uncompressed')
+    os.replace(tmp_path, cache_path)
+
+def read_columnar_cache(cache_path: str, metadata: dict = None, schema_version: int = CACHE_SCHEMA_VERSION):
+    """Read a Feather cache, or return None if it is missing or its schema version/metadata differ."""
+    import pyarrow.feather as feather
+
+    if not os.path.exists(cache_path):
+        return None
+
+    table = feather.read_table(cache_path, memory_map=True)
+    schema_metadata = table.schema.metadata or {}
+    if schema_metadata.get(CACHE_SCHEMA_KEY) != str(schema_version).encode():
+        print(f"Ignoring cache with outdated schema: {cache_path}")
+        return None
+    for key, value in (metadata or {}).items():
+        if schema_metadata.get(key.encode()) != str(value).encode():
+            return None
+
+    return table.to_pandas()
+
+def _read_excel_rows(path: str) -> tuple[list[str], list[tuple]]:
+    """Stream the first sheet of a workbook in read-only mode; return (header, rows of raw values)."""
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = next(rows, ())
+        # Same names pandas gives unnamed columns
+        header = [str(name) if name is not None else f"Unnamed: {i}" for i, name in enumerate(header)]
+
+        na_values = set(NA_VALUES)
+        data = []
+        for row in rows:
+            row = tuple(None if isinstance(value, str) and value.strip() in na_values else value for value in row)
+            if any(value is not None for value in row):
+                data.append(row[:len(header)] + (None,) * (len(header) - len(row)))
+        return header, data
+    finally:
+        workbook.close()
+
+def _row_hash(row: tuple) -> int:
+    return int.from_bytes(hashlib.blake2b(repr(row).encode(), digest_size=8).digest(), 'little', signed=True)
+
+def get_ingest_report(path: str = None):
+    """Return the last ingestion report for a workbook, or all of them."""
+    if path is None:
+        return dict(_ingest_reports)
+    return _ingest_reports.get(os.path.realpath(path))
+
+def ingest_excel(path: str, cache_path: str) -> pd.DataFrame:
+    """
+    Bring the columnar cache of a workbook up to date, converting only the rows that changed.
+
+    Every sheet row is hashed as read. Rows whose hash is already in the cache keep their
+    typed values; only new or edited rows go through type conversion. A different header
+    (or cache schema version) means the cache is rebuilt from scratch.
+    """
+    start = time.perf_counter()
+    header, rows = _read_excel_rows(path)
+    hashes = [_row_hash(row) for row in rows]
+    header_hash = hashlib.blake2b(repr(header).encode(), digest_size=8).hexdigest()
+
+    previous = None
+    if os.path.exists(cache_path):
+        try:
+            previous = read_columnar_cache(cache_path, {INGEST_HEADER_KEY: header_hash})
+        except Exception as e:
+            print(f"Error reading cache {cache_path}: {str(e)}")
+    if previous is not None and ROW_HASH_COLUMN not in previous.columns:
+        previous = None
+
+    known = set(previous[ROW_HASH_COLUMN]) if previous is not None else set()
+    fresh_positions = [i for i, row_hash in enumerate(hashes) if row_hash not in known]
+
+    # Type conversion only for the rows that are new or changed
+    fresh = pd.DataFrame([rows[i] for i in fresh_positions], columns=header)
+    fresh = _coerce_logbook_types(fresh)
+    fresh[ROW_HASH_COLUMN] = pd.array([hashes[i] for i in fresh_positions], dtype="int64")
+
+    if previous is None:
+        df = fresh
+        removed = pd.Series([], dtype="datetime64[ns]")
+    else:
+        current = set(hashes)
+        removed = previous.loc[~previous[ROW_HASH_COLUMN].isin(current), 'Data']
+        kept = previous[previous[ROW_HASH_COLUMN].isin(current)]
+        # Empty frames and all-NA columns would otherwise take part in (and, from pandas 3,
+        # change) the result dtypes: leave them out, and give all-NA columns the cached dtype
+        if not kept.empty and not fresh.empty:
+            fresh = fresh.astype({col: kept[col].dtype for col in fresh.columns
+                                  if col in kept.columns and fresh[col].isna().all()})
+            kept = kept.astype({col: fresh[col].dtype for col in kept.columns
+                                if col in fresh.columns and kept[col].isna().all()})
+        frames = [frame for frame in (kept, fresh) if not frame.empty]
+        combined = pd.concat(frames, ignore_index=True) if len(frames) > 1 else (frames[0] if frames else kept)
+        combined = combined.drop_duplicates(ROW_HASH_COLUMN)
+        # Restore sheet order (and repeated identical rows)
+        df = _restore_categoricals(combined.set_index(ROW_HASH_COLUMN).loc[hashes].reset_index()[combined.columns])
+        # Compared by name: categoricals differing only in their categories are fine
+        if not df.dtypes.astype(str).equals(previous.dtypes.astype(str)):
+            df = _coerce_logbook_types(df)
+
+    if previous is None or fresh_positions or not removed.empty:
+        write_columnar_cache(df, cache_path, {INGEST_HEADER_KEY: header_hash})
+    else:
+        # Nothing changed, but the cache must look fresh next to the newer workbook
+        os.utime(cache_path)
+
+    updated = int(fresh['Data'].isin(removed).sum()) if previous is not None else 0
+    report = {
+        "rows": len(rows),
+        "inserted": len(fresh_positions) - updated,
+        "updated": updated,
+        "deleted": max(len(removed) - updated, 0),
+        "unchanged": len(rows) - len(fresh_positions),
+        "full_rebuild": previous is None,
+        "seconds": time.perf_counter() - start,
+    }
+    _ingest_reports[os.path.realpath(path)] = report
+    print(f"Ingested {path}: {report['inserted']} inserted, {report['updated']} updated, {report['deleted']} deleted, "
+          f"{report['unchanged']} unchanged{' (full rebuild)' if report['full_rebuild'] else ''} "
+          f"in {report['seconds'] * 1000:.0f} ms")
+
+    return df.drop(columns=ROW_HASH_COLUMN)
+
+@perf.instrument()
+def load_logbook_file(path: str) -> pd.DataFrame:
+    """Load one Excel logbook through its columnar cache, ingesting changed rows if it is stale."""
+    cache_path = get_cache_path(path)
     
-    raise FileNotFoundError(f"Could not find or load {filename} in any known location")
+    # Reuse the typed cache unless the Excel file changed since it was written
+    df = None
+    if os.path.exists(cache_path) and os.path.getmtime(path) <= os.path.getmtime(cache_path):
+        df = read_columnar_cache(cache_path)
+        if df is not None and ROW_HASH_COLUMN in df.columns:
+            df = df.drop(columns=ROW_HASH_COLUMN)
+    
+    if df is None:
+        df = ingest_excel(path, cache_path)
+    
+    return df
 
+@perf.instrument()
+def load_logbook_partitions(partitions: dict[int, str]) -> pd.DataFrame:
+    """Load the given year partitions and concatenate them in date order."""
+    if not partitions:
+        raise FileNotFoundError("No logbook partitions found in any known location")
 
+    frames = [load_logbook_file(path) for _, path in sorted(partitions.items())]
+    if len(frames) == 1:
+        return frames[0]
+
+    df = pd.concat(frames, ignore_index=True)
+    return _restore_categoricals(df.sort_values('Data', kind='stable', ignore_index=True))
+
+
+@perf.instrument()
 def preprocess_logbook_data(df: pd.DataFrame) -> pd.DataFrame:
-    """Preprocess the logbook data by converting dates and handling NA values."""
-    df = df.copy()  # Create a copy to avoid modifying the original dataframe
-    
+    """Preprocess the logbook data by converting dates, handling NA values and adding completion flags.
+
+    The input frame is never modified. Steps with nothing to do are skipped.
+    """
     # Convert dates - handle CSV format which may parse dates differently from Excel
-    try:
-        # First check if Data is already a datetime
-        if not pd.api.types.is_datetime64_any_dtype(df['Data']):
+    if not pd.api.types.is_datetime64_any_dtype(df['Data']):
+        try:
             # Try standard date format from CSV
-            df['Data'] = pd.to_datetime(df['Data'], errors='coerce')
+            dates = pd.to_datetime(df['Data'], errors='coerce')
             
             # If that fails, try the original format
-            if df['Data'].isna().all():
-                df['Data'] = pd.to_datetime(df['Data'], format='%d.%m.%Y', errors='coerce')
-    except Exception as e:
-        print(f"Error converting dates: {str(e)}")
-        # Fallback to original format
-        df['Data'] = pd.to_datetime(df['Data'], format='%d.%m.%Y', errors='coerce')
+            if dates.isna().all():
+                dates = pd.to_datetime(df['Data'], format='%d.%m.%Y', errors='coerce')
+        except Exception as e:
+            print(f"Error converting dates: {str(e)}")
+            # Fallback to original format
+            dates = pd.to_datetime(df['Data'], format='%d.%m.%Y', errors='coerce')
+        df = df.assign(Data=dates)
 
     # Filter out future dates
     today = dt.datetime.now()
-    df = df[df['Data'] <= today]
+    if (df['Data'] > today).any():
+        df = df[df['Data'] <= today]
+    
+    df = to_daily_calendar(df)
     
     # Handle NA values in numeric columns of the last row
-    numeric_cols = df.select_dtypes(include=['float64', 'int64']).columns
+    numeric_cols = df.select_dtypes(include='number').columns
     if not df.empty:
         last_row_index = df.index[-1]
         
@@ -103,10 +421,175 @@ def preprocess_logbook_data(df: pd.DataFrame) -> pd.DataFrame:
             if pd.isna(df.loc[last_row_index, col]) or df.loc[last_row_index, col] == 0:
                 df.loc[last_row_index, col] = 0.0
     
+    # Canonical completion flags for every habit, so pages never re-derive them
+    for habit, props in config.HABITS_CONFIG.items():
+        if habit not in df.columns or props["type"] not in ("binary", "time"):
+            continue
+        df[config.get_completion_column(habit)] = to_completion_flags(df[habit], config.get_completion_threshold(habit))
+    
     return df
 
-def get_logbook_data(filename: str = config.FILENAME) -> tuple[pd.DataFrame, str]:
-    """Load and preprocess the logbook data."""
-    df, path = load_logbook_data(filename)
-    df = preprocess_logbook_data(df)
-    return df, path
\ No newline at end of file
+def to_daily_calendar(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Index the frame by date: sorted, one row per day, with explicit NA rows for missing days.
+
+    The 'Data' column is kept alongside the (unnamed) DatetimeIndex so column-based code
+    keeps working, while range lookups can binary search the index.
+    """
+    # Each step copies the whole frame, so skip the ones with nothing to do
+    if df['Data'].isna().any():
+        df = df.dropna(subset=['Data'])
+    if not df['Data'].is_monotonic_increasing:
+        df = df.sort_values('Data', kind='stable')
+    if df['Data'].duplicated().any():
+        df = df.drop_duplicates('Data', keep='last')
+    df = df.set_index(pd.DatetimeIndex(df['Data']).normalize().rename(None))
+
+    if df.empty:
+        return df
+
+    calendar = pd.date_range(df.index[0], df.index[-1], freq='D')
+    if len(calendar) != len(df):
+        df = df.reindex(calendar)
+        df['Data'] = df.index
+
+        if 'WEEKDAY' in df.columns:
+            weekday_names = pd.Series(pd.Index(config.WEEKDAY_ORDER)[df.index.dayofweek], index=df.index)
+            df['WEEKDAY'] = df['WEEKDAY'].fillna(weekday_names)
+
+    return df
+
+def _resolve_source_key(partitions: dict[int, str]):
+    """Return the cache key for a set of partitions, or None if any of them vanished."""
+    paths, stats = [], []
+    for _, path in sorted(partitions.items()):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            forget_logbook_files()
+            return None
+        paths.append(os.path.realpath(path))
+        stats.append((stat.st_mtime_ns, stat.st_size))
+    return (tuple(paths), tuple(stats), dt.date.today())
+
+def snapshot_version(key) -> str:
+    """Short, stable identifier of a data snapshot, used to key derived caches."""
+    if key is None:
+        return "uncached"
+    return hashlib.blake2b(repr(key).encode(), digest_size=8).hexdigest()
+
+def get_cache_stats() -> dict:
+    """Return hit/miss counters, the number of cached snapshots and the memory they hold."""
+    with _logbook_cache_lock:
+        stats = {**_logbook_cache_stats, "size": len(_logbook_cache), "max_size": config.LOGBOOK_CACHE_SIZE}
+        frames = list(_logbook_cache.values())
+    stats["bytes"] = sum(int(frame.memory_usage(deep=True).sum()) for frame in frames)
+    return stats
+
+def clear_logbook_cache():
+    """Drop all cached snapshots and reset the counters."""
+    with _logbook_cache_lock:
+        _logbook_cache.clear()
+        for counter in _logbook_cache_stats:
+            _logbook_cache_stats[counter] = 0
+
+def _find_cached(key):
+    """
+    Return a cached frame for key, or None. Must be called with the cache lock held.
+
+    Besides an exact match, a snapshot built from a superset of the same partitions
+    (e.g. the full history when a page asks for the last 30 days) also qualifies.
+    """
+    cached = _logbook_cache.get(key)
+    if cached is not None:
+        _logbook_cache.move_to_end(key)
+        return cached
+
+    wanted = dict(zip(key[0], key[1]))
+    for other_key, frame in reversed(_logbook_cache.items()):
+        available = dict(zip(other_key[0], other_key[1]))
+        if other_key[2] == key[2] and all(available.get(p) == stat for p, stat in wanted.items()):
+            return frame
+    return None
+
+def _find_stale(key):
+    """Return the newest cached frame covering key's partitions, whatever their version."""
+    for other_key, frame in reversed(_logbook_cache.items()):
+        if set(key[0]) <= set(other_key[0]):
+            return frame
+    return None
+
+def _with_journal(df: pd.DataFrame, path: str) -> pd.DataFrame:
+    """Shallow copy of a cached snapshot with the entries logged since in the journal merged in."""
+    # Imported here: the journal builds on this module's loaders
+    import src.journal as journal
+    return journal.overlay(df, os.path.dirname(path))
+
+@perf.instrument()
+def get_logbook_data(start_date=None, end_date=None) -> tuple[pd.DataFrame, str]:
+    """Load and preprocess the logbook data, reusing the process-wide snapshot cache.
+
+    Data comes from the configured storage backend (see src.storage). Only the yearly
+    partitions overlapping [start_date, end_date] are loaded, so the
+    returned frame covers at least that range; leave both unset for the full history.
+    The cached frame is shared between sessions, so callers get their own copy;
+    adding columns or writing values never changes the cache.
+    While another thread (e.g. the background watcher) rebuilds a changed snapshot,
+    the previous one keeps being served until the new one is swapped in. Entries
+    logged in the journal (see src.journal) are merged into the returned frame.
+    """
+    df, path = _get_snapshot(start_date, end_date)
+    # A deep copy: under pandas < 3 without copy-on-write, writes to a shallow one reach the cache.
+    # Categoricals share their categories, so this copies little more than the value arrays.
+    return _with_journal(df, path).copy(), path
+
+def _get_snapshot(start_date=None, end_date=None) -> tuple[pd.DataFrame, str]:
+    """The cached snapshot covering [start_date, end_date] as loaded from the backend, without the journal."""
+    # Imported here: storage builds on this module's loaders
+    import src.storage as storage
+
+    # Only the partitions (yearly files, or years of the SQLite store) overlapping the range
+    backend = storage.get_backend()
+    partitions, path = backend.select(start_date, end_date)
+    key = backend.source_key(partitions)
+
+    if key is not None:
+        with _logbook_cache_lock:
+            cached = _find_cached(key)
+            if cached is not None:
+                _logbook_cache_stats["hits"] += 1
+            elif any(set(key[0]) <= set(paths) for paths in _logbook_builds):
+                cached = _find_stale(key)
+                if cached is not None:
+                    _logbook_cache_stats["stale_hits"] += 1
+            if cached is None:
+                _logbook_builds[key[0]] += 1
+        if cached is not None:
+            return cached, path
+
+    try:
+        df = backend.load(partitions)
+        df = preprocess_logbook_data(df)
+        df.attrs["snapshot_version"] = snapshot_version(key)
+    finally:
+        if key is not None:
+            with _logbook_cache_lock:
+                _logbook_builds[key[0]] -= 1
+                if _logbook_builds[key[0]] <= 0:
+                    del _logbook_builds[key[0]]
+
+    with _logbook_cache_lock:
+        _logbook_cache_stats["misses"] += 1
+        if key is not None:
+            # Snapshots built from an older version of any of these files can never be hit again
+            fresh = dict(zip(key[0], key[1]))
+            for stale_key in [k for k in _logbook_cache
+                              if any(p in fresh and fresh[p] != stat for p, stat in zip(k[0], k[1]))]:
+                del _logbook_cache[stale_key]
+                _logbook_cache_stats["evictions"] += 1
+            _logbook_cache[key] = df
+            while len(_logbook_cache) > config.LOGBOOK_CACHE_SIZE:
+                _logbook_cache.popitem(last=False)
+                _logbook_cache_stats["evictions"] += 1
+
+    return df, path
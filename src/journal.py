@@ -0,0 +1,382 @@
+import os
+import json
+import time
+import threading
+import datetime as dt
+from collections import OrderedDict
+
+import pandas as pd
+
+import src.config as config
+import src.data_handler as data_handler
+
+# Entries logged from the dashboard or the API, layered over the logbook without touching Excel.
+# New entries are appended (and fsynced) to the journal; compaction folds them into a
+# columnar table. Readers merge table, any in-progress compaction and the journal, in that order.
+#
+# Excel stays the source of truth. A logged value overrides the logbook only while the
+# logbook has no value of its own for it, or still has the one it had before the Excel
+# file of that year was last saved. Once Excel holds the same value, or the year's file
+# is saved with a different non-empty value after the entry was logged, the entry is
+# settled: it no longer applies, and compaction drops it from the table.
+JOURNAL_FILENAME = 'journal.jsonl'
+COMPACTED_FILENAME = 'journal.feather'
+COMPACTING_SUFFIX = '.compacting'
+# The compacted table has its own layout, independent of the logbook cache schema
+COMPACTED_SCHEMA_VERSION = 2
+
+# Compact once the journal holds this many entries, or its oldest entry is this old
+COMPACT_MAX_ENTRIES = 50
+COMPACT_MAX_AGE_SECONDS = 10 * 60
+
+_journal_lock = threading.Lock()
+_entries_cache = {}
+_overlay_cache = OrderedDict()
+_overlay_cache_lock = threading.Lock()
+_OVERLAY_CACHE_SIZE = 4
+
+def get_journal_dir() -> str:
+    """Return the directory holding the journal: the resolved data directory."""
+    data_dir = data_handler.get_resolved_data_dir()
+    if data_dir is None:
+        data_handler.discover_logbook_files()
+        data_dir = data_handler.get_resolved_data_dir()
+    if data_dir is None:
+        raise FileNotFoundError("No data directory found for the journal")
+    return data_dir
+
+def _paths(data_dir: str) -> tuple[str, str, str]:
+    journal_path = os.path.join(data_dir, JOURNAL_FILENAME)
+    return os.path.join(data_dir, COMPACTED_FILENAME), journal_path + COMPACTING_SUFFIX, journal_path
+
+def _validate(values: dict) -> dict:
+    """Check habit names and coerce values to their habit type; None clears a value."""
+    clean = {}
+    for habit, value in values.items():
+        props = config.HABITS_CONFIG.get(habit)
+        if props is None:
+            raise ValueError(f"Unknown habit '{habit}'")
+        if value is None:
+            clean[habit] = None
+        elif props["type"] == "time":
+            if isinstance(value, bool) or not isinstance(value, (int, float)) or value < 0:
+                raise ValueError(f"'{habit}' takes a number of minutes, got {value!r}")
+            clean[habit] = float(value)
+        elif props["type"] == "binary":
+            if value not in (0, 1, True, False):
+                raise ValueError(f"'{habit}' takes 0/1 or true/false, got {value!r}")
+            clean[habit] = int(value)
+        else:
+            clean[habit] = str(value)
+    return clean
+
+def day_values(df: pd.DataFrame, day, habits: list[str]) -> dict:
+    """Return one day's values of the given habits as journal values, None where nothing is logged."""
+    day = pd.Timestamp(day).normalize()
+    row = df.loc[day] if day in df.index else None
+
+    values = {}
+    for habit in habits:
+        value = None if row is None or habit not in row.index else row[habit]
+        if value is None or pd.isna(value):
+            values[habit] = None
+        elif config.HABITS_CONFIG[habit]["type"] == "time":
+            values[habit] = float(value)
+        elif config.HABITS_CONFIG[habit]["type"] == "binary":
+            values[habit] = bool(value)
+        else:
+            values[habit] = str(value)
+    return values
+
+def changed_values(before: dict, after: dict) -> dict:
+    """Return the values in `after` that differ from `before`, so a form only journals what was edited."""
+    return {habit: value for habit, value in after.items() if before.get(habit) != value}
+
+def log_entry(values: dict, date=None, data_dir: str = None) -> dict:
+    """
+    Durably append values for one day (today by default) to the journal.
+
+    Args:
+        values (dict): {habit: value}; minutes for time habits, 0/1 for binary ones
+        date (date, optional): Day the values belong to; not in the future
+        data_dir (str, optional): Directory of the journal. Defaults to the data directory.
+
+    Returns:
+        dict: The journal record that was written
+    """
+    day = pd.Timestamp(date or dt.date.today()).normalize()
+    if day > pd.Timestamp.now().normalize():
+        raise ValueError("Entries can't be logged for future days")
+    if not values:
+        raise ValueError("Nothing to log")
+
+    record = {"date": day.strftime('%Y-%m-%d'), "values": _validate(values), "logged_at": time.time()}
+    line = json.dumps(record, ensure_ascii=False, separators=(',', ':')) + "\n"
+
+    _, _, journal_path = _paths(data_dir or get_journal_dir())
+    with _journal_lock:
+        fd = os.open(journal_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, line.encode('utf-8'))
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    return record
+
+def _read_jsonl(path: str) -> list[dict]:
+    records = []
+    try:
+        with open(path, "r", encoding="utf-8") as file:
+            for line in file:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    # A torn last line from a crash mid-write; everything before it is intact
+                    print(f"Skipping unreadable journal line in {path}")
+    except FileNotFoundError:
+        pass
+    return records
+
+def fingerprint(data_dir: str = None):
+    """Stat the compacted table, any in-progress compaction and the journal."""
+    stats = []
+    for path in _paths(data_dir or get_journal_dir()):
+        try:
+            stat = os.stat(path)
+            stats.append((stat.st_mtime_ns, stat.st_size))
+        except OSError:
+            stats.append(None)
+    return tuple(stats)
+
+def read_entries(data_dir: str = None) -> tuple[dict, tuple]:
+    """
+    Return all logged values as {day: {habit: (value, logged_at)}}, later entries winning, and their fingerprint.
+
+    Parsed entries are reused until one of the underlying files changes.
+    """
+    data_dir = data_dir or get_journal_dir()
+    key = fingerprint(data_dir)
+    cached = _entries_cache.get(data_dir)
+    if cached is not None and cached[0] == key:
+        return cached[1], key
+
+    compacted_path, compacting_path, journal_path = _paths(data_dir)
+    entries = {}
+
+    # The compacted table is long: one (day, habit, JSON value, logged_at) row per logged value
+    table = data_handler.read_columnar_cache(compacted_path, schema_version=COMPACTED_SCHEMA_VERSION)
+    if table is None:
+        # Tables from before logged_at was kept: their entries predate the table itself
+        table = data_handler.read_columnar_cache(compacted_path, schema_version=1)
+        if table is not None:
+            table['logged_at'] = os.path.getmtime(compacted_path)
+    if table is not None:
+        for day, habit, value, logged_at in zip(table['Data'], table['habit'], table['value'], table['logged_at']):
+            entries.setdefault(pd.Timestamp(day), {})[habit] = (json.loads(value), float(logged_at))
+
+    for path in (compacting_path, journal_path):
+        for record in _read_jsonl(path):
+            logged_at = record.get("logged_at", 0)
+            entries.setdefault(pd.Timestamp(record["date"]), {}).update(
+                {habit: (value, logged_at) for habit, value in record["values"].items()})
+
+    _entries_cache[data_dir] = (key, entries)
+    return entries, key
+
+def _partition_mtimes() -> dict:
+    """Return {year: mtime} of the Excel partitions, the time each year was last saved."""
+    mtimes = {}
+    for year, path in data_handler.discover_logbook_files().items():
+        try:
+            mtimes[year] = os.path.getmtime(path)
+        except OSError:
+            pass
+    return mtimes
+
+def _source_value(df: pd.DataFrame, day, habit: str):
+    """The logbook's own value for a day and habit as a journal value, None where it has none."""
+    value = day_values(df, day, [habit])[habit]
+    # Preprocessing fills the last day's unfilled minutes with zero
+    if value == 0 and not df.empty and day == df.index[-1] and config.HABITS_CONFIG[habit]["type"] == "time":
+        return None
+    return value
+
+def settle(entries: dict, df: pd.DataFrame, mtimes: dict = None) -> dict:
+    """
+    Return the logged values that still apply over a snapshot, as {day: {habit: value}}.
+
+    Args:
+        entries (dict): {day: {habit: (value, logged_at)}} as returned by read_entries
+        df (pd.DataFrame): Preprocessed snapshot as loaded from the logbook, without the journal
+        mtimes (dict, optional): {year: mtime} of the Excel partitions. Defaults to their current mtimes.
+
+    Returns:
+        dict: Values of the entries that are neither in Excel already nor corrected there since
+    """
+    mtimes = _partition_mtimes() if mtimes is None else mtimes
+    covered = df.index if not df.empty else pd.DatetimeIndex([])
+
+    applied = {}
+    for day, values in entries.items():
+        for habit, (value, logged_at) in values.items():
+            if habit in config.HABITS_CONFIG and day in covered:
+                source = _source_value(df, day, habit)
+                logged = bool(value) if config.HABITS_CONFIG[habit]["type"] == "binary" and value is not None else value
+                # Already in Excel, or corrected there after it was logged
+                if source == logged or (source is not None and logged_at < mtimes.get(day.year, 0)):
+                    continue
+            applied.setdefault(day, {})[habit] = value
+    return applied
+
+def apply_entries(df: pd.DataFrame, entries: dict) -> pd.DataFrame:
+    """
+    Merge logged values into a preprocessed logbook frame (see data_handler.preprocess_logbook_data).
+
+    Only the logged days are touched: their values replace the logbook's, 'Razem' is
+    re-summed where a time habit was logged and completion flags are re-derived. Days
+    after the end of the frame are added, with the calendar filled in up to them.
+    """
+    entries = {day: values for day, values in entries.items() if df.empty or day >= df.index[0]}
+    if not entries:
+        return df.copy(deep=False)
+
+    df = df.copy(deep=False)
+    days = pd.DatetimeIndex(sorted(entries))
+
+    if df.empty or days[-1] > df.index[-1]:
+        first = days[0] if df.empty else df.index[0]
+        last_before = None if df.empty else df.index[-1]
+        df = df.reindex(pd.date_range(first, days[-1], freq='D'))
+        df['Data'] = df.index
+        if 'WEEKDAY' in df.columns:
+            weekday_names = pd.Series(pd.Index(config.WEEKDAY_ORDER)[df.index.dayofweek], index=df.index)
+            df['WEEKDAY'] = df['WEEKDAY'].fillna(weekday_names)
+
+        # As in preprocessing, the (new) last day counts unfilled minutes as zero
+        time_columns = [col for col in config.TIME_COLUMNS if col in df.columns]
+        if last_before is None or df.index[-1] != last_before:
+            df.loc[df.index[-1], time_columns] = df.loc[df.index[-1], time_columns].fillna(0.0)
+            for habit, props in config.HABITS_CONFIG.items():
+                flag_column = config.get_completion_column(habit)
+                if props["type"] == "time" and habit in df.columns and flag_column in df.columns:
+                    df.loc[df.index[-1], flag_column] = bool(df.loc[df.index[-1], habit] >= config.get_completion_threshold(habit))
+
+    touched = sorted({habit for values in entries.values() for habit in values})
+    for habit in touched:
+        habit_type = config.HABITS_CONFIG[habit]["type"]
+        logged = pd.Series({day: values[habit] for day, values in entries.items() if habit in values})
+        # Same compact dtypes as data_handler._coerce_logbook_types
+        if habit_type == "time":
+            column = df[habit].astype("float32") if habit in df.columns else pd.Series(float('nan'), index=df.index, dtype="float32")
+            column.loc[logged.index] = pd.to_numeric(logged, errors='coerce').astype("float32")
+        elif habit_type == "binary":
+            column = df[habit].astype("boolean") if habit in df.columns else pd.Series(pd.NA, index=df.index, dtype="boolean")
+            column.loc[logged.index] = logged.map(lambda value: pd.NA if value is None else bool(value)).astype("boolean")
+        else:
+            column = df[habit].astype("string") if habit in df.columns else pd.Series(pd.NA, index=df.index, dtype="string")
+            column.loc[logged.index] = logged.astype("string")
+            column = column.astype("category")
+        df[habit] = column
+
+        if habit_type in ("binary", "time"):
+            flags = df[config.get_completion_column(habit)].copy() if config.get_completion_column(habit) in df.columns \
+                else pd.Series(pd.NA, index=df.index, dtype="boolean")
+            flags.loc[logged.index] = data_handler.to_completion_flags(column.loc[logged.index], config.get_completion_threshold(habit))
+            df[config.get_completion_column(habit)] = flags
+
+    # 'Razem' is the sum of the time habits on the days where any of them was logged
+    time_habits = [habit for habit, props in config.HABITS_CONFIG.items() if props["type"] == "time" and habit in df.columns]
+    logged_time_days = [day for day, values in entries.items() if any(habit in values for habit in time_habits)]
+    if logged_time_days and 'Razem' in df.columns:
+        razem = df['Razem'].copy()
+        razem.loc[logged_time_days] = df.loc[logged_time_days, time_habits].sum(axis=1, min_count=1)
+        df['Razem'] = razem
+
+    return df
+
+def overlay(df: pd.DataFrame, data_dir: str = None) -> pd.DataFrame:
+    """
+    Return the snapshot with the journal merged in, as a shallow copy.
+
+    Entries that Excel has since taken over or corrected are left out (see settle). The
+    merged frame is memoized per (snapshot version, journal fingerprint) and gets its own
+    snapshot version, so derived caches pick up logged values right away.
+    """
+    try:
+        entries, journal_key = read_entries(data_dir)
+    except FileNotFoundError:
+        return df.copy(deep=False)
+    if not entries:
+        return df.copy(deep=False)
+
+    key = (df.attrs.get("snapshot_version"), journal_key)
+    with _overlay_cache_lock:
+        cached = _overlay_cache.get(key)
+    if cached is None:
+        cached = apply_entries(df, settle(entries, df))
+        cached.attrs = dict(df.attrs, snapshot_version=data_handler.snapshot_version(key))
+        with _overlay_cache_lock:
+            _overlay_cache[key] = cached
+            while len(_overlay_cache) > _OVERLAY_CACHE_SIZE:
+                _overlay_cache.popitem(last=False)
+
+    return cached.copy(deep=False)
+
+def compact(data_dir: str = None) -> int:
+    """
+    Fold the journal into the compacted table and truncate it.
+
+    The journal is renamed aside first, so entries logged meanwhile go to a new one
+    and readers see every entry at every step. Entries settled against the full
+    logbook history are dropped from the table. Returns the number of records folded in.
+    """
+    data_dir = data_dir or get_journal_dir()
+    compacted_path, compacting_path, journal_path = _paths(data_dir)
+
+    with _journal_lock:
+        # A compaction interrupted by a crash is finished first
+        if not os.path.exists(compacting_path):
+            if not os.path.exists(journal_path) or os.path.getsize(journal_path) == 0:
+                return 0
+            os.replace(journal_path, compacting_path)
+
+    records = _read_jsonl(compacting_path)
+    entries, _ = read_entries(data_dir)
+    snapshot, _ = data_handler._get_snapshot()
+    applied = settle(entries, snapshot)
+
+    rows = [
+        (day, habit, json.dumps(value, ensure_ascii=False), logged_at)
+        for day, values in sorted(entries.items())
+        for habit, (value, logged_at) in sorted(values.items())
+        if habit in applied.get(day, {})
+    ]
+    table = pd.DataFrame(rows, columns=['Data', 'habit', 'value', 'logged_at'])
+    table['Data'] = pd.to_datetime(table['Data'])
+    table['logged_at'] = table['logged_at'].astype('float64')
+
+    # Entries still in the (new) journal are already in `entries`; they are written to the
+    # table too and stay in the journal, which is harmless since later entries win anyway
+    data_handler.write_columnar_cache(table, compacted_path, schema_version=COMPACTED_SCHEMA_VERSION)
+    try:
+        os.remove(compacting_path)
+    except FileNotFoundError:
+        # Another process finished the same compaction
+        pass
+    print(f"Compacted {len(records)} journal entries into {compacted_path}, keeping {len(rows)} values")
+    return len(records)
+
+def compact_if_needed(data_dir: str = None) -> int:
+    """Compact when the journal is long or its oldest entry has waited long enough."""
+    data_dir = data_dir or get_journal_dir()
+    _, compacting_path, journal_path = _paths(data_dir)
+    if os.path.exists(compacting_path):
+        return compact(data_dir)
+
+    records = _read_jsonl(journal_path)
+    if not records:
+        return 0
+    if len(records) >= COMPACT_MAX_ENTRIES or time.time() - records[0].get("logged_at", 0) >= COMPACT_MAX_AGE_SECONDS:
+        return compact(data_dir)
+    return 0
@@ -0,0 +1,151 @@
+import os
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+import src.config as config
+import src.analytics as analytics
+import src.data_handler as data_handler
+import src.perf as perf
+
+# Rolling windows (in days) computed for every time column
+ROLLING_WINDOWS = (7, 30)
+ROLLING_METRICS_FILENAME = 'rolling_metrics.feather'
+
+# Derived tables per snapshot version; a few are enough since pages share one snapshot
+_metrics_cache = OrderedDict()
+_metrics_cache_lock = threading.Lock()
+_METRICS_CACHE_SIZE = 4
+
+@perf.instrument()
+def compute_rolling_metrics(df: pd.DataFrame, columns: list[str] = None, end_date=None) -> pd.DataFrame:
+    """
+    Compute rolling aggregates for every time column over the full history in one pass.
+
+    NA days count as zero minutes, as in the daily activity chart. Columns are named
+    `{column}_sma{window}`, `{column}_ema{window}`, `{column}_week_total` and
+    `{column}_month_total` (calendar week starting Monday, calendar month).
+
+    Args:
+        df (pd.DataFrame): Date-indexed logbook frame (see data_handler.to_daily_calendar)
+        columns (list, optional): Time columns to aggregate. Defaults to config.TIME_COLUMNS.
+        end_date (datetime, optional): Extend the table with empty days up to this date. Defaults to today.
+
+    Returns:
+        pd.DataFrame: One row per day, indexed by date
+    """
+    columns = [col for col in (columns or config.TIME_COLUMNS) if col in df.columns]
+    end_date = pd.Timestamp(end_date or pd.Timestamp.now()).normalize()
+
+    if df.empty:
+        return pd.DataFrame(index=pd.DatetimeIndex([]))
+
+    calendar = pd.date_range(df.index[0], max(df.index[-1], end_date), freq='D')
+    values = df[columns].reindex(calendar).astype(float).fillna(0)
+
+    aggregates = {}
+    for window in ROLLING_WINDOWS:
+        sma = values.rolling(window, min_periods=1).mean()
+        ema = values.ewm(span=window, adjust=False).mean()
+        aggregates.update({f"{col}_sma{window}": sma[col] for col in columns})
+        aggregates.update({f"{col}_ema{window}": ema[col] for col in columns})
+
+    week_totals = values.groupby(calendar.to_period('W-SUN')).transform('sum')
+    month_totals = values.groupby(calendar.to_period('M')).transform('sum')
+    aggregates.update({f"{col}_week_total": week_totals[col] for col in columns})
+    aggregates.update({f"{col}_month_total": month_totals[col] for col in columns})
+
+    return pd.DataFrame(aggregates, index=calendar)
+
+@perf.instrument()
+def get_rolling_metrics(df: pd.DataFrame = None) -> pd.DataFrame:
+    """
+    Return the rolling aggregates table of a snapshot.
+
+    The table is memoized per snapshot version in memory, so it is only recomputed
+    when the data changes. The full-history table is also persisted next to the data.
+
+    Args:
+        df (pd.DataFrame, optional): Snapshot from data_handler.get_logbook_data, e.g. a page's
+            ranged one. Defaults to the full history.
+
+    Returns:
+        pd.DataFrame: Rolling aggregates per day (see compute_rolling_metrics)
+    """
+    path = None
+    if df is None:
+        df, path = data_handler.get_logbook_data()
+    version = df.attrs.get("snapshot_version")
+
+    with _metrics_cache_lock:
+        cached = _metrics_cache.get(("rolling", version))
+    if cached is not None:
+        return cached
+
+    metrics = None
+    if path is not None:
+        cache_path = os.path.join(os.path.dirname(path), ROLLING_METRICS_FILENAME)
+        metadata = {"snapshot_version": version}
+        try:
+            metrics = data_handler.read_columnar_cache(cache_path, metadata)
+        except Exception as e:
+            print(f"Error reading rolling metrics cache {cache_path}: {str(e)}")
+
+    if metrics is not None:
+        metrics = metrics.set_index(pd.DatetimeIndex(metrics.pop('Data')).rename(None))
+    else:
+        metrics = compute_rolling_metrics(df)
+        if path is not None:
+            try:
+                data_handler.write_columnar_cache(metrics.rename_axis('Data').reset_index(), cache_path, metadata)
+            except Exception as e:
+                print(f"Error writing rolling metrics cache {cache_path}: {str(e)}")
+
+    with _metrics_cache_lock:
+        _metrics_cache[("rolling", version)] = metrics
+        while len(_metrics_cache) > _METRICS_CACHE_SIZE:
+            _metrics_cache.popitem(last=False)
+
+    return metrics
+
+@perf.instrument()
+def get_balance_scores(time_columns: list[str] = None, df: pd.DataFrame = None) -> pd.DataFrame:
+    """
+    Return the daily balance scores of a snapshot.
+
+    Memoized per snapshot version and set of time columns.
+
+    Args:
+        time_columns (list, optional): Activities to balance. Defaults to the active time habits, as on the Balance page.
+        df (pd.DataFrame, optional): Snapshot from data_handler.get_logbook_data. Defaults to the full history.
+
+    Returns:
+        pd.DataFrame: 'Data', 'score' and 'is_na' per day (see analytics.calculate_balance_scores)
+    """
+    if time_columns is None:
+        time_columns = config.get_active_time_fields()
+
+    if df is None:
+        df, _ = data_handler.get_logbook_data()
+    key = ("balance", df.attrs.get("snapshot_version"), tuple(sorted(time_columns)))
+
+    with _metrics_cache_lock:
+        cached = _metrics_cache.get(key)
+    if cached is not None:
+        return cached
+
+    scores = analytics.calculate_balance_scores(df, time_columns)
+
+    with _metrics_cache_lock:
+        _metrics_cache[key] = scores
+        while len(_metrics_cache) > _METRICS_CACHE_SIZE:
+            _metrics_cache.popitem(last=False)
+
+    return scores
+
+def get_cache_bytes() -> int:
+    """Return the memory held by the memoized rolling metrics and balance score tables."""
+    with _metrics_cache_lock:
+        tables = list(_metrics_cache.values())
+    return sum(int(table.memory_usage(deep=True).sum()) for table in tables)
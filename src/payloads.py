@@ -0,0 +1,132 @@
+import base64
+
+import numpy as np
+import pandas as pd
+
+import src.config as config
+import src.perf as perf
+import src.streaks as streaks
+
+# 2-bit codes of the packed day states, decoded by the HTML assets
+CODE_NA = 0
+CODE_MISSED = 1
+CODE_DONE = 2
+
+def encode_tristate(states: np.ndarray) -> str:
+    """
+    Pack a 1-D array of streak states (NA_DAY / MISSED / DONE) into base64.
+
+    Each day takes 2 bits, 4 days per byte, lowest bits first.
+    """
+    codes = np.full(len(states), CODE_NA, dtype=np.uint8)
+    codes[states == streaks.MISSED] = CODE_MISSED
+    codes[states == streaks.DONE] = CODE_DONE
+
+    padded = np.zeros(-(-len(codes) // 4) * 4, dtype=np.uint8)
+    padded[:len(codes)] = codes
+    quads = padded.reshape(-1, 4)
+    packed = quads[:, 0] | (quads[:, 1] << 2) | (quads[:, 2] << 4) | (quads[:, 3] << 6)
+
+    return base64.b64encode(packed.astype(np.uint8).tobytes()).decode('ascii')
+
+def decode_tristate(payload: str, days: int) -> np.ndarray:
+    """Inverse of encode_tristate, returning streak states."""
+    packed = np.frombuffer(base64.b64decode(payload), dtype=np.uint8)
+    codes = np.stack([(packed >> shift) & 3 for shift in (0, 2, 4, 6)], axis=1).ravel()[:days]
+    return np.select([codes == CODE_DONE, codes == CODE_MISSED], [streaks.DONE, streaks.MISSED], streaks.NA_DAY).astype(np.int8)
+
+@perf.instrument()
+def habit_days_payload(df: pd.DataFrame, habits: list[str], date_column: str = 'Data') -> list[dict]:
+    """
+    Build the compact per-habit day series for the heatmap component.
+
+    Args:
+        df (pd.DataFrame): Logbook frame with a date column and one column per habit
+        habits (list): Habit column names
+        date_column (str): Name of the date column
+
+    Returns:
+        list: One dict per habit with name, emoji, color, start (YYYY-MM-DD),
+        days and the packed states
+    """
+    states, dates = streaks.habit_state_matrix(df, habits, date_column)
+
+    if len(dates):
+        # Spread onto a contiguous calendar so the decoder only needs a start date
+        dates = dates.normalize()
+        calendar = pd.date_range(dates[0], dates[-1], freq='D')
+        if len(calendar) != len(dates):
+            full = np.full((len(habits), len(calendar)), streaks.NA_DAY, dtype=np.int8)
+            full[:, calendar.get_indexer(dates)] = states
+            states, dates = full, calendar
+
+    start = dates[0].strftime('%Y-%m-%d') if len(dates) else pd.Timestamp.now().strftime('%Y-%m-%d')
+    return [
+        {
+            "name": habit,
+            "emoji": config.HABITS_CONFIG[habit]['emoji'],
+            "color": config.HABITS_CONFIG[habit]['color'],
+            "start": start,
+            "days": len(dates),
+            "states": encode_tristate(states[i])
+        }
+        for i, habit in enumerate(habits)
+    ]
+
+def weekly_stats_cards(weekly_stats: dict) -> list[dict]:
+    """
+    Build the metric cards of the analytics-cards component from calculate_weekly_stats.
+
+    Returns:
+        list: One dict per card with id, title, value, change (%), unit, format and days
+    """
+    cards = [
+        ("avg_daily", "Average Daily Total", "min", "time"),
+        ("most_productive_day", "Most Productive Day", "min", "time"),
+        ("total_hours", "Total Productive Hours", "hrs", "hours"),
+    ]
+    return [
+        {
+            "id": metric_id,
+            "title": title,
+            "value": weekly_stats[metric_id]["value"],
+            "change": weekly_stats[metric_id]["change"],
+            "unit": unit,
+            "format": value_format,
+            "days": weekly_stats["days"]
+        }
+        for metric_id, title, unit, value_format in cards
+    ]
+
+def habit_cards_payload(states: np.ndarray, dates: pd.DatetimeIndex, habits: list[str],
+                        streak_table: pd.DataFrame, personal_habits: list[str] = ()) -> list[dict]:
+    """
+    Build the habit-cards component data: streaks and today's completion per habit.
+
+    Args:
+        states (np.ndarray): Habits x days state matrix (see streaks.habit_state_matrix)
+        dates (pd.DatetimeIndex): Days of the matrix columns
+        habits (list): Habit names, in card order
+        streak_table (pd.DataFrame): Streaks indexed by habit
+        personal_habits (list): Habits blurred on the cards
+
+    Returns:
+        list: One dict per habit with name, emoji, currentStreak, bestStreak,
+        completedToday ("true"/"false") and isPersonal
+    """
+    # A missing row for today means nothing was completed yet
+    today = pd.Timestamp.now().normalize()
+    today_idx = np.flatnonzero(dates.normalize() == today)
+
+    habits_data = []
+    for i, habit in enumerate(habits):
+        is_completed = today_idx.size > 0 and states[i, today_idx[0]] == streaks.DONE
+        habits_data.append({
+            "name": habit,
+            "emoji": config.HABITS_CONFIG[habit]['emoji'],
+            "currentStreak": int(streak_table.loc[habit, 'current_streak']),
+            "bestStreak": int(streak_table.loc[habit, 'longest_streak']),
+            "completedToday": "true" if is_completed else "false",
+            "isPersonal": habit in personal_habits
+        })
+    return habits_data
@@ -0,0 +1,195 @@
+import os
+import json
+import time
+import threading
+import functools
+
+import numpy as np
+import pandas as pd
+
+# Set LOGBOOK_PERF=1 to record timings for every page view
+PERF_ENV = 'LOGBOOK_PERF'
+_enabled_by_env = os.environ.get(PERF_ENV, '').lower() in ('1', 'true', 'yes')
+
+# Timings belong to the thread that records them, i.e. to one Streamlit rerun
+_state = threading.local()
+_origin = time.perf_counter()
+
+class Span:
+    """One timed section: wall time plus the rows and payload bytes it handled."""
+    __slots__ = ('name', 'start', 'duration', 'rows', 'bytes', 'depth')
+
+    def __init__(self, name, depth=0):
+        self.name = name
+        self.start = 0.0
+        self.duration = 0.0
+        self.rows = None
+        self.bytes = None
+        self.depth = depth
+
+class _NullSpan:
+    """Stand-in when recording is off; attribute writes are accepted and dropped."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __setattr__(self, name, value):
+        pass
+
+_NULL_SPAN = _NullSpan()
+
+class _Timer:
+    __slots__ = ('span',)
+
+    def __init__(self, name):
+        self.span = Span(name, getattr(_state, 'depth', 0))
+
+    def __enter__(self):
+        _state.depth = self.span.depth + 1
+        self.span.start = time.perf_counter()
+        return self.span
+
+    def __exit__(self, *exc):
+        self.span.duration = time.perf_counter() - self.span.start
+        _state.depth = self.span.depth
+        _records().append(self.span)
+        return False
+
+def _records():
+    records = getattr(_state, 'records', None)
+    if records is None:
+        records = _state.records = []
+    return records
+
+def is_enabled() -> bool:
+    """True if timings are recorded on this thread."""
+    return getattr(_state, 'enabled', _enabled_by_env)
+
+def enable(flag: bool = True):
+    """Turn recording on or off for the current thread, overriding LOGBOOK_PERF."""
+    _state.enabled = flag
+
+def reset():
+    """Drop the timings recorded on this thread, e.g. at the start of a rerun."""
+    _state.records = []
+    _state.depth = 0
+
+def get_records() -> list[Span]:
+    """Return the timings recorded on this thread, in completion order."""
+    return list(_records())
+
+def timed(name: str):
+    """
+    Time a block of code when recording is enabled.
+
+    Usage:
+        with perf.timed("Balance: trend chart") as span:
+            ...
+            span.bytes = len(html)
+    """
+    if not is_enabled():
+        return _NULL_SPAN
+    return _Timer(name)
+
+def count_rows(result):
+    """Row count of a DataFrame or Series result (or the first item of a tuple), else None."""
+    if isinstance(result, tuple) and result:
+        result = result[0]
+    if isinstance(result, (pd.DataFrame, pd.Series)):
+        return len(result)
+    return None
+
+def instrument(name: str = None):
+    """Decorator timing every call of a function; DataFrame results also record their row count."""
+    def decorator(func):
+        label = name or f"{func.__module__.removeprefix('src.')}.{func.__name__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not is_enabled():
+                return func(*args, **kwargs)
+            with _Timer(label) as span:
+                result = func(*args, **kwargs)
+                span.rows = count_rows(result)
+            return result
+        return wrapper
+    return decorator
+
+def summary(records: list[Span] = None) -> pd.DataFrame:
+    """Return the timings as a table with one row per section, nested sections indented under their parent."""
+    records = sorted(get_records() if records is None else records, key=lambda span: span.start)
+    return pd.DataFrame({
+        "section": ["  " * span.depth + span.name for span in records],
+        "ms": [span.duration * 1000 for span in records],
+        "rows": pd.array([span.rows for span in records], dtype="Int64"),
+        "bytes": pd.array([span.bytes for span in records], dtype="Int64"),
+    })
+
+def to_chrome_trace(records: list[Span] = None) -> str:
+    """Export the timings in Chrome trace format (load in chrome://tracing or Perfetto)."""
+    records = get_records() if records is None else records
+    events = []
+    for span in records:
+        args = {key: value for key, value in (("rows", span.rows), ("bytes", span.bytes)) if value is not None}
+        events.append({
+            "name": span.name,
+            "ph": "X",
+            "ts": round((span.start - _origin) * 1e6),
+            "dur": round(span.duration * 1e6),
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+            "args": args,
+        })
+    events.sort(key=lambda event: event["ts"])
+    return json.dumps({"traceEvents": events, "displayTimeUnit": "ms"})
+
+def record(name: str, start: float, duration: float, rows=None):
+    """Add a section timed on another thread (e.g. a worker pool) to this thread's timings."""
+    if not is_enabled():
+        return
+    span = Span(name, getattr(_state, 'depth', 0))
+    span.start = start
+    span.duration = duration
+    span.rows = rows
+    _records().append(span)
+
+def process_memory():
+    """Resident memory of this process in bytes, or None where /proc is not available."""
+    try:
+        with open('/proc/self/statm') as file:
+            return int(file.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return None
+
+def _buffers(series: pd.Series) -> list:
+    """The NumPy arrays holding a column's values."""
+    array = series.array
+    if isinstance(array, pd.Categorical):
+        return [array.codes]
+    buffers = [getattr(array, name, None) for name in ('_ndarray', '_data', '_mask')]
+    return [buffer for buffer in buffers if isinstance(buffer, np.ndarray)] or [series.to_numpy()]
+
+def frame_memory(df: pd.DataFrame, base=None) -> tuple[int, int]:
+    """
+    Return (bytes, own bytes) of a frame, counting strings and categories deeply.
+
+    Columns whose values sit in the same buffers as the column of the same name in
+    `base` (a frame or a list of frames, e.g. views or shallow copies of a shared
+    snapshot) are not counted as own bytes.
+    """
+    bases = [] if base is None else base if isinstance(base, list) else [base]
+    usage = df.memory_usage(deep=True)
+    own = int(usage.get('Index', 0))
+    for column in df.columns:
+        shared = any(
+            np.may_share_memory(mine, theirs)
+            for other in bases if column in other.columns
+            for mine in _buffers(df[column]) for theirs in _buffers(other[column])
+        )
+        if not shared:
+            own += int(usage[column])
+    return int(usage.sum()), own
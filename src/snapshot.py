@@ -0,0 +1,118 @@
+import os
+import json
+import datetime as dt
+
+import pandas as pd
+
+import src.config as config
+import src.analytics as analytics
+import src.data_handler as data_handler
+import src.metrics as metrics
+import src.payloads as payloads
+import src.streaks as streaks
+
+# Bump whenever the layout of summary.json or daily.feather changes
+SNAPSHOT_FORMAT_VERSION = 1
+LATEST_POINTER = 'latest.json'
+
+def _streak_habits():
+    return [habit for habit, props in config.get_active_fields().items() if props["type"] in ("binary", "time")]
+
+def _iso(value):
+    return None if pd.isna(value) else pd.Timestamp(value).strftime('%Y-%m-%d')
+
+def build_snapshot(start_date=None, end_date=None) -> tuple[dict, pd.DataFrame]:
+    """
+    Compute every dashboard metric without Streamlit.
+
+    Args:
+        start_date (datetime, optional): First day of the daily table and heatmaps. Defaults to the full history.
+        end_date (datetime, optional): Last day. Defaults to today.
+
+    Returns:
+        tuple: (summary dict for JSON, daily pd.DataFrame with activity, balance and rolling columns)
+    """
+    df, _ = data_handler.get_logbook_data()
+    end_date = pd.Timestamp(end_date or dt.date.today())
+    window = analytics.slice_date_range(df, start_date, end_date)
+
+    streak_table = streaks.compute_streaks(df, _streak_habits())
+    balance = analytics.slice_date_range(metrics.get_balance_scores(df=df), start_date, end_date)
+    rolling = analytics.slice_date_range(metrics.get_rolling_metrics(df), start_date, end_date)
+
+    summary = {
+        "format_version": SNAPSHOT_FORMAT_VERSION,
+        "snapshot_version": df.attrs.get("snapshot_version"),
+        "generated_at": dt.datetime.now().isoformat(timespec='seconds'),
+        "range": {"start": _iso(window['Data'].min()) if not window.empty else None, "end": _iso(end_date)},
+        "weekly_stats": analytics.calculate_weekly_stats(analytics.slice_date_range(df, None, end_date), 7),
+        "streaks": [
+            {
+                "habit": habit,
+                "current_streak": int(row.current_streak),
+                "longest_streak": int(row.longest_streak),
+                "current_start": _iso(row.current_start),
+                "current_end": _iso(row.current_end),
+                "longest_start": _iso(row.longest_start),
+                "longest_end": _iso(row.longest_end),
+            }
+            for habit, row in streak_table.iterrows()
+        ],
+        "heatmaps": payloads.habit_days_payload(window, _streak_habits()),
+    }
+
+    columns = [col for col in config.TIME_COLUMNS if col in window.columns]
+    daily = window[['Data'] + columns].join(balance[['score', 'is_na']].add_prefix('balance_'), how='left')
+    daily = daily.join(rolling, how='left')
+
+    return summary, daily
+
+def write_snapshot(out_dir: str, start_date=None, end_date=None) -> str:
+    """
+    Write a versioned snapshot directory (summary.json + daily.feather) and point latest.json at it.
+
+    Returns:
+        str: Path of the snapshot directory
+    """
+    summary, daily = build_snapshot(start_date, end_date)
+
+    name = f"snapshot-{dt.datetime.now():%Y%m%dT%H%M%S}-{summary['snapshot_version']}"
+    snapshot_dir = os.path.join(out_dir, name)
+    os.makedirs(snapshot_dir, exist_ok=True)
+
+    with open(os.path.join(snapshot_dir, 'summary.json'), "w", encoding="utf-8") as file:
+        json.dump(summary, file, ensure_ascii=False, indent=2)
+    data_handler.write_columnar_cache(
+        daily.reset_index(drop=True), os.path.join(snapshot_dir, 'daily.feather'),
+        {"snapshot_version": summary["snapshot_version"]}, schema_version=SNAPSHOT_FORMAT_VERSION
+    )
+
+    # Swap the pointer last, so readers never see a half-written snapshot
+    pointer_path = os.path.join(out_dir, LATEST_POINTER)
+    with open(f"{pointer_path}.tmp", "w", encoding="utf-8") as file:
+        json.dump({"snapshot": name, "format_version": SNAPSHOT_FORMAT_VERSION}, file)
+    os.replace(f"{pointer_path}.tmp", pointer_path)
+
+    return snapshot_dir
+
+def load_latest_snapshot(out_dir: str):
+    """
+    Read the snapshot latest.json points at.
+
+    Returns:
+        tuple or None: (summary dict, daily pd.DataFrame), or None if there is no compatible snapshot
+    """
+    try:
+        with open(os.path.join(out_dir, LATEST_POINTER), "r", encoding="utf-8") as file:
+            pointer = json.load(file)
+    except (OSError, ValueError):
+        return None
+
+    if pointer.get("format_version") != SNAPSHOT_FORMAT_VERSION:
+        return None
+
+    snapshot_dir = os.path.join(out_dir, pointer["snapshot"])
+    with open(os.path.join(snapshot_dir, 'summary.json'), "r", encoding="utf-8") as file:
+        summary = json.load(file)
+    daily = data_handler.read_columnar_cache(os.path.join(snapshot_dir, 'daily.feather'), schema_version=SNAPSHOT_FORMAT_VERSION)
+    return summary, daily
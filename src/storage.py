@@ -0,0 +1,274 @@
+import os
+import sqlite3
+import threading
+import datetime as dt
+from contextlib import closing, nullcontext
+
+import numpy as np
+import pandas as pd
+
+import src.config as config
+import src.data_handler as data_handler
+import src.perf as perf
+
+STORAGE_BACKEND_ENV = 'LOGBOOK_STORAGE_BACKEND'
+
+_backend = None
+_backend_lock = threading.Lock()
+
+# pandas hands NumPy scalars to executemany; store them as plain numbers
+sqlite3.register_adapter(np.int64, int)
+sqlite3.register_adapter(np.float64, float)
+sqlite3.register_adapter(np.float32, float)
+sqlite3.register_adapter(np.bool_, int)
+
+def _logbook_columns() -> list[str]:
+    """Columns stored per day besides 'Data': weekday, configured habits and time totals."""
+    columns = ['WEEKDAY'] + list(config.HABITS_CONFIG) + config.TIME_COLUMNS
+    return list(dict.fromkeys(columns))
+
+def _sql_type(column: str) -> str:
+    habit_type = config.HABITS_CONFIG.get(column, {}).get("type")
+    if habit_type == "binary":
+        return "INTEGER"
+    if habit_type == "time" or column in config.TIME_COLUMNS:
+        return "REAL"
+    return "TEXT"
+
+def _quote(column: str) -> str:
+    return '"' + column.replace('"', '""') + '"'
+
+
+class FileBackend:
+    """The yearly Excel partitions with their columnar caches (see data_handler)."""
+    name = "file"
+
+    def select(self, start_date=None, end_date=None) -> tuple[dict, str]:
+        """Return the partitions overlapping the range and the path derived caches live next to."""
+        files = data_handler.discover_logbook_files()
+        if not files:
+            raise FileNotFoundError(f"Could not find any files matching {config.FILENAME_PATTERN} in any known location")
+
+        # Fall back to the newest partition when none overlaps the range, e.g. early in a year
+        partitions = data_handler.select_partitions(files, start_date, end_date) or {max(files): files[max(files)]}
+        return partitions, partitions[max(partitions)]
+
+    def source_key(self, partitions: dict) -> tuple:
+        return data_handler._resolve_source_key(partitions)
+
+    def load(self, partitions: dict) -> pd.DataFrame:
+        return data_handler.load_logbook_partitions(partitions)
+
+    def fetch_range(self, start_date=None, end_date=None, columns: list[str] = None) -> pd.DataFrame:
+        """Return the typed rows within [start_date, end_date], optionally only some columns."""
+        partitions, _ = self.select(start_date, end_date)
+        df = self.load(partitions)
+        mask = pd.Series(True, index=df.index)
+        if start_date is not None:
+            mask &= df['Data'] >= pd.Timestamp(start_date)
+        if end_date is not None:
+            mask &= df['Data'] <= pd.Timestamp(end_date)
+        df = df[mask]
+        return df[['Data'] + [col for col in columns if col in df.columns]] if columns else df
+
+    def fetch_series(self, column: str, start_date=None, end_date=None) -> pd.Series:
+        """Return one column within [start_date, end_date], indexed by date."""
+        df = self.fetch_range(start_date, end_date, [column])
+        return df.set_index(pd.DatetimeIndex(df['Data']).rename(None))[column]
+
+
+class SQLiteBackend(FileBackend):
+    """
+    Embedded SQLite store with one row per day, keyed (and indexed) on 'Data'.
+
+    The Excel files stay the input: whenever they change, import_excel upserts the days
+    whose content differs. Ranges and single series are answered with indexed queries.
+    """
+    name = "sqlite"
+
+    def __init__(self, db_path: str = None):
+        self._db_path = db_path
+        self._lock = threading.Lock()
+        # The schema is checked once per process, on the first connection
+        self._schema_ready = False
+
+    @property
+    def db_path(self) -> str:
+        if self._db_path is None:
+            data_handler.discover_logbook_files()
+            data_dir = data_handler.get_resolved_data_dir()
+            if data_dir is None:
+                data_dir = next((d for d in data_handler.get_data_dirs()
+                                 if os.path.exists(os.path.join(d, config.SQLITE_FILENAME))), None)
+            if data_dir is None:
+                raise FileNotFoundError(f"Could not find the logbook data or {config.SQLITE_FILENAME} in any known location")
+            self._db_path = os.path.join(data_dir, config.SQLITE_FILENAME)
+        return self._db_path
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        if not self._schema_ready:
+            self._ensure_schema(conn)
+            conn.commit()
+            self._schema_ready = True
+        return conn
+
+    def _ensure_schema(self, conn):
+        """Create the tables, and add columns that were added to the config since."""
+        conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        conn.execute("CREATE TABLE IF NOT EXISTS days (Data TEXT PRIMARY KEY, row_hash INTEGER) WITHOUT ROWID")
+        existing = {row[1] for row in conn.execute("PRAGMA table_info(days)")}
+        for column in _logbook_columns():
+            if column not in existing:
+                conn.execute(f"ALTER TABLE days ADD COLUMN {_quote(column)} {_sql_type(column)}")
+
+    def _get_meta(self, conn, key, default=None):
+        row = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def _set_meta(self, conn, key, value):
+        conn.execute("INSERT INTO meta (key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                     (key, str(value)))
+
+    @perf.instrument()
+    def import_excel(self, partitions: dict = None, conn=None) -> dict:
+        """
+        Bring the days of the Excel partitions (all of them by default) into the store.
+
+        Days whose content differs are upserted, and days of those years that are no
+        longer in their sheet are deleted, so the store always mirrors the Excel files.
+
+        Returns:
+            dict: Counts of inserted, updated, deleted and unchanged days
+        """
+        partitions = partitions or data_handler.discover_logbook_files()
+        df = data_handler.load_logbook_partitions(partitions)
+        df = df.dropna(subset=['Data']).drop_duplicates('Data', keep='last')
+
+        columns = _logbook_columns()
+        rows = pd.DataFrame({'Data': df['Data'].dt.strftime('%Y-%m-%d')})
+        for column in columns:
+            values = df[column] if column in df.columns else pd.Series(None, index=df.index, dtype=object)
+            if _sql_type(column) == "INTEGER":
+                values = values.astype("Int64")
+            elif _sql_type(column) == "TEXT":
+                values = values.astype("string")
+            rows[column] = values
+        rows['row_hash'] = pd.util.hash_pandas_object(rows[columns], index=False).astype('int64')
+
+        with self._lock, (nullcontext(conn) if conn is not None else closing(self._connect())) as conn, conn:
+            stored = dict(conn.execute("SELECT Data, row_hash FROM days"))
+
+            changed = rows[[stored.get(day) != row_hash for day, row_hash in zip(rows['Data'], rows['row_hash'])]]
+            inserted = int((~changed['Data'].isin(list(stored))).sum())
+
+            # Days of the imported years that were removed from their sheet
+            years = {str(year) for year in partitions}
+            in_sheet = set(rows['Data'])
+            removed = [(day,) for day in stored if day[:4] in years and day not in in_sheet]
+
+            if not changed.empty:
+                names = ['Data', 'row_hash'] + columns
+                values = changed[names].astype(object).where(changed[names].notna(), None)
+                conn.executemany(
+                    f"INSERT INTO days ({', '.join(_quote(n) for n in names)}) VALUES ({', '.join('?' * len(names))}) "
+                    f"ON CONFLICT(Data) DO UPDATE SET {', '.join(f'{_quote(n)} = excluded.{_quote(n)}' for n in names[1:])}",
+                    values.itertuples(index=False, name=None)
+                )
+            if removed:
+                conn.executemany("DELETE FROM days WHERE Data = ?", removed)
+            if not changed.empty or removed:
+                self._set_meta(conn, "data_version", int(self._get_meta(conn, "data_version", 0)) + 1)
+
+        return {"inserted": inserted, "updated": len(changed) - inserted, "deleted": len(removed),
+                "unchanged": len(rows) - len(changed)}
+
+    def sync(self, conn=None):
+        """Import from Excel if any Excel partition changed since the last import; a stat per file otherwise."""
+        files = data_handler.discover_logbook_files()
+        if not files:
+            return None
+
+        key = data_handler._resolve_source_key(files)
+        if key is None:
+            return None
+
+        fingerprint = repr(key[:2])
+        with (nullcontext(conn) if conn is not None else closing(self._connect())) as conn:
+            if self._get_meta(conn, "excel_fingerprint") == fingerprint:
+                return None
+
+            counts = self.import_excel(files, conn)
+            with conn:
+                self._set_meta(conn, "excel_fingerprint", fingerprint)
+        print(f"Imported Excel into {self.db_path}: {counts}")
+        return counts
+
+    def select(self, start_date=None, end_date=None) -> tuple[dict, str]:
+        """Return one pseudo-partition per stored year overlapping the range, and the database path."""
+        with closing(self._connect()) as conn:
+            self.sync(conn)
+            first, last = conn.execute("SELECT min(Data), max(Data) FROM days").fetchone()
+        if first is None:
+            raise FileNotFoundError(f"No logbook days stored in {self.db_path}")
+
+        years = {year: f"{self.db_path}#{year}" for year in range(int(first[:4]), int(last[:4]) + 1)}
+        partitions = data_handler.select_partitions(years, start_date, end_date) or {max(years): years[max(years)]}
+        return partitions, self.db_path
+
+    def source_key(self, partitions: dict) -> tuple:
+        with closing(self._connect()) as conn:
+            version = self._get_meta(conn, "data_version", "0")
+        paths = tuple(path for _, path in sorted(partitions.items()))
+        return (paths, tuple((version,) for _ in paths), dt.date.today())
+
+    def load(self, partitions: dict) -> pd.DataFrame:
+        return self.fetch_range(dt.date(min(partitions), 1, 1), dt.date(max(partitions), 12, 31))
+
+    def fetch_range(self, start_date=None, end_date=None, columns: list[str] = None) -> pd.DataFrame:
+        conditions, params = [], []
+        if start_date is not None:
+            conditions.append("Data >= ?")
+            params.append(pd.Timestamp(start_date).strftime('%Y-%m-%d'))
+        if end_date is not None:
+            conditions.append("Data <= ?")
+            params.append(pd.Timestamp(end_date).strftime('%Y-%m-%d'))
+
+        # Like the file backend, columns the store doesn't have are left out
+        stored = _logbook_columns()
+        selected = ['Data'] + [col for col in (columns or stored) if col in stored]
+        query = f"SELECT {', '.join(_quote(col) for col in selected)} FROM days"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY Data"
+
+        with closing(self._connect()) as conn:
+            df = pd.read_sql_query(query, conn, params=params)
+
+        # Same typed schema as the Excel path
+        df['Data'] = pd.to_datetime(df['Data'], format='%Y-%m-%d')
+        return data_handler._coerce_logbook_types(df)
+
+
+def get_backend():
+    """Return the storage backend chosen by LOGBOOK_STORAGE_BACKEND or config.STORAGE_BACKEND."""
+    global _backend
+    name = os.environ.get(STORAGE_BACKEND_ENV) or config.STORAGE_BACKEND
+    with _backend_lock:
+        if _backend is None or _backend.name != name:
+            if name == "file":
+                _backend = FileBackend()
+            elif name == "sqlite":
+                _backend = SQLiteBackend()
+            else:
+                raise ValueError(f"Unknown storage backend '{name}', expected 'file' or 'sqlite'")
+        return _backend
+
+def fetch_range(start_date=None, end_date=None, columns: list[str] = None) -> pd.DataFrame:
+    """Return the typed logbook rows within [start_date, end_date] from the configured backend."""
+    return get_backend().fetch_range(start_date, end_date, columns)
+
+def fetch_series(column: str, start_date=None, end_date=None) -> pd.Series:
+    """Return one habit's values within [start_date, end_date] from the configured backend."""
+    return get_backend().fetch_series(column, start_date, end_date)
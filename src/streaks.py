@@ -0,0 +1,292 @@
+import os
+import json
+import hashlib
+import threading
+
+import numpy as np
+import pandas as pd
+
+import src.config as config
+import src.data_handler as data_handler
+import src.perf as perf
+
+# Day states in the habits x days matrix
+NA_DAY = -1
+MISSED = 0
+DONE = 1
+
+@perf.instrument()
+def habit_state_matrix(df: pd.DataFrame, habits: list[str], date_column: str = 'Data'):
+    """
+    Build the habits x days state matrix used by all streak calculations.
+
+    Uses the completion flags added by preprocessing; frames without them (e.g. raw
+    data) are thresholded with the per-habit threshold from HABITS_CONFIG.
+    Days with NA values, and habits missing from the frame, are marked NA_DAY.
+
+    Args:
+        df (pd.DataFrame): Logbook frame with a date column and one column per habit
+        habits (list): Habit column names, one matrix row each
+        date_column (str): Name of the date column
+
+    Returns:
+        tuple: (np.ndarray of int8 states, pd.DatetimeIndex of the matching days)
+    """
+    if not df[date_column].is_monotonic_increasing:
+        df = df.sort_values(date_column, kind='stable')
+
+    states = np.full((len(habits), len(df)), NA_DAY, dtype=np.int8)
+    for i, habit in enumerate(habits):
+        flag_column = config.get_completion_column(habit)
+        if flag_column in df.columns:
+            flags = df[flag_column]
+        elif habit in df.columns:
+            flags = data_handler.to_completion_flags(df[habit], config.get_completion_threshold(habit))
+        else:
+            continue
+
+        done = flags.to_numpy(dtype=bool, na_value=False)
+        states[i] = np.where(flags.isna().to_numpy(), NA_DAY, np.where(done, DONE, MISSED))
+
+    return states, pd.DatetimeIndex(df[date_column])
+
+def run_lengths(states: np.ndarray) -> np.ndarray:
+    """
+    Return the running streak length for every habit and day.
+
+    NA days neither break nor extend a streak: they carry the previous value forward.
+    """
+    done_count = np.cumsum(states == DONE, axis=1)
+
+    # Done count at the most recent missed day, carried forward
+    base = np.maximum.accumulate(np.where(states == MISSED, done_count, 0), axis=1)
+
+    return done_count - base
+
+def _runs(states: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Return (habit row, first day, last day) of every run of done days, ordered by habit and day."""
+    rows, cols = np.nonzero(states == DONE)  # Row-major: grouped by habit, then by day
+    if len(rows) == 0:
+        return rows, cols, cols
+
+    # A new run starts on a habit change or after a missed day
+    row_run_ids = np.cumsum(states == MISSED, axis=1)[rows, cols]
+    is_start = np.ones(len(rows), dtype=bool)
+    is_start[1:] = (rows[1:] != rows[:-1]) | (row_run_ids[1:] != row_run_ids[:-1])
+
+    starts = np.flatnonzero(is_start)
+    ends = np.append(starts[1:], len(rows)) - 1
+    return rows[starts], cols[starts], cols[ends]
+
+def streak_history(states: np.ndarray, dates: pd.DatetimeIndex, habits: list[str]) -> pd.DataFrame:
+    """
+    Run-length encode the done days of every habit.
+
+    Returns:
+        pd.DataFrame: One row per streak with habit, start, end and length (done days),
+        ordered by habit and start date
+    """
+    run_rows, run_starts, run_ends = _runs(states)
+    done_count = np.cumsum(states == DONE, axis=1)
+    return pd.DataFrame({
+        'habit': np.asarray(habits, dtype=object)[run_rows],
+        'start': dates[run_starts],
+        'end': dates[run_ends],
+        'length': (done_count[run_rows, run_ends] - done_count[run_rows, run_starts] + 1).astype(np.int64),
+    })
+
+@perf.instrument()
+def compute_streaks(df: pd.DataFrame, habits: list[str], date_column: str = 'Data') -> pd.DataFrame:
+    """
+    Compute current and longest streaks, with their dates, for all habits at once.
+
+    Args:
+        df (pd.DataFrame): Logbook frame with a date column and one column per habit
+        habits (list): Habit column names
+        date_column (str): Name of the date column
+
+    Returns:
+        pd.DataFrame: Indexed by habit with current_streak, longest_streak,
+        current_start, current_end, longest_start and longest_end
+    """
+    states, dates = habit_state_matrix(df, habits, date_column)
+    return streaks_from_states(states, dates, habits)
+
+def streaks_from_states(states: np.ndarray, dates: pd.DatetimeIndex, habits: list[str]) -> pd.DataFrame:
+    """
+    Same as compute_streaks, for an already built state matrix.
+
+    The last day is ignored for the current streak when it is a missed day, since it
+    may simply not be filled in yet.
+    """
+    current = np.zeros(len(habits), dtype=np.int64)
+    longest = np.zeros(len(habits), dtype=np.int64)
+    bounds = {column: np.full(len(habits), -1) for column in ['current_start', 'current_end', 'longest_start', 'longest_end']}
+
+    if states.shape[1]:
+        lengths = run_lengths(states)
+        last = states.shape[1] - 1
+        current_idx = np.where(states[:, last] == MISSED, last - 1, last)
+        current = np.where(current_idx >= 0, lengths[np.arange(len(habits)), np.maximum(current_idx, 0)], 0)
+        longest = lengths.max(axis=1)
+
+        # Plain array lookups on the runs: a groupby costs more than the streaks themselves
+        run_rows, run_starts, run_ends = _runs(states)
+        if len(run_rows):
+            # The current streak, when non-zero, is always the latest run of its habit
+            latest = np.searchsorted(run_rows, np.arange(len(habits)), side='right') - 1
+            has_current = current > 0
+            bounds['current_start'][has_current] = run_starts[latest[has_current]]
+            bounds['current_end'][has_current] = run_ends[latest[has_current]]
+
+            # The earliest of equally long runs
+            is_longest = np.flatnonzero(lengths[run_rows, run_ends] == longest[run_rows])
+            habit_rows, first = np.unique(run_rows[is_longest], return_index=True)
+            bounds['longest_start'][habit_rows] = run_starts[is_longest[first]]
+            bounds['longest_end'][habit_rows] = run_ends[is_longest[first]]
+
+    day_values = dates.to_numpy(dtype='datetime64[ns]')
+    result = pd.DataFrame({'current_streak': current, 'longest_streak': longest}, index=pd.Index(habits, name='habit'))
+    for column, idx in bounds.items():
+        values = np.full(len(habits), np.datetime64('NaT'), dtype='datetime64[ns]')
+        values[idx >= 0] = day_values[idx[idx >= 0]]
+        result[column] = values
+    return result
+
+# Persisted per-habit streak state, so renders only fold in the days added since last time
+STREAK_STATE_FILENAME = 'streak_state.json'
+STREAK_STATE_VERSION = 1
+_streak_state_lock = threading.Lock()
+
+def get_state_path(data_path: str) -> str:
+    """Return the streak state file that sits next to the logbook data."""
+    return os.path.join(os.path.dirname(data_path), STREAK_STATE_FILENAME)
+
+def load_streak_state(path: str) -> dict:
+    """Load the persisted streak state, or an empty state if missing or outdated."""
+    try:
+        with open(path, "r", encoding="utf-8") as file:
+            state = json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+    if state.get("version") != STREAK_STATE_VERSION:
+        return {}
+    return state.get("habits", {})
+
+def save_streak_state(path: str, habit_states: dict):
+    """Atomically write the streak state next to the data."""
+    tmp_path = f"{path}.tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump({"version": STREAK_STATE_VERSION, "habits": habit_states}, file, indent=2)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"Could not save streak state to {path}: {str(e)}")
+
+def _prefix_hash(row: np.ndarray, dates: pd.DatetimeIndex, days: int) -> str:
+    """Hash the first `days` states and dates of one habit."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(dates[:days].asi8.tobytes())
+    digest.update(row[:days].tobytes())
+    return digest.hexdigest()
+
+def _empty_entry() -> dict:
+    return {"days": 0, "hash": None, "last_date": None, "run": 0, "run_start": None, "run_end": None,
+            "best": 0, "best_start": None, "best_end": None}
+
+def _fold(entry: dict, tail: np.ndarray, tail_dates: pd.DatetimeIndex) -> dict:
+    """Fold the states of newly processed days into a habit's streak entry."""
+    entry = dict(entry)
+    if len(tail) == 0:
+        return entry
+
+    carry = entry["run"]
+    no_miss_yet = np.cumsum(tail == MISSED) == 0
+    lengths = run_lengths(tail[np.newaxis, :])[0] + np.where(no_miss_yet, carry, 0)
+    # Run starts are only looked up for done days, so tails without any need no history
+    history = streak_history(tail[np.newaxis, :], tail_dates, [None]) if (tail == DONE).any() else None
+
+    def run_start_at(idx):
+        # Runs that started before the tail keep their persisted start date
+        if carry > 0 and no_miss_yet[idx]:
+            return entry["run_start"]
+        return history.loc[history['end'] >= tail_dates[idx], 'start'].iloc[0].strftime('%Y-%m-%d')
+
+    last = len(tail) - 1
+    if lengths[last] == 0:
+        entry["run_start"] = entry["run_end"] = None
+    else:
+        done_idx = np.flatnonzero(tail == DONE)
+        entry["run_start"] = run_start_at(done_idx[-1]) if done_idx.size else entry["run_start"]
+        entry["run_end"] = tail_dates[done_idx[-1]].strftime('%Y-%m-%d') if done_idx.size else entry["run_end"]
+    entry["run"] = int(lengths[last])
+
+    # The first maximum is always the last done day of the earliest longest run
+    best_idx = int(np.argmax(lengths))
+    if lengths[best_idx] > entry["best"]:
+        entry["best"] = int(lengths[best_idx])
+        entry["best_start"] = run_start_at(best_idx)
+        entry["best_end"] = tail_dates[best_idx].strftime('%Y-%m-%d')
+
+    return entry
+
+@perf.instrument()
+def incremental_streaks(df: pd.DataFrame, habits: list[str], state_path: str, date_column: str = 'Data') -> pd.DataFrame:
+    """
+    Compute the same table as compute_streaks, folding in only the days not yet persisted.
+
+    Every day except the last one is committed to the state file, since the last row
+    is usually today's and still being edited. A habit is recomputed from scratch when
+    the hash of its committed days no longer matches, i.e. an older row was edited.
+    """
+    states, dates = habit_state_matrix(df, habits, date_column)
+    return incremental_streaks_from_states(states, dates, habits, state_path)
+
+@perf.instrument()
+def incremental_streaks_from_states(states: np.ndarray, dates: pd.DatetimeIndex, habits: list[str], state_path: str) -> pd.DataFrame:
+    """Same as incremental_streaks, for an already built state matrix."""
+    committed_days = max(states.shape[1] - 1, 0)
+
+    with _streak_state_lock:
+        persisted = load_streak_state(state_path)
+        updated = dict(persisted)  # Keep entries of habits tracked by other callers
+        rows = []
+
+        for i, habit in enumerate(habits):
+            entry = persisted.get(habit)
+            valid = (
+                entry is not None
+                and entry["days"] <= committed_days
+                and entry["hash"] == _prefix_hash(states[i], dates, entry["days"])
+            )
+            if not valid:
+                entry = _empty_entry()
+
+            entry = _fold(entry, states[i, entry["days"]:committed_days], dates[entry["days"]:committed_days])
+            entry["days"] = committed_days
+            entry["hash"] = _prefix_hash(states[i], dates, committed_days)
+            entry["last_date"] = dates[committed_days - 1].strftime('%Y-%m-%d') if committed_days else None
+            updated[habit] = entry
+
+            # A missed last day may simply not be filled in yet, so it does not end the current streak
+            with_last = _fold(entry, states[i, committed_days:], dates[committed_days:])
+            current = entry if states.shape[1] and states[i, -1] == MISSED else with_last
+            rows.append({
+                'habit': habit,
+                'current_streak': current["run"],
+                'longest_streak': with_last["best"],
+                'current_start': current["run_start"],
+                'current_end': current["run_end"],
+                'longest_start': with_last["best_start"],
+                'longest_end': with_last["best_end"],
+            })
+
+        if updated != persisted:
+            save_streak_state(state_path, updated)
+
+    result = pd.DataFrame(rows, columns=['habit', 'current_streak', 'longest_streak', 'current_start',
+                                         'current_end', 'longest_start', 'longest_end']).set_index('habit')
+    for column in ['current_start', 'current_end', 'longest_start', 'longest_end']:
+        result[column] = pd.to_datetime(result[column])
+    return result
@@ -0,0 +1,157 @@
+import os
+import time
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import src.perf as perf
+
+# Shared by all pages and sessions; NumPy and pandas release the GIL in their heavy kernels
+TASKGRAPH_WORKERS = min(8, (os.cpu_count() or 1) + 2)
+
+# Results kept per snapshot version, across pages and reruns
+TASK_CACHE_SIZE = 64
+
+_executor = None
+_executor_lock = threading.Lock()
+_task_cache = OrderedDict()
+_task_cache_lock = threading.Lock()
+
+class Task:
+    """
+    A derived dataset: func is called with the results of deps, in order.
+
+    key identifies the result in the per-snapshot memo and defaults to name; include
+    any parameter the result depends on besides the data (e.g. the selected window).
+    """
+    __slots__ = ('name', 'func', 'deps', 'key')
+
+    def __init__(self, name: str, func, deps=(), key=None):
+        self.name = name
+        self.func = func
+        self.deps = tuple(deps)
+        self.key = key if key is not None else name
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=TASKGRAPH_WORKERS, thread_name_prefix="taskgraph")
+        return _executor
+
+def _topological_order(tasks: dict) -> list:
+    order, visiting, done = [], set(), set()
+
+    def visit(name):
+        if name in done:
+            return
+        if name in visiting:
+            raise ValueError(f"Task dependency cycle through '{name}'")
+        if name not in tasks:
+            raise KeyError(f"Unknown task dependency '{name}'")
+        visiting.add(name)
+        for dep in tasks[name].deps:
+            visit(dep)
+        visiting.discard(name)
+        done.add(name)
+        order.append(name)
+
+    for name in tasks:
+        visit(name)
+    return order
+
+def _run_task(task, dep_futures, future, timings):
+    """Run one task once all its dependencies are resolved; called on a pool thread."""
+    try:
+        args = [dep.result() for dep in dep_futures]
+        start = time.perf_counter()
+        result = task.func(*args)
+        timings[task.name] = (start, time.perf_counter() - start)
+        future.set_result(result)
+    except BaseException as e:
+        future.set_exception(e)
+
+def _schedule(task, dep_futures, future, timings):
+    """Submit task to the pool when its last dependency completes, without blocking a worker."""
+    pending = [dep for dep in dep_futures if not dep.done()]
+    if not pending:
+        _get_executor().submit(_run_task, task, dep_futures, future, timings)
+        return
+
+    remaining = [len(pending)]
+    lock = threading.Lock()
+
+    def on_done(_):
+        with lock:
+            remaining[0] -= 1
+            ready = remaining[0] == 0
+        if ready:
+            _get_executor().submit(_run_task, task, dep_futures, future, timings)
+
+    for dep in pending:
+        dep.add_done_callback(on_done)
+
+def run_tasks(tasks: list[Task], version: str = None) -> dict:
+    """
+    Run a page's tasks, independent ones concurrently on the shared pool.
+
+    Results are memoized per snapshot version and task key, so reruns and other
+    sessions on the same snapshot reuse them (in-flight ones included). Without a
+    version nothing is memoized.
+
+    Args:
+        tasks (list): Task objects; dependencies refer to task names in the same list
+        version (str, optional): Snapshot version the tasks are computed from
+
+    Returns:
+        dict: {task name: result}. The first failing task's exception is raised.
+    """
+    by_name = {task.name: task for task in tasks}
+    futures = {}
+    timings = {}
+
+    for name in _topological_order(by_name):
+        task = by_name[name]
+        dep_futures = [futures[dep] for dep in task.deps]
+
+        future = None
+        if version is not None:
+            with _task_cache_lock:
+                cache_key = (version, task.key)
+                future = _task_cache.get(cache_key)
+                if future is not None:
+                    _task_cache.move_to_end(cache_key)
+                else:
+                    future = _task_cache[cache_key] = Future()
+                    while len(_task_cache) > TASK_CACHE_SIZE:
+                        _task_cache.popitem(last=False)
+                    _schedule(task, dep_futures, future, timings)
+        else:
+            future = Future()
+            _schedule(task, dep_futures, future, timings)
+        futures[name] = future
+
+    results = {}
+    try:
+        for name, future in futures.items():
+            results[name] = future.result()
+    except BaseException:
+        # Don't keep failed results around; the next rerun retries them
+        if version is not None:
+            with _task_cache_lock:
+                for task in tasks:
+                    cached = _task_cache.get((version, task.key))
+                    if cached is not None and cached.done() and cached.exception() is not None:
+                        del _task_cache[(version, task.key)]
+        raise
+
+    # Timings measured on pool threads show up in this rerun's performance panel
+    for name, (start, duration) in sorted(timings.items(), key=lambda item: item[1][0]):
+        perf.record(f"task: {name}", start, duration, perf.count_rows(results[name]))
+
+    return results
+
+def clear_task_cache():
+    """Drop all memoized task results."""
+    with _task_cache_lock:
+        _task_cache.clear()
@@ -1,14 +1,88 @@
-import os
-import datetime as dt
-import pandas as pd
-from datetime import datetime
-import streamlit as st
-
-import src.config as config
-
 def set_custom_page_config(title: str):
+    import streamlit as st
+    import src.perf as perf
+    import src.watcher as watcher
+
     st.set_page_config(
         page_title=title,
         layout="wide",
         page_icon="assets/icon.png"
-    )
\ No newline at end of file
+    )
+
+    # Timings are collected per rerun; LOGBOOK_PERF=1 turns them on by default
+    perf.reset()
+    perf.enable(st.sidebar.toggle("⏱️ Record timings", value=perf.is_enabled(), key="perf_enabled"))
+
+    # Keep caches warm in the background; only the first page view of the process starts it
+    watcher.start_watcher()
+    show_snapshot_status()
+
+def show_snapshot_status():
+    """Show which data snapshot is being served in the sidebar."""
+    import streamlit as st
+    import src.watcher as watcher
+
+    status = watcher.get_status()
+    if status["snapshot_version"] is None:
+        if status["error"]:
+            st.sidebar.caption(f"📦 Data snapshot: ⚠️ {status['error']}")
+        else:
+            st.sidebar.caption("📦 Data snapshot: warming up…")
+        return
+
+    caption = f"📦 Data snapshot `{status['snapshot_version']}` · rebuilt {status['last_rebuild']:%H:%M:%S}"
+    if status["error"]:
+        caption += f" · ⚠️ {status['error']}"
+    st.sidebar.caption(caption)
+
+def show_performance_panel(frames: dict = None, base=None):
+    """
+    Show this rerun's timings in a sidebar expander, with a Chrome trace download,
+    and a memory report. Call at the end of a page.
+
+    `frames` ({label: DataFrame}) are the frames the page holds; the part of them
+    shared with `base` (the snapshot returned by get_logbook_data, or a list of shared
+    frames) is not counted twice.
+    """
+    import streamlit as st
+    import src.perf as perf
+
+    if not perf.is_enabled():
+        return
+
+    records = perf.get_records()
+    with st.sidebar.expander("⏱️ Performance", expanded=False):
+        if records:
+            st.dataframe(perf.summary(records), hide_index=True, use_container_width=True)
+            st.download_button(
+                "Download trace",
+                perf.to_chrome_trace(records),
+                file_name="logbook-trace.json",
+                mime="application/json"
+            )
+        else:
+            st.caption("Nothing recorded in this rerun")
+
+        st.caption("Memory: shared caches are held once per process, page frames once per session")
+        st.dataframe(memory_report(frames, base), hide_index=True, use_container_width=True)
+
+def memory_report(frames: dict = None, base=None):
+    """Return the process memory, the shared caches and the page's own frames as a table in MB."""
+    import pandas as pd
+    import src.data_handler as data_handler
+    import src.metrics as metrics
+    import src.perf as perf
+
+    megabyte = 1024 * 1024
+    cache_stats = data_handler.get_cache_stats()
+    rss = perf.process_memory()
+    rows = [
+        ("Process (resident)", None if rss is None else rss / megabyte, None),
+        (f"Data snapshots ({cache_stats['size']})", cache_stats["bytes"] / megabyte, None),
+        ("Metric tables", metrics.get_cache_bytes() / megabyte, None),
+    ]
+    for label, frame in (frames or {}).items():
+        total, own = perf.frame_memory(frame, base)
+        rows.append((f"Page: {label}", total / megabyte, own / megabyte))
+
+    return pd.DataFrame(rows, columns=["item", "MB", "own MB"])
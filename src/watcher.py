@@ -0,0 +1,144 @@
+import os
+import time
+import threading
+import datetime as dt
+
+import src.config as config
+import src.data_handler as data_handler
+import src.journal as journal
+import src.metrics as metrics
+import src.perf as perf
+import src.streaks as streaks
+
+# How often the data files are checked for changes
+POLL_INTERVAL_SECONDS = 30
+
+# Habits whose streak state is kept warm
+STREAK_HABITS = [habit for habit, props in config.HABITS_CONFIG.items() if props["type"] in ("binary", "time")]
+
+_watcher_thread = None
+_watcher_lock = threading.Lock()
+_stop_event = threading.Event()
+_status = {
+    "snapshot_version": None,
+    "last_check": None,
+    "last_rebuild": None,
+    "rebuild_seconds": None,
+    "rebuilds": 0,
+}
+# Last failure of each step ("data load", "journal compaction", derived tables), cleared when it succeeds
+_errors = {}
+
+def _record(step: str, error: Exception = None):
+    """Set or clear a step's error, printing it only when it changes."""
+    message = None if error is None else str(error)
+    if message is not None and _errors.get(step) != message:
+        print(f"Error pre-warming {step}: {message}")
+    if message is None:
+        _errors.pop(step, None)
+    else:
+        _errors[step] = message
+
+def _source_fingerprint():
+    """Stat all logbook files and the journal; any change (or a new day) means the caches must be rebuilt."""
+    stats = []
+    for year, path in data_handler.discover_logbook_files().items():
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        stats.append((year, stat.st_mtime_ns, stat.st_size))
+    try:
+        journal_stats = journal.fingerprint()
+    except FileNotFoundError:
+        journal_stats = None
+    return (tuple(stats), journal_stats, dt.date.today())
+
+def _derived_steps(df, path):
+    """The derived tables kept warm for a snapshot, as (name, function) pairs."""
+    return [
+        ("rolling metrics", metrics.get_rolling_metrics),
+        ("balance scores", metrics.get_balance_scores),
+        ("streaks", lambda: streaks.incremental_streaks(df, STREAK_HABITS, streaks.get_state_path(path))),
+    ]
+
+def warm_caches():
+    """
+    Rebuild the data snapshot and every derived table for the current files.
+
+    The snapshot is published as soon as it is loaded. Each derived table is then
+    warmed on its own, so one failing table neither hides the snapshot nor stops the others.
+    """
+    start = time.perf_counter()
+
+    try:
+        df, path = data_handler.get_logbook_data()
+    except Exception as e:
+        _record("data load", e)
+        raise
+    _record("data load")
+    _status.update({
+        "snapshot_version": df.attrs.get("snapshot_version"),
+        "last_rebuild": dt.datetime.now(),
+        "rebuilds": _status["rebuilds"] + 1,
+    })
+
+    for name, step in _derived_steps(df, path):
+        try:
+            step()
+            _record(name)
+        except Exception as e:
+            _record(name, e)
+
+    _status["rebuild_seconds"] = time.perf_counter() - start
+
+def _watch(interval):
+    # Nobody reads this thread's timings; don't let them pile up
+    perf.enable(False)
+    fingerprint = None
+    while True:
+        # Fold logged entries into the compacted table once enough have piled up
+        try:
+            journal.compact_if_needed()
+            _record("journal compaction")
+        except Exception as e:
+            _record("journal compaction", e)
+
+        # A failed derived table is retried with the next change; a failed load on every poll
+        try:
+            current = _source_fingerprint()
+            _status["last_check"] = dt.datetime.now()
+            if current != fingerprint:
+                warm_caches()
+                fingerprint = current
+        except Exception as e:
+            _record("data load", e)
+
+        if _stop_event.wait(interval):
+            return
+
+def start_watcher(interval: float = POLL_INTERVAL_SECONDS):
+    """Start the background watcher once per process; later calls are no-ops."""
+    global _watcher_thread
+    with _watcher_lock:
+        if _watcher_thread is not None and _watcher_thread.is_alive():
+            return
+        _stop_event.clear()
+        _watcher_thread = threading.Thread(target=_watch, args=(interval,), name="logbook-watcher", daemon=True)
+        _watcher_thread.start()
+
+def stop_watcher():
+    """Stop the background watcher and wait for it to exit."""
+    _stop_event.set()
+    if _watcher_thread is not None:
+        _watcher_thread.join()
+
+def get_status() -> dict:
+    """Return the snapshot version being served, the watcher's last activity and any failing steps."""
+    errors = dict(_errors)
+    return dict(
+        _status,
+        errors=errors,
+        error="; ".join(f"{step}: {message}" for step, message in errors.items()) or None,
+        running=_watcher_thread is not None and _watcher_thread.is_alive(),
+    )
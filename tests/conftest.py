@@ -0,0 +1,15 @@
+import pytest
+
+import src.data_handler as data_handler
+from benchmarks.synthetic import generate_logbook, write_logbook_files
+
+
+@pytest.fixture
+def logbook_dir(tmp_path, monkeypatch):
+    """A data directory with a synthetic yearly logbook that data_handler loads from, with empty caches."""
+    write_logbook_files(generate_logbook(1, seed=1), str(tmp_path))
+    monkeypatch.setenv(data_handler.DATA_DIR_ENV, str(tmp_path))
+    monkeypatch.setattr(data_handler, "_resolved_data_dir", None)
+    data_handler.clear_logbook_cache()
+    yield str(tmp_path)
+    data_handler.clear_logbook_cache()
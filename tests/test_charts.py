@@ -0,0 +1,39 @@
+import pandas as pd
+
+import src.analytics as analytics
+import src.charts as charts
+import src.config as config
+import src.data_handler as data_handler
+import src.metrics as metrics
+from benchmarks.synthetic import generate_logbook
+
+
+def typed_snapshot(years=1):
+    """A synthetic logbook through the same typing and preprocessing as the Feather cache path."""
+    return data_handler.preprocess_logbook_data(data_handler._coerce_logbook_types(generate_logbook(years)))
+
+
+def test_time_fields_are_numeric_in_the_typed_frame():
+    df = typed_snapshot()
+    time_columns = config.get_active_time_fields()
+
+    assert 'Cronometer' not in time_columns
+    for column in time_columns:
+        assert pd.api.types.is_float_dtype(df[column]), column
+
+
+def test_daily_figure_builds_from_the_typed_frame():
+    df = typed_snapshot()
+    end_date = df.index[-1]
+    start_date = end_date - pd.Timedelta(days=30)
+    time_columns = config.get_active_time_fields()
+
+    # Same steps as the Analytics page
+    window = analytics.get_calendar_window(df, start_date, end_date)
+    rolling = metrics.compute_rolling_metrics(df).reindex(window.index)
+    window = window.assign(**{'7_day_sma': rolling['Razem_sma7'], '7_day_ema': rolling['Razem_ema7']})
+    fig = charts.build_daily_activity_figure(window, time_columns, config.get_column_colors(), start_date, end_date)
+
+    bar_names = [trace.name for trace in fig.data if trace.type == 'bar']
+    assert set(time_columns) <= set(bar_names)
+    assert 'Cronometer' not in bar_names
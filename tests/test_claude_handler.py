@@ -0,0 +1,29 @@
+import src.claude_handler as claude_handler
+
+
+def test_advice_cache_is_bounded():
+    claude_handler.clear_advice_cache()
+    with claude_handler._advice_lock:
+        for i in range(claude_handler.ADVICE_CACHE_SIZE + 5):
+            claude_handler._store_advice(f"key-{i}", "advice")
+
+    assert len(claude_handler._advice_cache) == claude_handler.ADVICE_CACHE_SIZE
+    # The most recent answers are kept
+    assert f"key-{claude_handler.ADVICE_CACHE_SIZE + 4}" in claude_handler._advice_cache
+    assert "key-0" not in claude_handler._advice_cache
+    claude_handler.clear_advice_cache()
+
+
+def test_expired_advice_is_dropped_on_insert(monkeypatch):
+    claude_handler.clear_advice_cache()
+    now = 1_000_000.0
+    monkeypatch.setattr(claude_handler.time, "time", lambda: now)
+    with claude_handler._advice_lock:
+        claude_handler._store_advice("yesterday", "advice")
+
+    now += claude_handler.ADVICE_TTL_SECONDS
+    with claude_handler._advice_lock:
+        claude_handler._store_advice("today", "advice")
+
+    assert list(claude_handler._advice_cache) == ["today"]
+    claude_handler.clear_advice_cache()
@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import src.data_handler as data_handler
+
+
+def test_writes_to_a_returned_frame_leave_the_cache_alone(logbook_dir):
+    df, _ = data_handler.get_logbook_data()
+    day = df.index[-2]
+    expected = df.loc[day].copy()
+
+    df.loc[day, 'YouTube'] = 999
+    df.iloc[0, df.columns.get_loc('Anki')] = pd.NA
+    df['Razem'] += 1
+    df['extra'] = 1
+
+    cached, _ = data_handler.get_logbook_data()
+    assert data_handler.get_cache_stats()["hits"] == 1
+    assert 'extra' not in cached.columns
+    pd.testing.assert_series_equal(cached.loc[day], expected)
+
+
+def test_writes_through_returned_arrays_leave_the_cache_alone(logbook_dir):
+    df, _ = data_handler.get_logbook_data()
+    values = df['YouTube'].to_numpy()
+    expected = values.copy()
+
+    # Read-only under copy-on-write (pandas 3); either way the cache keeps its values
+    try:
+        values[:] = 1.0
+    except ValueError:
+        pass
+
+    cached, _ = data_handler.get_logbook_data()
+    np.testing.assert_array_equal(cached['YouTube'].to_numpy(), expected)
+
+
+def test_discovered_files_are_reused_until_they_expire_or_vanish(logbook_dir, monkeypatch):
+    listings = []
+    list_files = data_handler._list_logbook_files
+    monkeypatch.setattr(data_handler, "_list_logbook_files", lambda data_dir: listings.append(data_dir) or list_files(data_dir))
+
+    files = data_handler.discover_logbook_files()
+    data_handler.get_logbook_data()
+    assert data_handler.discover_logbook_files() == files
+    assert len(listings) == 1
+
+    # A listed file that can't be found any more makes the next call list again
+    assert data_handler._resolve_source_key({1999: files[max(files)] + '.missing'}) is None
+    data_handler.discover_logbook_files()
+    assert len(listings) == 2
+
+    monkeypatch.setattr(data_handler, "DISCOVERY_TTL_SECONDS", 0.0)
+    data_handler.discover_logbook_files()
+    assert len(listings) == 3
+
+
+@pytest.mark.filterwarnings("error::FutureWarning")
+def test_incremental_ingest_keeps_the_cached_dtypes(logbook_dir):
+    paths = data_handler.discover_logbook_files()
+    path = paths[max(paths)]
+    before = data_handler.load_logbook_file(path)
+
+    # An empty day is added to the sheet
+    raw = pd.read_excel(path)
+    raw = pd.concat([raw, pd.DataFrame({'Data': [raw['Data'].iloc[0] - pd.Timedelta(days=1)]})], ignore_index=True)
+    raw.to_excel(path, index=False)
+
+    after = data_handler.load_logbook_file(path)
+    assert data_handler.get_ingest_report(path)["inserted"] == 1
+    assert after.dtypes.astype(str).equals(before.dtypes.astype(str))
@@ -0,0 +1,73 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+import src.data_handler as data_handler
+import src.journal as journal
+from benchmarks.synthetic import generate_logbook, write_logbook_files
+
+
+def test_day_values_leave_unfilled_habits_empty():
+    df = pd.DataFrame(
+        {'YouTube': pd.array([30.0, np.nan], dtype="float32"), 'Anki': pd.array([True, pd.NA], dtype="boolean"),
+         'sport': pd.Categorical(['run', None])},
+        index=pd.date_range('2024-01-01', periods=2)
+    )
+
+    assert journal.day_values(df, '2024-01-01', ['YouTube', 'Anki', 'sport']) == {'YouTube': 30.0, 'Anki': True, 'sport': 'run'}
+    assert journal.day_values(df, '2024-01-02', ['YouTube', 'Anki', 'sport']) == {'YouTube': None, 'Anki': None, 'sport': None}
+    # Days outside the frame have nothing logged
+    assert journal.day_values(df, '2023-12-31', ['YouTube']) == {'YouTube': None}
+
+
+def test_changed_values_only_keeps_edits():
+    before = {'YouTube': 30.0, 'Anki': None, 'Gitara': None, 'sport': 'run'}
+    after = {'YouTube': 30.0, 'Anki': True, 'Gitara': None, 'sport': None}
+
+    assert journal.changed_values(before, after) == {'Anki': True, 'sport': None}
+
+
+def test_logging_one_value_leaves_the_rest_of_the_day_alone(logbook_dir):
+    df, _ = data_handler.get_logbook_data()
+    day = df.index[-3]
+    habits = ['YouTube', 'Gitara', 'Anki', 'YNAB']
+    before = journal.day_values(df, day, habits)
+
+    # What the Log page submits when only Anki was edited
+    submitted = dict(before, Anki=not before['Anki'])
+    journal.log_entry(journal.changed_values(before, submitted), date=day, data_dir=logbook_dir)
+
+    df, _ = data_handler.get_logbook_data()
+    assert journal.day_values(df, day, habits) == submitted
+
+
+def test_excel_corrections_win_over_older_entries(logbook_dir):
+    df, _ = data_handler.get_logbook_data()
+    day = df.index[-3]
+    journal.log_entry({'YouTube': 123.0}, date=day, data_dir=logbook_dir)
+    assert journal.day_values(data_handler.get_logbook_data()[0], day, ['YouTube']) == {'YouTube': 123.0}
+
+    # The day is corrected in Excel after it was logged
+    raw = generate_logbook(1, seed=1)
+    raw.loc[raw['Data'] == day, 'YouTube'] = 45.0
+    paths = write_logbook_files(raw, logbook_dir)
+    stat = os.stat(paths[day.year])
+    os.utime(paths[day.year], ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    assert journal.day_values(data_handler.get_logbook_data()[0], day, ['YouTube']) == {'YouTube': 45.0}
+
+
+def test_compaction_drops_settled_entries(logbook_dir):
+    df, _ = data_handler.get_logbook_data()
+    day = df.index[-3]
+    kept = {'YouTube': journal.day_values(df, day, ['YouTube'])['YouTube'] or 0.0}
+    kept['YouTube'] += 10
+    journal.log_entry(kept, date=day, data_dir=logbook_dir)
+    # Already what Excel has
+    journal.log_entry({'Anki': journal.day_values(df, df.index[-4], ['Anki'])['Anki']}, date=df.index[-4], data_dir=logbook_dir)
+
+    assert journal.compact(logbook_dir) == 2
+    entries, _ = journal.read_entries(logbook_dir)
+    assert {day: list(values) for day, values in entries.items()} == {day: ['YouTube']}
+    assert journal.day_values(data_handler.get_logbook_data()[0], day, ['YouTube']) == kept
@@ -0,0 +1,20 @@
+import pandas as pd
+
+import src.data_handler as data_handler
+import src.metrics as metrics
+
+
+def test_tables_come_from_the_frame_they_are_given(logbook_dir):
+    full, _ = data_handler.get_logbook_data()
+    ranged, _ = data_handler.get_logbook_data(start_date=pd.Timestamp.now().normalize() - pd.Timedelta(days=3))
+    ranged = ranged[ranged.index >= ranged.index[-30]]
+    ranged.attrs = dict(ranged.attrs, snapshot_version="last-30-days")
+
+    rolling = metrics.get_rolling_metrics(ranged)
+    scores = metrics.get_balance_scores(['YouTube', 'Gitara'], ranged)
+    assert rolling.index[0] == ranged.index[0]
+    assert scores.index.equals(ranged.index)
+
+    # The full history is memoized under its own version
+    assert metrics.get_rolling_metrics().index[0] == full.index[0]
+    assert metrics.get_balance_scores(['YouTube', 'Gitara']).index.equals(full.index)
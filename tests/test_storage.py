@@ -0,0 +1,32 @@
+import os
+
+import pandas as pd
+
+from benchmarks.synthetic import generate_logbook, write_logbook_files
+from src.storage import FileBackend, SQLiteBackend
+
+
+def test_days_removed_from_excel_are_removed_from_sqlite(logbook_dir):
+    backend = SQLiteBackend(os.path.join(logbook_dir, "logbook.sqlite"))
+    df = generate_logbook(1, seed=1)
+    day = df['Data'].iloc[-10]
+    backend.sync()
+    assert len(backend.fetch_range(day, day)) == 1
+
+    paths = write_logbook_files(df[df['Data'] != day], logbook_dir)
+    stat = os.stat(paths[day.year])
+    os.utime(paths[day.year], ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    assert backend.sync()["deleted"] == 1
+    assert backend.fetch_range(day, day).empty
+    assert FileBackend().fetch_range(day, day).empty
+
+
+def test_backends_leave_out_unknown_columns(logbook_dir):
+    start, end = pd.Timestamp.today() - pd.Timedelta(days=30), pd.Timestamp.today()
+    sqlite = SQLiteBackend(os.path.join(logbook_dir, "logbook.sqlite"))
+    sqlite.select()
+
+    for backend in (FileBackend(), sqlite):
+        df = backend.fetch_range(start, end, ['YouTube', 'No such habit'])
+        assert list(df.columns) == ['Data', 'YouTube']
@@ -0,0 +1,120 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import src.config as config
+import src.streaks as streaks
+from benchmarks.bench_streaks import HABITS, legacy_current_streak, legacy_longest_streak, synthetic_logbook
+
+NA = np.nan
+
+
+def make_frame(values: dict) -> pd.DataFrame:
+    """Logbook frame ending today with one column per habit, e.g. {'Anki': [1, 0, NA]}."""
+    days = len(next(iter(values.values()))) if values else 0
+    df = pd.DataFrame({'Data': pd.date_range(end=pd.Timestamp.now().normalize(), periods=days)})
+    for habit, column in values.items():
+        df[habit] = pd.array(column, dtype="float64")
+    return df
+
+
+EDGE_CASES = {
+    "empty": {'Anki': []},
+    "single done day": {'Anki': [1]},
+    "single missed day": {'Anki': [0]},
+    "single NA day": {'Anki': [NA]},
+    "all NA": {'Anki': [NA] * 6},
+    "all missed": {'Anki': [0] * 6},
+    "last day missed": {'Anki': [1, 1, 0, 1, 1, 0]},
+    "last day NA": {'Anki': [1, 0, 1, 1, NA]},
+    "NA inside a run": {'Anki': [1, NA, 1, 0, 1, NA, NA, 1]},
+    "two habits, one all NA": {'Anki': [1, 1, 0, 1], 'YNAB': [NA, NA, NA, NA]},
+}
+
+
+def assert_matches_legacy(df, habits):
+    table = streaks.compute_streaks(df, habits)
+    for habit in habits:
+        values = df[habit].to_numpy()
+        assert table.loc[habit, 'current_streak'] == legacy_current_streak(values), habit
+        assert table.loc[habit, 'longest_streak'] == legacy_longest_streak(values), habit
+
+
+@pytest.mark.parametrize("values", EDGE_CASES.values(), ids=EDGE_CASES.keys())
+def test_compute_streaks_matches_legacy_loops(values):
+    assert_matches_legacy(make_frame(values), list(values))
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_compute_streaks_matches_legacy_loops_on_random_logbooks(seed):
+    df = synthetic_logbook(1, na_density=0.2, seed=seed)
+    table = streaks.compute_streaks(df, HABITS)
+    for habit in HABITS:
+        values = df[habit].to_numpy()
+        if config.HABITS_CONFIG[habit]["type"] == "time":
+            values = np.where(np.isnan(values), np.nan, (values >= config.get_completion_threshold(habit)).astype(float))
+        assert table.loc[habit, 'current_streak'] == legacy_current_streak(values), habit
+        assert table.loc[habit, 'longest_streak'] == legacy_longest_streak(values), habit
+
+
+def test_compute_streaks_dates():
+    df = make_frame({'Anki': [1, 1, 0, 1, NA, 1, 0]})
+    row = streaks.compute_streaks(df, ['Anki']).loc['Anki']
+    dates = df['Data']
+
+    # The missed last day does not end the current run of days 3-5 (day 4 is NA)
+    assert row.current_streak == 2
+    assert (row.current_start, row.current_end) == (dates[3], dates[5])
+    # Equally long runs: the earliest one wins
+    assert row.longest_streak == 2
+    assert (row.longest_start, row.longest_end) == (dates[0], dates[1])
+
+
+def test_compute_streaks_without_done_days_has_no_dates():
+    df = make_frame({'Anki': [0, NA, 0], 'YNAB': [NA, NA, NA]})
+    table = streaks.compute_streaks(df, ['Anki', 'YNAB', 'Gitara'])
+
+    assert (table[['current_streak', 'longest_streak']] == 0).all().all()
+    assert table[['current_start', 'current_end', 'longest_start', 'longest_end']].isna().all().all()
+
+
+def test_streak_history_without_done_days_is_empty():
+    states = np.array([[streaks.MISSED, streaks.NA_DAY]], dtype=np.int8)
+    history = streaks.streak_history(states, pd.date_range('2024-01-01', periods=2), ['Anki'])
+
+    assert history.empty
+    assert list(history.columns) == ['habit', 'start', 'end', 'length']
+
+
+@pytest.mark.parametrize("values", [
+    {'Anki': [1, 1, 0, 1, 1, 0]},
+    {'Anki': [1, 0, 1, 1, NA]},
+    {'Anki': [NA] * 5},
+    {'Anki': [0] * 5},
+    {'Anki': [1, 1, 1, NA, NA], 'YNAB': [NA, 1, 0, 0, 0], 'Gitara': [NA] * 5},
+], ids=["last day missed", "last day NA", "all NA", "all missed", "mixed habits"])
+def test_incremental_streaks_match_full_recompute(tmp_path, values):
+    df = make_frame(values)
+    habits = list(values)
+    state_path = str(tmp_path / streaks.STREAK_STATE_FILENAME)
+
+    # Fold in one day per render, as the page does while the logbook grows
+    for days in range(1, len(df) + 1):
+        expected = streaks.compute_streaks(df.iloc[:days], habits)
+        actual = streaks.incremental_streaks(df.iloc[:days], habits, state_path)
+        pd.testing.assert_frame_equal(actual, expected, check_dtype=False)
+
+
+def test_incremental_streaks_recompute_after_an_edit(tmp_path):
+    df = synthetic_logbook(1, seed=3)
+    state_path = str(tmp_path / streaks.STREAK_STATE_FILENAME)
+    streaks.incremental_streaks(df, HABITS, state_path)
+
+    edited = df.copy()
+    edited.loc[10, 'Anki'] = 1 - (edited.loc[10, 'Anki'] if not pd.isna(edited.loc[10, 'Anki']) else 0)
+    edited.loc[edited.index[-1], 'Anki'] = np.nan
+    pd.testing.assert_frame_equal(
+        streaks.incremental_streaks(edited, HABITS, state_path),
+        streaks.compute_streaks(edited, HABITS),
+        check_dtype=False
+    )
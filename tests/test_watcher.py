@@ -0,0 +1,47 @@
+import pytest
+
+import src.streaks as streaks
+import src.watcher as watcher
+
+
+@pytest.fixture(autouse=True)
+def clean_status(monkeypatch):
+    monkeypatch.setattr(watcher, "_status", dict(watcher._status, snapshot_version=None, rebuilds=0))
+    monkeypatch.setattr(watcher, "_errors", {})
+
+
+def test_failing_step_does_not_hide_the_snapshot(logbook_dir, monkeypatch):
+    def broken(*args, **kwargs):
+        raise IndexError("index -1 is out of bounds")
+    monkeypatch.setattr(streaks, "incremental_streaks", broken)
+
+    watcher.warm_caches()
+    status = watcher.get_status()
+
+    assert status["snapshot_version"] is not None
+    assert status["errors"] == {"streaks": "index -1 is out of bounds"}
+    assert "streaks" in status["error"]
+
+
+def test_error_clears_once_the_step_succeeds(logbook_dir, monkeypatch):
+    working = streaks.incremental_streaks
+    monkeypatch.setattr(streaks, "incremental_streaks", lambda *args: 1 / 0)
+    watcher.warm_caches()
+    assert "streaks" in watcher.get_status()["errors"]
+
+    monkeypatch.setattr(streaks, "incremental_streaks", working)
+    watcher.warm_caches()
+    assert watcher.get_status()["error"] is None
+
+
+def test_failed_load_is_reported(tmp_path, monkeypatch):
+    import src.data_handler as data_handler
+    monkeypatch.setenv(data_handler.DATA_DIR_ENV, str(tmp_path))
+    monkeypatch.setattr(data_handler, "_resolved_data_dir", None)
+
+    with pytest.raises(Exception):
+        watcher.warm_caches()
+    status = watcher.get_status()
+
+    assert status["snapshot_version"] is None
+    assert "data load" in status["errors"]